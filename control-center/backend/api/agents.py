@@ -5,23 +5,37 @@ Manages the AI agents hierarchy (L1 + L2 + L3)
 PERFORMANCE OPTIMIZED VERSION WITH CACHING
 """
 
-from fastapi import APIRouter, HTTPException, Query, Request
-from typing import List, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Literal, Optional, Tuple
 from datetime import datetime
+import asyncio
 import json
 import os
 from pathlib import Path
-import glob
-import re
 import sys
 
 # Add parent directory to path for utils import
 from middleware.rate_limit import limiter
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.cache import SimpleCache, cached
-from utils.errors import UserFriendlyError, handle_file_error
-from utils.pagination import paginate_list, PaginationParams
+from utils.cache import SimpleCache, cached, call_cached, get_loader_executor
+from utils.disk_cache import parse_cache
+from utils.errors import UserFriendlyError
+from utils.etag import not_modified
+from utils.db_helpers import optimizer
+from utils.pagination import (
+    paginate_list, paginate_keyset, create_pagination_response, PaginationParams, CursorParams
+)
+from utils.parallel import parallel_map
 from utils.performance import track_performance, QueryTimer
+from services.agent_registry import AgentRegistry, current_agent_registry, get_agent_registry
+from services.agent_sync import agent_sync
+from services.incremental_parser import IncrementalDocumentParser
+from services.markdown_parser import parse_agent_document, parse_sub_agent_text, parse_micro_agent_text
+
+from config import settings
+from database import get_db
 
 router = APIRouter(prefix="/api/agents", tags=["agents"])
 
@@ -29,336 +43,293 @@ router = APIRouter(prefix="/api/agents", tags=["agents"])
 AI_AGENTS_ROOT = Path("C:/Ziggie/ai-agents")
 KB_ROOT = Path("C:/Ziggie/ai-agents/knowledge-base")
 
+# Most ids accepted by GET /api/agents/batch (a whole L1 subtree is ~160)
+MAX_BATCH_IDS = 500
+
+# L1 agent files (12 agents for 12x12x12 structure)
+L1_AGENT_FILES = [
+    "01_ART_DIRECTOR_AGENT.md",
+    "02_CHARACTER_PIPELINE_AGENT.md",
+    "03_ENVIRONMENT_PIPELINE_AGENT.md",
+    "04_GAME_SYSTEMS_DEVELOPER_AGENT.md",
+    "05_UI_UX_DEVELOPER_AGENT.md",
+    "06_CONTENT_DESIGNER_AGENT.md",
+    "07_INTEGRATION_AGENT.md",
+    "08_QA_TESTING_AGENT.md",
+    "09_MIGRATION_AGENT.md",
+    "10_DIRECTOR_AGENT.md",
+    "11_STORYBOARD_CREATOR_AGENT.md",
+    "12_COPYWRITER_SCRIPTER_AGENT.md"
+]
+
+# L1 agents with knowledge-base directories (ai-agents/<dir> and knowledge-base/L1-<dir>)
+AGENT_KB_DIRECTORIES = {
+    "01_art_director": "art-director",
+    "02_character_pipeline": "character-pipeline",
+    "03_environment_pipeline": "environment-pipeline",
+    "04_game_systems_developer": "game-systems",
+    "05_ui_ux_developer": "ui-ux",
+    "06_content_designer": "content-designer",
+    "07_integration": "integration",
+    "08_qa_testing": "qa-testing"
+}
+
+# Characters buffered before a chunk of /api/agents/tree is sent
+TREE_CHUNK_SIZE = 64 * 1024
+
 # Global cache instance for manual invalidation (5 minute TTL)
-agents_cache = SimpleCache(ttl=300)
+agents_cache = SimpleCache(ttl=300, name="agents")
 
+# Block-fingerprinted parsers for the large architecture documents: an edit
+# re-parses only the changed sub-agent / micro-agent blocks
+l2_document = IncrementalDocumentParser("### ", parse_sub_agent_text, name="l2_agents")
+l3_document = IncrementalDocumentParser("####", parse_micro_agent_text, name="l3_agents")
 
-def parse_agent_markdown(file_path: str) -> Dict:
+
+def _parse_agent_file(file_path: Path) -> Dict:
     """Parse agent definition from markdown file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        lines = content.split('\n')
-
-        # Extract title (first # header)
-        title = ""
-        for line in lines:
-            if line.startswith('# '):
-                title = line.strip('# ').strip()
-                break
-
-        # Extract role
-        role = ""
-        for i, line in enumerate(lines):
-            if line.startswith('## ROLE') or line.startswith('## Role'):
-                if i + 1 < len(lines):
-                    role = lines[i + 1].strip()
-                break
-
-        # Extract primary objective
-        objective = ""
-        for i, line in enumerate(lines):
-            if line.startswith('## PRIMARY OBJECTIVE') or line.startswith('## Primary Objective'):
-                if i + 1 < len(lines):
-                    objective = lines[i + 1].strip()
-                break
-
-        # Extract responsibilities (count ## headers in CORE RESPONSIBILITIES section)
-        responsibilities = []
-        in_responsibilities = False
-        for line in lines:
-            if 'CORE RESPONSIBILITIES' in line or 'RESPONSIBILITIES' in line:
-                in_responsibilities = True
-                continue
-            if in_responsibilities and line.startswith('## '):
-                if 'RESPONSIBILITIES' not in line:
-                    break
-            if in_responsibilities and line.startswith('### '):
-                resp = line.strip('# ').strip()
-                responsibilities.append(resp)
-
-        # Extract access permissions
-        permissions = {
-            "read_write": [],
-            "read_only": []
-        }
-
-        in_permissions = False
-        current_perm_type = None
-
-        for line in lines:
-            if 'ACCESS PERMISSIONS' in line:
-                in_permissions = True
-                continue
-            if in_permissions:
-                if line.startswith('## '):
-                    break
-                if 'Read/Write' in line or 'Read-Write' in line:
-                    current_perm_type = "read_write"
-                elif 'Read-Only' in line or 'Read Only' in line:
-                    current_perm_type = "read_only"
-                elif line.strip().startswith('-') and current_perm_type:
-                    path = line.strip('- ').strip()
-                    if path:
-                        permissions[current_perm_type].append(path)
-
-        # Extract tools
-        tools = []
-        in_tools = False
-        for line in lines:
-            if 'TOOLS' in line and 'REFERENCES' in line:
-                in_tools = True
-                continue
-            if in_tools:
-                if line.startswith('## '):
-                    break
-                if line.startswith('### '):
-                    tool = line.strip('# ').strip()
-                    tools.append(tool)
-
-        return {
-            "title": title,
-            "role": role,
-            "objective": objective,
-            "responsibilities": responsibilities,
-            "permissions": permissions,
-            "tools": tools,
-            "has_content": len(content) > 0,
-            "word_count": len(content.split()),
-            "sections": len([l for l in lines if l.startswith('## ')])
-        }
+        return parse_agent_document(file_path).to_dict()
     except Exception as e:
         return {"error": str(e)}
 
 
-@cached(ttl=300)  # Cache for 5 minutes
-def load_l1_agents() -> List[Dict]:
-    """Load all L1 main agents (CACHED)"""
-    agents = []
-
-    # L1 agent files (12 agents for 12x12x12 structure)
-    l1_files = [
-        "01_ART_DIRECTOR_AGENT.md",
-        "02_CHARACTER_PIPELINE_AGENT.md",
-        "03_ENVIRONMENT_PIPELINE_AGENT.md",
-        "04_GAME_SYSTEMS_DEVELOPER_AGENT.md",
-        "05_UI_UX_DEVELOPER_AGENT.md",
-        "06_CONTENT_DESIGNER_AGENT.md",
-        "07_INTEGRATION_AGENT.md",
-        "08_QA_TESTING_AGENT.md",
-        "09_MIGRATION_AGENT.md",
-        "10_DIRECTOR_AGENT.md",
-        "11_STORYBOARD_CREATOR_AGENT.md",
-        "12_COPYWRITER_SCRIPTER_AGENT.md"
-    ]
+def _agent_tags(level: str):
+    """Tag a loaded agent list by level and by agent id (e.g. agent:L2.3.1)"""
+    def tags(agents: List[Dict]) -> List[str]:
+        return [f"agent:{level}"] + [f"agent:{agent['id']}" for agent in agents if "id" in agent]
+    return tags
 
-    for filename in l1_files:
-        file_path = AI_AGENTS_ROOT / filename
 
-        if file_path.exists():
-            try:
-                agent_data = parse_agent_markdown(str(file_path))
+def _l1_file_tags(result: Dict, file_path: str) -> List[str]:
+    """Tag a parsed L1 file with its agent id (e.g. agent:01_art_director)"""
+    return [f"agent:{Path(file_path).name.replace('_AGENT.md', '').lower()}"]
 
-                # Extract ID from filename
-                agent_id = filename.replace('_AGENT.md', '').lower()
 
-                stat = os.stat(file_path)
+@cached(ttl=300, maxsize=64, tags=_l1_file_tags)  # Per-file, so one changed L1 file doesn't re-parse the rest
+def parse_agent_markdown(file_path: str) -> Dict:
+    """Parse agent definition from markdown file (CACHED per path, persisted by mtime)"""
+    return parse_cache.get_or_parse(
+        "l1_agent:v1",
+        Path(file_path),
+        _parse_agent_file,
+        should_store=lambda data: "error" not in data
+    )
 
-                agents.append({
-                    "id": agent_id,
-                    "level": "L1",
-                    "name": agent_data.get('title', filename.replace('_AGENT.md', '').replace('_', ' ').title()),
-                    "filename": filename,
-                    "path": str(file_path),
-                    "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                    **agent_data
-                })
-            except Exception as e:
-                agents.append({
-                    "id": filename.replace('.md', '').lower(),
-                    "level": "L1",
-                    "filename": filename,
-                    "error": str(e)
-                })
 
-    return agents
+def _load_l1_file(filename: str) -> Optional[Dict]:
+    """Stat and parse one L1 agent file (None if it does not exist)"""
+    file_path = AI_AGENTS_ROOT / filename
 
+    if not file_path.exists():
+        return None
 
-@cached(ttl=300)  # Cache for 5 minutes
-def load_l2_agents() -> List[Dict]:
-    """Load all 144 L2 sub-agents from SUB_AGENT_ARCHITECTURE.md (CACHED)"""
-    agents = []
+    try:
+        agent_data = parse_agent_markdown(str(file_path))
+
+        # Extract ID from filename
+        agent_id = filename.replace('_AGENT.md', '').lower()
 
+        stat = os.stat(file_path)
+
+        return {
+            "id": agent_id,
+            "level": "L1",
+            "name": agent_data.get('title', filename.replace('_AGENT.md', '').replace('_', ' ').title()),
+            "filename": filename,
+            "path": str(file_path),
+            "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            **agent_data
+        }
+    except Exception as e:
+        return {
+            "id": filename.replace('.md', '').lower(),
+            "level": "L1",
+            "filename": filename,
+            "error": str(e)
+        }
+
+
+@cached(ttl=300, stale_while_revalidate=True, tags=_agent_tags("L1"))  # Cache for 5 minutes, refresh in background
+def load_l1_agents() -> List[Dict]:
+    """Load all L1 main agents (CACHED, files read concurrently, kept in file order)"""
+    return [agent for agent in parallel_map(_load_l1_file, L1_AGENT_FILES) if agent is not None]
+
+
+def _parse_l2_architecture(file_path: Path) -> List[Dict]:
+    """Parse L2 sub-agents from SUB_AGENT_ARCHITECTURE.md (changed blocks only)"""
+    return l2_document.parse(file_path)
+
+
+@cached(ttl=300, stale_while_revalidate=True, tags=_agent_tags("L2"))  # Cache for 5 minutes, refresh in background
+def load_l2_agents() -> List[Dict]:
+    """Load all 144 L2 sub-agents from SUB_AGENT_ARCHITECTURE.md (CACHED, persisted by mtime)"""
     sub_agent_file = AI_AGENTS_ROOT / "SUB_AGENT_ARCHITECTURE.md"
 
     if not sub_agent_file.exists():
-        return agents
+        return []
 
     try:
-        with open(sub_agent_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        lines = content.split('\n')
-
-        # Parse sub-agents (format: ### Sub-Agent X.Y: **Name**)
-        pattern = re.compile(r'###\s+Sub-Agent\s+(\d+)\.(\d+):\s+\*\*(.+?)\*\*')
-
-        current_l1 = None
-
-        for i, line in enumerate(lines):
-            # Track which L1 agent we're under
-            if line.startswith('# ') and 'AGENT' in line.upper():
-                # Extract L1 number
-                match = re.search(r'(\d+)\.', line)
-                if match:
-                    current_l1 = match.group(1)
-
-            # Find sub-agent definitions
-            match = pattern.search(line)
-            if match:
-                l1_num = match.group(1)
-                l2_num = match.group(2)
-                name = match.group(3)
-
-                agent_id = f"L2.{l1_num}.{l2_num}"
-
-                # Extract role (next line usually)
-                role = ""
-                if i + 1 < len(lines) and lines[i + 1].startswith('**Role:**'):
-                    role = lines[i + 1].replace('**Role:**', '').strip()
-
-                # Extract capabilities (look ahead for **Capabilities:** section)
-                capabilities = []
-                for j in range(i + 1, min(i + 20, len(lines))):
-                    if '**Capabilities:**' in lines[j]:
-                        # Read bullet points
-                        for k in range(j + 1, min(j + 10, len(lines))):
-                            if lines[k].startswith('- '):
-                                capabilities.append(lines[k].strip('- ').strip())
-                            elif lines[k].startswith('#'):
-                                break
-                        break
-
-                agents.append({
-                    "id": agent_id,
-                    "level": "L2",
-                    "name": name,
-                    "role": role,
-                    "parent_l1": l1_num,
-                    "capabilities": capabilities,
-                    "source": "SUB_AGENT_ARCHITECTURE.md"
-                })
+        return parse_cache.get_or_parse("l2_agents:v2", sub_agent_file, _parse_l2_architecture)
+    except Exception:
+        return []
 
-    except Exception as e:
-        pass
 
-    return agents
+def _parse_l3_architecture(file_path: Path) -> List[Dict]:
+    """Parse L3 micro-agents from L3_MICRO_AGENT_ARCHITECTURE.md (changed blocks only)"""
+    return l3_document.parse(file_path)
 
 
-@cached(ttl=300)  # Cache for 5 minutes
+@cached(ttl=300, stale_while_revalidate=True, tags=_agent_tags("L3"))  # Cache for 5 minutes, refresh in background
 def load_l3_agents() -> List[Dict]:
-    """Load all L3 micro-agents from L3_MICRO_AGENT_ARCHITECTURE.md (CACHED)"""
-    agents = []
-
+    """Load all L3 micro-agents from L3_MICRO_AGENT_ARCHITECTURE.md (CACHED, persisted by mtime)"""
     l3_file = AI_AGENTS_ROOT / "L3_MICRO_AGENT_ARCHITECTURE.md"
 
     if not l3_file.exists():
-        return agents
+        return []
 
     try:
-        with open(l3_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        lines = content.split('\n')
-
-        # Parse L3 agents (format: #### L3.X.Y.Z: Name - note 4 hashes)
-        pattern = re.compile(r'####\s+L3\.(\d+)\.(\d+)\.(\d+):\s+(.+)')
-
-        for i, line in enumerate(lines):
-            match = pattern.search(line)
-            if match:
-                l1_num = match.group(1)
-                l2_num = match.group(2)
-                l3_num = match.group(3)
-                name = match.group(4)
-
-                agent_id = f"L3.{l1_num}.{l2_num}.{l3_num}"
-
-                # Extract task (next line usually)
-                task = ""
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    if next_line and not next_line.startswith('#'):
-                        task = next_line
-
-                agents.append({
-                    "id": agent_id,
-                    "level": "L3",
-                    "name": name,
-                    "task": task,
-                    "parent_l1": l1_num,
-                    "parent_l2": f"L2.{l1_num}.{l2_num}",
-                    "source": "L3_MICRO_AGENT_ARCHITECTURE.md"
-                })
+        return parse_cache.get_or_parse("l3_agents:v2", l3_file, _parse_l3_architecture)
+    except Exception:
+        return []
 
-    except Exception as e:
-        pass
 
-    return agents
+async def load_all_agents() -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """
+    Load L1, L2 and L3 agents concurrently without blocking the event loop
+
+    Cache hits return immediately; cold loads run on the cache loader pool.
+    """
+    l1_agents, l2_agents, l3_agents = await asyncio.gather(
+        call_cached(load_l1_agents),
+        call_cached(load_l2_agents),
+        call_cached(load_l3_agents)
+    )
+    return l1_agents, l2_agents, l3_agents
+
+
+async def load_agent_registry() -> AgentRegistry:
+    """
+    Load all agents and return their indexes (rebuilt only when a loader reloads)
+
+    The current registry is returned without leaving the event loop; a
+    rebuild runs on the cache loader pool.
+    """
+    l1_agents, l2_agents, l3_agents = await load_all_agents()
+    registry = current_agent_registry()
+    if registry is not None and registry.built_from(l1_agents, l2_agents, l3_agents):
+        return registry
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_loader_executor(), get_agent_registry, l1_agents, l2_agents, l3_agents)
+
+
+def _scan_markdown(directory: Path) -> List[Dict]:
+    """Markdown files below one directory, with size and mtime"""
+    kb_files = []
+    if not directory.exists():
+        return kb_files
+
+    for file_path in directory.rglob("*.md"):
+        try:
+            stat = os.stat(file_path)
+            kb_files.append({
+                "path": str(file_path),
+                "name": file_path.name,
+                "category": file_path.parent.name,
+                "size": stat.st_size,
+                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
+            })
+        except Exception:
+            continue
+
+    return kb_files
+
+
+def _scan_agent_knowledge(dir_name: str) -> List[Dict]:
+    """
+    Markdown files in an L1 agent's ai-agents and knowledge-base directories
+
+    Both trees are walked concurrently; ai-agents files are listed first.
+    """
+    directories = [
+        AI_AGENTS_ROOT / "ai-agents" / dir_name,
+        KB_ROOT / f"L1-{dir_name}"
+    ]
+    return [file_info for files in parallel_map(_scan_markdown, directories) for file_info in files]
+
+
+@cached(ttl=300, stale_while_revalidate=True,
+        tags=["kb:agent-knowledge"] + [f"kb:{d}" for d in AGENT_KB_DIRECTORIES.values()])  # Refresh in background
+def scan_all_agent_knowledge() -> Dict[str, List[Dict]]:
+    """Knowledge files of every mapped L1 agent, for the SQL sync (CACHED)"""
+    scans = parallel_map(_scan_agent_knowledge, AGENT_KB_DIRECTORIES.values())
+    return dict(zip(AGENT_KB_DIRECTORIES.keys(), scans))
+
+
+async def _ensure_sql_synced(db: AsyncSession, registry: Optional[AgentRegistry] = None) -> Optional[Dict]:
+    """Bring the agents/knowledge_files tables up to the current cache generation"""
+    if registry is None:
+        registry = await load_agent_registry()
+    knowledge = await call_cached(scan_all_agent_knowledge)
+    return await agent_sync.ensure_current(db, registry, knowledge)
 
 
 @router.get("")
 @limiter.limit("60/minute")
 @track_performance(endpoint="GET /api/agents", query_type="file_scan")
-async def list_all_agents(request: Request,
+async def list_all_agents(request: Request, response: Response,
     level: Optional[str] = None,
     parent: Optional[str] = None,
     search: Optional[str] = None,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=200, description="Items per page (max 200)"),
-    offset: Optional[int] = Query(None, ge=0, description="Alternative to page: start offset")
+    offset: Optional[int] = Query(None, ge=0, description="Alternative to page: start offset"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (empty for the first page)"),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     List all agents with filtering and pagination
 
     - **level**: Filter by agent level (L1, L2, L3, or 'all')
     - **parent**: Filter by parent agent ID (for L2/L3)
-    - **search**: Search in name, role, title, or ID
+    - **search**: Ranked search over id, name, title, role, task, responsibilities
+      and capabilities; each word may be a prefix (e.g. "sty ana")
     - **page**: Page number (1-indexed)
     - **page_size**: Items per page (default 50, max 200)
     - **offset**: Alternative to page - start offset
+    - **cursor**: Keyset pagination instead of page/offset - pass an empty
+      cursor for the first page, then meta.next_cursor. Agents are ordered by
+      level and id (natural order), so pages stay stable as agents change
+
+    With AGENTS_SQL_BACKEND on, unsearched page/offset listings are filtered,
+    counted and paged in SQL (synced from the registry on first use per
+    cache generation).
     """
     try:
         with QueryTimer("load_agents"):
-            # Load all agents (CACHED)
-            l1_agents = load_l1_agents()
-            l2_agents = load_l2_agents()
-            l3_agents = load_l3_agents()
-
-            all_agents = l1_agents + l2_agents + l3_agents
-
-        # Filter by level (case-insensitive)
-        if level and level.lower() != 'all':
-            all_agents = [a for a in all_agents if a.get('level') == level.upper()]
-
-        # Filter by parent (for L2/L3)
-        if parent:
-            all_agents = [
-                a for a in all_agents
-                if a.get('parent_l1') == parent or a.get('parent_l2') == parent
-            ]
+            # Load all agents (CACHED, indexed once per cache generation)
+            registry = await load_agent_registry()
+
+        # Same registry generation and query: the client's copy is current
+        cached_response = not_modified(request, response, registry.version)
+        if cached_response:
+            return cached_response
+
+        # Filter by level (case-insensitive) and parent (for L2/L3) via the indexes
+        level_filter = level.upper() if level and level.lower() != 'all' else None
+
+        if cursor is not None:
+            return _cursor_page(registry, cursor, page_size, level_filter, parent, search)
+
+        if settings.AGENTS_SQL_BACKEND and not search:
+            return await _sql_page(db, registry, level_filter, parent, page, page_size, offset)
 
-        # Search by name, role, or title
         if search:
-            search_lower = search.lower()
-            all_agents = [
-                a for a in all_agents
-                if search_lower in str(a.get('name', '')).lower()
-                or search_lower in str(a.get('title', '')).lower()
-                or search_lower in str(a.get('role', '')).lower()
-                or search_lower in str(a.get('id', '')).lower()
-            ]
+            # Ranked full-text search (word prefixes across names, roles, tasks, ...)
+            all_agents = registry.search(search, level=level_filter, parent=parent)
+        else:
+            all_agents = registry.select(level=level_filter, parent=parent)
 
         # Use new pagination utility
         params = PaginationParams(page=page, page_size=page_size, offset=offset)
@@ -370,109 +341,289 @@ async def list_all_agents(request: Request,
         result['total'] = result['meta']['total']
 
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         UserFriendlyError.handle_error(e, context="listing agents", status_code=500)
 
 
+async def _sql_page(db: AsyncSession, registry: AgentRegistry, level: Optional[str], parent: Optional[str],
+                    page: int, page_size: int, offset: Optional[int]) -> Dict:
+    """One page of agents from the synced SQL tables"""
+    await _ensure_sql_synced(db, registry)
+
+    params = PaginationParams(page=page, page_size=page_size, offset=offset)
+    agents, total = await optimizer.get_synced_agents(
+        db, level=level, parent=parent, offset=params.skip, limit=params.limit
+    )
+    current_page = page if offset is None else (params.skip // params.limit) + 1
+
+    result = create_pagination_response(agents, total, current_page, page_size, cached=True)
+    result['agents'] = result.pop('items')
+    result['total'] = total
+    return result
+
+
+def _cursor_page(registry: AgentRegistry, cursor: str, page_size: int,
+                 level: Optional[str], parent: Optional[str], search: Optional[str]) -> Dict:
+    """One keyset page of agents in registry sort order"""
+    if search:
+        matches = registry.search(search, level=level, parent=parent)
+        keyed = sorted(((registry.sort_key(agent), agent) for agent in matches), key=lambda pair: pair[0])
+        agents = [agent for _, agent in keyed]
+        keys = [key for key, _ in keyed]
+    else:
+        agents, keys = registry.select_sorted(level=level, parent=parent)
+
+    try:
+        result = paginate_keyset(agents, keys, CursorParams(cursor=cursor, page_size=page_size))
+    except ValueError as e:
+        UserFriendlyError.validation_error(str(e), field="cursor")
+
+    result['agents'] = result.pop('items')
+    result['total'] = len(agents)
+    result['cached'] = True
+    return result
+
+
 @router.get("/stats")
-async def get_agent_stats(request: Request, ):
-    """Get agent system statistics (CACHED)"""
+async def get_agent_stats(request: Request, response: Response):
+    """
+    Get agent system statistics (CACHED)
+
+    Served as-is from the registry, which computes the totals, per-L1
+    distribution and expected-vs-actual gaps once per reload.
+    """
     try:
-        l1_agents = load_l1_agents()
-        l2_agents = load_l2_agents()
-        l3_agents = load_l3_agents()
-
-        # Count by L1 parent
-        l1_distribution = {}
-        for agent in l1_agents:
-            agent_id = agent.get('id', 'unknown')
-            l1_distribution[agent_id] = {
-                "name": agent.get('title', agent_id),
-                "l2_count": 0,
-                "l3_count": 0
-            }
-
-        # Count L2 under each L1
-        for agent in l2_agents:
-            parent = agent.get('parent_l1')
-            if parent:
-                key = f"{parent.zfill(2)}_" + l1_agents[int(parent) - 1].get('id', 'unknown') if int(parent) <= len(l1_agents) else 'unknown'
-                if key in l1_distribution:
-                    l1_distribution[key]["l2_count"] += 1
-
-        # Count L3 under each L1
-        for agent in l3_agents:
-            parent = agent.get('parent_l1')
-            if parent:
-                key = f"{parent.zfill(2)}_" + l1_agents[int(parent) - 1].get('id', 'unknown') if int(parent) <= len(l1_agents) else 'unknown'
-                if key in l1_distribution:
-                    l1_distribution[key]["l3_count"] += 1
-
-        # Return format matching frontend expectations
+        registry = await load_agent_registry()
+        cached_response = not_modified(request, response, registry.version)
+        if cached_response:
+            return cached_response
+
+        # Materialized when the registry was built; last_updated is that time
+        return registry.stats
+    except Exception as e:
+        UserFriendlyError.handle_error(e, context="retrieving agent statistics", status_code=500)
+
+
+@router.post("/sync")
+@limiter.limit("10/minute")
+async def sync_agents_to_sql(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Upsert the parsed agent hierarchy and agent knowledge files into SQL
+
+    Only rows that changed since the last sync are written. Runs
+    automatically on first use per cache generation when AGENTS_SQL_BACKEND
+    is on; this endpoint forces a full diff (e.g. after editing the tables).
+    """
+    try:
+        registry = await load_agent_registry()
+        knowledge = await call_cached(scan_all_agent_knowledge)
         return {
-            "total": len(l1_agents) + len(l2_agents) + len(l3_agents),
-            "by_level": {
-                "L1": len(l1_agents),
-                "L2": len(l2_agents),
-                "L3": len(l3_agents)
-            },
-            "l1_count": len(l1_agents),
-            "l2_count": len(l2_agents),
-            "l3_count": len(l3_agents),
-            "expected": {
-                "l1": 12,
-                "l2": 144,
-                "l3": 1728,
-                "total": 1884
-            },
-            "actual": {
-                "l1": len(l1_agents),
-                "l2": len(l2_agents),
-                "l3": len(l3_agents),
-                "total": len(l1_agents) + len(l2_agents) + len(l3_agents)
-            },
-            "distribution": l1_distribution,
-            "last_updated": datetime.now().isoformat(),
-            "cached": True  # Indicate data is cached
+            "status": "success",
+            "sql_backend": settings.AGENTS_SQL_BACKEND,
+            **await agent_sync.sync(db, registry, knowledge)
         }
     except Exception as e:
-        UserFriendlyError.handle_error(e, context="retrieving agent statistics", status_code=500)
+        UserFriendlyError.handle_error(e, context="syncing agents to the database", status_code=500)
+
+
+@router.get("/changes")
+async def get_agent_changes(request: Request):
+    """
+    Agents added, removed or changed by the last re-parse of the L2/L3 documents
+
+    Compares each parse with the previous one in this process; the first
+    parse after startup is marked "initial". None until a document is parsed.
+    """
+    return {
+        "l2": l2_document.last_diff,
+        "l3": l3_document.last_diff
+    }
+
+
+def _split_list(value: Optional[str]) -> List[str]:
+    """Comma-separated query value -> unique non-empty items, in order"""
+    if not value:
+        return []
+    return list(dict.fromkeys(item.strip() for item in value.split(',') if item.strip()))
+
+
+@router.get("/batch")
+@limiter.limit("60/minute")
+async def get_agents_batch(request: Request, response: Response,
+    ids: str = Query(..., description="Comma-separated agent ids"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (id is always included)")
+):
+    """
+    Get many agents in one request, optionally reduced to some fields
+
+    - **ids**: Comma-separated agent ids (max 500); results keep this order
+    - **fields**: e.g. `name,role,sub_agents` - `sub_agents` (L1) and
+      `micro_agents` (L2) embed the children with the same fields. Without
+      fields, full agents are returned without children
+
+    Unknown ids are listed under `missing` instead of failing the request.
+    """
+    try:
+        agent_ids = _split_list(ids)
+        if not agent_ids:
+            UserFriendlyError.validation_error("At least one agent id is required", field="ids")
+        if len(agent_ids) > MAX_BATCH_IDS:
+            UserFriendlyError.validation_error(f"At most {MAX_BATCH_IDS} agent ids per request", field="ids")
+        field_list = _split_list(fields) or None
+
+        registry = await load_agent_registry()
+        cached_response = not_modified(request, response, registry.version)
+        if cached_response:
+            return cached_response
+
+        agents = []
+        missing = []
+        for agent_id in agent_ids:
+            agent = registry.project(agent_id, field_list)
+            if agent is None:
+                missing.append(agent_id)
+            else:
+                agents.append(agent)
+
+        return {
+            "agents": agents,
+            "missing": missing,
+            "fields": field_list,
+            "total": len(agents)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        UserFriendlyError.handle_error(e, context="retrieving agents", status_code=500)
+
+
+def _tree_node(registry: AgentRegistry, agent: Dict, fields: Optional[List[str]]) -> Dict:
+    """One tree node: the (projected) agent and how many children it has"""
+    node = registry.project(agent.get('id'), fields) if fields else dict(agent)
+    if node is None:
+        node = dict(agent)
+    node['child_count'] = len(registry.children_of(agent.get('id')))
+    return node
+
+
+def _chunked(pieces):
+    """Join small string pieces into chunks of about TREE_CHUNK_SIZE characters"""
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= TREE_CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _tree_json(registry: AgentRegistry, roots: List[Dict], depth: Optional[int], fields: Optional[List[str]]):
+    """Nested JSON, written node by node: {"roots": [{..., "children": [...]}]}"""
+    yield '{"version":%s,"depth":%s,"roots":[' % (json.dumps(registry.version), json.dumps(depth))
+    open_depths: List[int] = []
+    need_comma = False
+
+    for agent, level, _ in registry.walk(roots, depth):
+        # Close the nodes this one is not a descendant of
+        while open_depths and open_depths[-1] >= level:
+            open_depths.pop()
+            yield ']}'
+            need_comma = True
+
+        body = json.dumps(_tree_node(registry, agent, fields))
+        yield (',' if need_comma else '') + body[:-1] + ',"children":['
+        open_depths.append(level)
+        need_comma = False
+
+    yield ']}' * len(open_depths) + ']}'
+
+
+def _tree_ndjson(registry: AgentRegistry, roots: List[Dict], depth: Optional[int], fields: Optional[List[str]]):
+    """One JSON line per node in pre-order, with its depth and parent id"""
+    for agent, level, parent_id in registry.walk(roots, depth):
+        node = _tree_node(registry, agent, fields)
+        node['depth'] = level
+        node['parent'] = parent_id
+        yield json.dumps(node) + '\n'
+
+
+@router.get("/tree")
+@limiter.limit("30/minute")
+async def get_agent_tree(request: Request, response: Response,
+    root: Optional[str] = Query(None, description="Subtree root agent id (default: every L1 agent)"),
+    depth: Optional[int] = Query(None, ge=0, le=3, description="Levels below the root(s) to include (default: all)"),
+    format: Literal["json", "ndjson"] = Query("json", description="Nested JSON or one node per line"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields per node (id is always included)")
+):
+    """
+    Stream the agent hierarchy as nested JSON or NDJSON
+
+    - **root**: Only this agent's subtree
+    - **depth**: 0 = roots only, 1 = roots and children, ...
+    - **format**: `json` nests children under `children`; `ndjson` writes one
+      node per line in pre-order with `depth` and `parent`
+    - **fields**: e.g. `name,role` to shrink each node
+
+    Every node carries `child_count`, so clients can tell where a depth
+    limit cut the tree. Nodes are generated lazily from the registry and sent
+    in chunks as they are produced.
+    """
+    try:
+        registry = await load_agent_registry()
+        cached_response = not_modified(request, response, registry.version)
+        if cached_response:
+            return cached_response
+
+        if root is not None:
+            root_agent = registry.by_id.get(root)
+            if root_agent is None:
+                UserFriendlyError.not_found("Agent", root)
+            roots = [root_agent]
+        else:
+            roots, _ = registry.select_sorted(level="L1")
+
+        field_list = _split_list(fields) or None
+        if format == "ndjson":
+            pieces, media_type = _tree_ndjson(registry, roots, depth, field_list), "application/x-ndjson"
+        else:
+            pieces, media_type = _tree_json(registry, roots, depth, field_list), "application/json"
+
+        # A returned response does not pick up headers set on the injected one
+        headers = {name: response.headers[name] for name in ("ETag", "Cache-Control")}
+        return StreamingResponse(_chunked(pieces), media_type=media_type, headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        UserFriendlyError.handle_error(e, context="exporting the agent tree", status_code=500)
 
 
 @router.get("/{agent_id}")
-async def get_agent_details(request: Request, agent_id: str):
+async def get_agent_details(request: Request, response: Response, agent_id: str):
     """Get detailed information about a specific agent"""
     try:
-        # Load all agents (CACHED)
-        l1_agents = load_l1_agents()
-        l2_agents = load_l2_agents()
-        l3_agents = load_l3_agents()
-
-        all_agents = l1_agents + l2_agents + l3_agents
+        # Load all agents (CACHED, indexed once per cache generation)
+        registry = await load_agent_registry()
+        cached_response = not_modified(request, response, registry.version)
+        if cached_response:
+            return cached_response
 
-        # Find the agent
-        agent = next((a for a in all_agents if a.get('id') == agent_id), None)
+        # Find the agent (a copy, so the cached dict is not annotated)
+        agent = registry.get(agent_id)
 
         if not agent:
             UserFriendlyError.not_found("Agent", agent_id)
 
-        # If L1, find its sub-agents
+        # If L1, attach its sub-agents
         if agent.get('level') == 'L1':
-            # Extract L1 number from id
-            l1_num = agent_id.split('_')[0]
-            sub_agents = [
-                a for a in l2_agents
-                if a.get('parent_l1') == l1_num
-            ]
-            agent['sub_agents'] = sub_agents
+            agent['sub_agents'] = registry.children_of(agent_id)
 
-        # If L2, find its L3 agents
+        # If L2, attach its L3 agents
         if agent.get('level') == 'L2':
-            l3_children = [
-                a for a in l3_agents
-                if a.get('parent_l2') == agent_id
-            ]
-            agent['micro_agents'] = l3_children
+            agent['micro_agents'] = registry.children_of(agent_id)
 
         return agent
     except HTTPException:
@@ -483,62 +634,33 @@ async def get_agent_details(request: Request, agent_id: str):
 
 @router.get("/{agent_id}/knowledge")
 @limiter.limit("30/minute")
-async def get_agent_knowledge(request: Request, agent_id: str):
+async def get_agent_knowledge(request: Request, agent_id: str, db: AsyncSession = Depends(get_db)):
     """Get knowledge base files for a specific agent"""
     try:
         # Map agent ID to KB directory
-        agent_mapping = {
-            "01_art_director": "art-director",
-            "02_character_pipeline": "character-pipeline",
-            "03_environment_pipeline": "environment-pipeline",
-            "04_game_systems_developer": "game-systems",
-            "05_ui_ux_developer": "ui-ux",
-            "06_content_designer": "content-designer",
-            "07_integration": "integration",
-            "08_qa_testing": "qa-testing"
-        }
-
-        # Get directory name
-        dir_name = agent_mapping.get(agent_id)
+        dir_name = AGENT_KB_DIRECTORIES.get(agent_id)
 
         if not dir_name:
             # Try to extract from L2/L3 agent
             return {"message": "Knowledge mapping not available for sub-agents", "files": []}
 
-        # Scan for files
-        kb_files = []
-
-        # Search in ai-agents subdirectories
-        agent_dir = AI_AGENTS_ROOT / "ai-agents" / dir_name
-        if agent_dir.exists():
-            for file_path in agent_dir.rglob("*.md"):
-                try:
-                    stat = os.stat(file_path)
-                    kb_files.append({
-                        "path": str(file_path),
-                        "name": file_path.name,
-                        "category": file_path.parent.name,
-                        "size": stat.st_size,
-                        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
-                    })
-                except Exception:
-                    continue
-
-        # Also check knowledge-base L1 directories
-        kb_dir_pattern = KB_ROOT / f"L1-{dir_name}"
-        if kb_dir_pattern.exists():
-            for file_path in kb_dir_pattern.rglob("*.md"):
-                try:
-                    stat = os.stat(file_path)
-                    kb_files.append({
-                        "path": str(file_path),
-                        "name": file_path.name,
-                        "category": file_path.parent.name,
-                        "size": stat.st_size,
-                        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
-                    })
-                except Exception:
-                    continue
+        if settings.AGENTS_SQL_BACKEND:
+            # Indexed JOIN over the synced knowledge_files table
+            await _ensure_sql_synced(db)
+            rows = await optimizer.get_knowledge_files_by_agent_name(db, agent_id)
+            kb_files = [
+                {
+                    "path": row.file_path,
+                    "name": Path(row.file_path).name,
+                    "category": Path(row.file_path).parent.name,
+                    "size": row.size,
+                    "modified": row.modified.isoformat() if row.modified else None
+                }
+                for row in rows
+            ]
+        else:
+            # Off the event loop; the two directory walks run concurrently
+            kb_files = await call_cached(_scan_agent_knowledge, dir_name)
 
         return {
             "agent_id": agent_id,
@@ -550,63 +672,26 @@ async def get_agent_knowledge(request: Request, agent_id: str):
 
 
 @router.get("/{agent_id}/hierarchy")
-async def get_agent_hierarchy(request: Request, agent_id: str):
+async def get_agent_hierarchy(request: Request, response: Response, agent_id: str):
     """Get the full hierarchy for an agent (parent and children)"""
     try:
-        l1_agents = load_l1_agents()
-        l2_agents = load_l2_agents()
-        l3_agents = load_l3_agents()
-
-        all_agents = l1_agents + l2_agents + l3_agents
+        registry = await load_agent_registry()
+        cached_response = not_modified(request, response, registry.version)
+        if cached_response:
+            return cached_response
 
         # Find the agent
-        agent = next((a for a in all_agents if a.get('id') == agent_id), None)
+        agent = registry.get(agent_id)
 
         if not agent:
             UserFriendlyError.not_found("Agent", agent_id)
 
-        hierarchy = {
+        # Parent: L1 of an L2, L2 of an L3; children: L2s of an L1, L3s of an L2
+        return {
             "agent": agent,
-            "parent": None,
-            "children": []
+            "parent": registry.parent_of(agent_id),
+            "children": registry.children_of(agent_id)
         }
-
-        level = agent.get('level')
-
-        # Get parent and children based on level
-        if level == 'L2':
-            # Find L1 parent
-            parent_l1_num = agent.get('parent_l1')
-            if parent_l1_num:
-                hierarchy['parent'] = next(
-                    (a for a in l1_agents if parent_l1_num in a.get('id', '')),
-                    None
-                )
-
-            # Find L3 children
-            hierarchy['children'] = [
-                a for a in l3_agents
-                if a.get('parent_l2') == agent_id
-            ]
-
-        elif level == 'L3':
-            # Find L2 parent
-            parent_l2_id = agent.get('parent_l2')
-            if parent_l2_id:
-                hierarchy['parent'] = next(
-                    (a for a in l2_agents if a.get('id') == parent_l2_id),
-                    None
-                )
-
-        elif level == 'L1':
-            # Find L2 children
-            l1_num = agent_id.split('_')[0]
-            hierarchy['children'] = [
-                a for a in l2_agents
-                if a.get('parent_l1') == l1_num
-            ]
-
-        return hierarchy
     except HTTPException:
         raise
     except Exception as e:
@@ -619,10 +704,12 @@ async def get_agent_hierarchy(request: Request, agent_id: str):
 async def invalidate_agents_cache(request: Request, ):
     """Invalidate all agents cache"""
     try:
-        # Invalidate function caches
+        # Invalidate function caches (per-file L1 parses too, or reloads reuse them)
+        parse_agent_markdown.invalidate()
         load_l1_agents.invalidate()
         load_l2_agents.invalidate()
         load_l3_agents.invalidate()
+        scan_all_agent_knowledge.invalidate()
 
         # Also clear global cache
         agents_cache.clear()
@@ -640,11 +727,18 @@ async def invalidate_agents_cache(request: Request, ):
 async def get_cache_stats(request: Request, ):
     """Get cache statistics"""
     try:
+        registry = current_agent_registry()
         return {
             "l1_agents": load_l1_agents.cache.get_stats(),
             "l2_agents": load_l2_agents.cache.get_stats(),
             "l3_agents": load_l3_agents.cache.get_stats(),
             "global_cache": agents_cache.get_stats(),
+            "search_index": registry.search_index.get_stats() if registry is not None else None,
+            "sql_sync": agent_sync.get_status(),
+            "incremental_parse": {
+                "l2_agents": l2_document.get_stats(),
+                "l3_agents": l3_document.get_stats()
+            },
             "ttl_seconds": 300
         }
     except Exception as e:
@@ -3,28 +3,56 @@ Cache Management API
 Centralized cache control for the Control Center backend
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from datetime import datetime
+from typing import Callable, Dict, Optional
 import sys
 from pathlib import Path
 
 # Add parent directory to path for utils import
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.cache import SimpleCache
+from utils.cache import get_cached_functions, get_named_caches
+from utils.disk_cache import parse_cache
 
 router = APIRouter(prefix="/api/cache", tags=["cache"])
 
 
+def _stats_name(func: Callable) -> str:
+    """Short name of a cached function: load_l1_agents -> l1_agents, scan_kb_files -> kb_files"""
+    name = func.__name__
+    for prefix in ("load_", "scan_"):
+        if name.startswith(prefix):
+            return name[len(prefix):]
+    return name
+
+
+def _cache_groups() -> Dict[str, Dict[str, Callable]]:
+    """Every @cached function, grouped by module (agents, knowledge, projects, ...)"""
+    groups: Dict[str, Dict[str, Callable]] = {}
+    for func in get_cached_functions().values():
+        groups.setdefault(func.__module__.rsplit(".", 1)[-1], {})[_stats_name(func)] = func
+    return groups
+
+
+def _invalidate_group(group: str, functions: Dict[str, Callable]):
+    """Clear a module's @cached functions and its module-wide cache (agents_cache, kb_cache)"""
+    for func in functions.values():
+        func.invalidate()
+    module_cache = get_named_caches().get(group)
+    if module_cache is not None:
+        module_cache.clear()
+
+
 @router.post("/invalidate")
 async def invalidate_all_caches():
     """
     Invalidate all caches across the Control Center backend
 
-    This endpoint clears all cached data for:
-    - Agents (L1, L2, L3)
+    This endpoint clears every @cached function, including:
+    - Agents (L1, L2, L3, parsed L1 files, agent knowledge)
     - Knowledge Base files
     - Creator database
-    - Usage statistics
+    - Projects
 
     Use this after:
     - Adding new agent files
@@ -35,26 +63,16 @@ async def invalidate_all_caches():
     try:
         invalidated = []
 
-        # Import and invalidate agents cache
-        try:
-            from api.agents import load_l1_agents, load_l2_agents, load_l3_agents, agents_cache
-            load_l1_agents.invalidate()
-            load_l2_agents.invalidate()
-            load_l3_agents.invalidate()
-            agents_cache.clear()
-            invalidated.append("agents")
-        except Exception as e:
-            invalidated.append(f"agents (error: {str(e)})")
+        for group, functions in sorted(_cache_groups().items()):
+            try:
+                _invalidate_group(group, functions)
+                invalidated.append(group)
+            except Exception as e:
+                invalidated.append(f"{group} (error: {str(e)})")
 
-        # Import and invalidate knowledge cache
-        try:
-            from api.knowledge import load_creator_database, scan_kb_files, kb_cache
-            load_creator_database.invalidate()
-            scan_kb_files.invalidate()
-            kb_cache.clear()
-            invalidated.append("knowledge")
-        except Exception as e:
-            invalidated.append(f"knowledge (error: {str(e)})")
+        # Drop persisted parse results so the next load re-reads every file
+        parse_cache.clear()
+        invalidated.append("disk_tier")
 
         return {
             "status": "success",
@@ -70,12 +88,7 @@ async def invalidate_all_caches():
 async def invalidate_agents_cache():
     """Invalidate only agents cache"""
     try:
-        from api.agents import load_l1_agents, load_l2_agents, load_l3_agents, agents_cache
-
-        load_l1_agents.invalidate()
-        load_l2_agents.invalidate()
-        load_l3_agents.invalidate()
-        agents_cache.clear()
+        _invalidate_group("agents", _cache_groups().get("agents", {}))
 
         return {
             "status": "success",
@@ -90,11 +103,7 @@ async def invalidate_agents_cache():
 async def invalidate_knowledge_cache():
     """Invalidate only knowledge base cache"""
     try:
-        from api.knowledge import load_creator_database, scan_kb_files, kb_cache
-
-        load_creator_database.invalidate()
-        scan_kb_files.invalidate()
-        kb_cache.clear()
+        _invalidate_group("knowledge", _cache_groups().get("knowledge", {}))
 
         return {
             "status": "success",
@@ -105,12 +114,92 @@ async def invalidate_knowledge_cache():
         raise HTTPException(status_code=500, detail=f"Error invalidating knowledge cache: {str(e)}")
 
 
+@router.post("/invalidate/tag")
+async def invalidate_cache_tag(
+    pattern: str = Query(..., min_length=1, max_length=200, description="Tag or pattern, e.g. agent:L2.3.* or kb:art-director")
+):
+    """
+    Invalidate only the cache entries tagged with a matching tag
+
+    Tags in use:
+    - agent:L1 / agent:L2 / agent:L3 - agent lists by level
+    - agent:<id> - e.g. agent:01_art_director, agent:L2.3.1, agent:L3.3.1.2
+    - kb:<agent-dir> - KB file index, e.g. kb:art-director
+    - kb:files, kb:creator-database, kb:agent-knowledge
+    - projects - project listing
+
+    Other workers drop their copies too when a shared cache backend is configured.
+    """
+    try:
+        from utils.cache import invalidate_tags
+
+        removed = invalidate_tags(pattern)
+
+        return {
+            "status": "success",
+            "pattern": pattern,
+            "invalidated": removed,
+            "total": sum(removed.values()),
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error invalidating tag: {str(e)}")
+
+
+@router.post("/invalidate/key")
+async def invalidate_cache_key(
+    cache: str = Query(..., min_length=1, description="Cache name (see GET /api/cache/entries)"),
+    key: str = Query(..., min_length=1, description="Cache key")
+):
+    """Invalidate a single cache entry"""
+    target = get_named_caches().get(cache)
+    if target is None:
+        raise HTTPException(status_code=404, detail=f"Cache '{cache}' not found")
+
+    try:
+        target.invalidate(key)
+
+        return {
+            "status": "success",
+            "cache": cache,
+            "key": key,
+            "timestamp": datetime.now().isoformat()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error invalidating key: {str(e)}")
+
+
+@router.get("/entries")
+async def get_cache_entries(
+    cache: Optional[str] = Query(None, description="Only list this cache"),
+    limit: int = Query(50, ge=1, le=1000, description="Entries per cache")
+):
+    """
+    List cache names, keys and tags
+
+    Use the returned names and keys with /invalidate/key, and the tags with /invalidate/tag.
+    """
+    caches = get_named_caches()
+    if cache is not None:
+        if cache not in caches:
+            raise HTTPException(status_code=404, detail=f"Cache '{cache}' not found")
+        caches = {cache: caches[cache]}
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "caches": {
+            name: target.entries(limit=limit)
+            for name, target in sorted(caches.items())
+        }
+    }
+
+
 @router.get("/stats")
 async def get_all_cache_stats():
     """
     Get statistics for all caches
 
-    Returns cache hit rates, sizes, and TTL information
+    Returns cache hit rates, sizes, evictions, loader latency and TTL information
     """
     try:
         stats = {
@@ -118,28 +207,74 @@ async def get_all_cache_stats():
             "caches": {}
         }
 
-        # Agents cache stats
+        # Every @cached function, per module, plus the module-wide cache
+        named = get_named_caches()
+        for group, functions in sorted(_cache_groups().items()):
+            try:
+                group_stats = {name: func.cache.get_stats() for name, func in sorted(functions.items())}
+                if group in named:
+                    group_stats["global"] = named[group].get_stats()
+                stats["caches"][group] = group_stats
+            except Exception as e:
+                stats["caches"][group] = {"error": str(e)}
+
+        # Shared backend (Redis when running several workers)
         try:
-            from api.agents import load_l1_agents, load_l2_agents, load_l3_agents, agents_cache
-            stats["caches"]["agents"] = {
-                "l1_agents": load_l1_agents.cache.get_stats(),
-                "l2_agents": load_l2_agents.cache.get_stats(),
-                "l3_agents": load_l3_agents.cache.get_stats(),
-                "global": agents_cache.get_stats()
-            }
+            from utils.cache import get_cache_backend
+            stats["backend"] = get_cache_backend().get_stats()
         except Exception as e:
-            stats["caches"]["agents"] = {"error": str(e)}
+            stats["backend"] = {"error": str(e)}
 
-        # Knowledge cache stats
+        # Persistent parse tier (survives restarts)
         try:
-            from api.knowledge import load_creator_database, scan_kb_files, kb_cache
-            stats["caches"]["knowledge"] = {
-                "creator_database": load_creator_database.cache.get_stats(),
-                "kb_files": scan_kb_files.cache.get_stats(),
-                "global": kb_cache.get_stats()
-            }
+            stats["disk_tier"] = parse_cache.get_stats()
         except Exception as e:
-            stats["caches"]["knowledge"] = {"error": str(e)}
+            stats["disk_tier"] = {"error": str(e)}
+
+        # Startup warm-up progress
+        try:
+            from services.cache_warmer import cache_warmer
+            stats["warmup"] = cache_warmer.get_status()
+        except Exception as e:
+            stats["warmup"] = {"error": str(e)}
+
+        # File watcher driving event-based invalidation
+        try:
+            from services.cache_watcher import cache_watcher
+            stats["watcher"] = cache_watcher.get_status()
+        except Exception as e:
+            stats["watcher"] = {"error": str(e)}
+
+        # Aggregate hit/miss counters across every cache
+        hits = 0
+        misses = 0
+        for group in stats["caches"].values():
+            for cache_stats in group.values():
+                if isinstance(cache_stats, dict):
+                    hits += cache_stats.get("hits", 0)
+                    misses += cache_stats.get("misses", 0)
+
+        # Memory footprint of every named cache (approximate, sampled deep sizeof)
+        from utils.cache import get_memory_budget, total_cache_bytes
+        budget = get_memory_budget()
+        total_bytes = total_cache_bytes()
+        stats["memory"] = {
+            "approx_bytes": total_bytes,
+            "approx_mb": round(total_bytes / (1024 * 1024), 2),
+            "budget_bytes": budget,
+            "budget_used_percent": round(total_bytes / budget * 100, 1) if budget else None,
+            "by_cache": {
+                name: cache.approx_bytes
+                for name, cache in sorted(named.items(), key=lambda item: -item[1].approx_bytes)
+            }
+        }
+
+        stats["summary"] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "approx_bytes": total_bytes
+        }
 
         return stats
     except Exception as e:
@@ -151,7 +286,7 @@ async def check_cache_health():
     """
     Check cache system health
 
-    Returns information about cache effectiveness and recommendations
+    Returns measured hit rates, eviction counts and recommendations
     """
     try:
         health = {
@@ -162,20 +297,18 @@ async def check_cache_health():
 
         # Get all cache stats
         try:
-            from api.agents import load_l1_agents, load_l2_agents, load_l3_agents
-            from api.knowledge import load_creator_database, scan_kb_files
-
             caches = [
-                ("L1 Agents", load_l1_agents.cache),
-                ("L2 Agents", load_l2_agents.cache),
-                ("L3 Agents", load_l3_agents.cache),
-                ("Creator DB", load_creator_database.cache),
-                ("KB Files", scan_kb_files.cache)
+                (f"{group}.{name}", func.cache)
+                for group, functions in sorted(_cache_groups().items())
+                for name, func in sorted(functions.items())
             ]
 
             cache_info = []
             total_expired = 0
             total_active = 0
+            total_hits = 0
+            total_misses = 0
+            total_evictions = 0
 
             for name, cache in caches:
                 stats = cache.get_stats()
@@ -185,26 +318,42 @@ async def check_cache_health():
                 })
                 total_expired += stats["expired_entries"]
                 total_active += stats["active_entries"]
+                total_hits += stats["hits"]
+                total_misses += stats["misses"]
+                total_evictions += stats["evictions"]
+
+                if stats["evictions"] > 0:
+                    health["recommendations"].append(
+                        f"{name} cache is evicting entries (max {stats['max_entries']}). "
+                        "Consider raising its maxsize."
+                    )
+
+            lookups = total_hits + total_misses
+            hit_rate = round(total_hits / lookups, 4) if lookups else 0.0
 
             health["cache_info"] = cache_info
             health["total_expired"] = total_expired
             health["total_active"] = total_active
+            health["total_hits"] = total_hits
+            health["total_misses"] = total_misses
+            health["total_evictions"] = total_evictions
+            health["hit_rate"] = hit_rate
 
             # Recommendations
-            if total_expired > total_active:
+            if lookups == 0:
                 health["recommendations"].append(
-                    "High number of expired entries detected. Consider invalidating caches manually."
+                    "No cache lookups recorded yet. Caches will populate on first request."
                 )
-
-            if total_active == 0:
+            elif hit_rate < 0.5:
+                health["status"] = "degraded"
                 health["recommendations"].append(
-                    "No active cache entries. Caches will populate on first request."
+                    f"Low cache hit rate ({hit_rate:.0%}). Data is being reloaded more often than reused; "
+                    "check for frequent invalidations or a TTL that is too short."
                 )
-
-            if total_active > 10:
+            elif hit_rate >= 0.8:
                 health["status"] = "optimal"
                 health["recommendations"].append(
-                    "Caches are being utilized effectively. Performance should be improved."
+                    f"Caches are being utilized effectively ({hit_rate:.0%} hit rate)."
                 )
 
         except Exception as e:
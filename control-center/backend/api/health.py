@@ -1,5 +1,6 @@
 """Health check endpoints for monitoring and orchestration."""
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
 from datetime import datetime
 import psutil
 import sys
@@ -81,14 +82,18 @@ async def readiness_check():
     """Readiness check - verifies all dependencies are available.
 
     Kubernetes readiness probe. Returns 200 only when service is ready
-    to accept traffic.
+    to accept traffic. While the startup cache warm-up is running, responds
+    503 with its progress so load balancers keep routing elsewhere.
 
     Returns:
-        dict: Readiness status and component checks
+        dict: Readiness status, component checks and warm-up progress
     """
+    from services.cache_warmer import cache_warmer
+
     checks = {
         "service": True,      # Service is running
-        "system": True        # System resources available
+        "system": True,       # System resources available
+        "cache_warmup": cache_warmer.ready  # Startup warm-up finished (or disabled)
     }
 
     # Verify system resources are not critically low
@@ -104,13 +109,18 @@ async def readiness_check():
 
     all_ready = all(checks.values())
 
-    return {
+    body = {
         "ready": all_ready,
         "status": "ready" if all_ready else "not_ready",
         "checks": checks,
+        "warmup": cache_warmer.get_status(),
         "timestamp": datetime.now().isoformat()
     }
 
+    if not all_ready:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
 
 @router.get("/live")
 async def liveness_check():
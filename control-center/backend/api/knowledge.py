@@ -5,13 +5,12 @@ Connects Control Center to the Knowledge Base system
 PERFORMANCE OPTIMIZED VERSION WITH CACHING
 """
 
-from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from typing import List, Dict, Optional, Literal
 from datetime import datetime
 import json
 import os
 from pathlib import Path
-import glob
 import subprocess
 import sys
 import re
@@ -19,10 +18,15 @@ import re
 # Add parent directory to path for utils import
 from middleware.rate_limit import limiter
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.cache import SimpleCache, cached
+from utils.cache import SimpleCache, cached, call_cached
 from utils.errors import UserFriendlyError, handle_file_error
+from utils.etag import generation_version, not_modified
 from utils.pagination import paginate_list, PaginationParams
 from utils.performance import track_performance, QueryTimer
+from services.kb_catalog import CatalogFile, kb_catalog, listing_info
+from services.kb_insights import kb_insights
+from services.kb_search_index import kb_search_index
+from services.kb_semantic_index import kb_semantic_index
 
 router = APIRouter(prefix="/api/knowledge", tags=["knowledge"])
 
@@ -32,11 +36,23 @@ CREATOR_DB = KB_ROOT / "metadata" / "creator-database.json"
 AI_AGENTS_ROOT = Path("C:/meowping-rts/ai-agents")
 MANAGE_PY = KB_ROOT / "manage.py"
 
+# Agent directories under AI_AGENTS_ROOT/ai-agents
+KB_AGENT_DIRS = [
+    "art-director",
+    "character-pipeline",
+    "environment-pipeline",
+    "game-systems",
+    "ui-ux",
+    "content-designer",
+    "integration",
+    "qa-testing"
+]
+
 # Global cache instance (5 minute TTL)
-kb_cache = SimpleCache(ttl=300)
+kb_cache = SimpleCache(ttl=300, name="knowledge")
 
 
-@cached(ttl=300)  # Cache for 5 minutes
+@cached(ttl=300, stale_while_revalidate=True, tags=["kb:creator-database"])  # Cache for 5 minutes, refresh in background
 def load_creator_database() -> Dict:
     """Load the creator database JSON (CACHED)"""
     try:
@@ -50,112 +66,51 @@ def load_creator_database() -> Dict:
         }
 
 
-@cached(ttl=300)  # Cache for 5 minutes
+def _kb_file_tags(kb_files: List[Dict]) -> List[str]:
+    """
+    Tag the KB file index by every directory it scans (e.g. kb:art-director)
+
+    Scanned directories are tagged even while empty, so a file created in
+    one still invalidates the index.
+    """
+    return ["kb:files", "kb:knowledge-base"] + [f"kb:{agent_dir}" for agent_dir in KB_AGENT_DIRS]
+
+
+@cached(ttl=300, stale_while_revalidate=True, tags=_kb_file_tags)  # Cache for 5 minutes, refresh in background
 def scan_kb_files() -> List[Dict]:
-    """Scan all markdown files in the knowledge base (CACHED)"""
+    """
+    List all markdown files in the knowledge base (CACHED)
+
+    Walks the KB catalog, which only re-lists directories whose mtime changed.
+    """
     kb_files = []
 
     # Scan ai-agents subdirectories
-    agent_dirs = [
-        "art-director",
-        "character-pipeline",
-        "environment-pipeline",
-        "game-systems",
-        "ui-ux",
-        "content-designer",
-        "integration",
-        "qa-testing"
-    ]
-
-    for agent_dir in agent_dirs:
-        pattern = str(AI_AGENTS_ROOT / "ai-agents" / agent_dir / "**" / "*.md")
-        files = glob.glob(pattern, recursive=True)
-
-        for file_path in files:
-            try:
-                stat = os.stat(file_path)
-                kb_files.append({
-                    "path": file_path,
-                    "name": os.path.basename(file_path),
-                    "agent": agent_dir,
-                    "size": stat.st_size,
-                    "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                    "category": Path(file_path).parent.name
-                })
-            except Exception:
-                continue
+    for agent_dir in KB_AGENT_DIRS:
+        for entry in kb_catalog.walk(AI_AGENTS_ROOT / "ai-agents" / agent_dir, suffix=".md"):
+            kb_files.append(listing_info(entry, agent_dir))
 
     # Also scan L1 knowledge base directories
-    pattern = str(KB_ROOT / "L1-*" / "**" / "*.md")
-    files = glob.glob(pattern, recursive=True)
-
-    for file_path in files:
-        try:
-            stat = os.stat(file_path)
-            kb_files.append({
-                "path": file_path,
-                "name": os.path.basename(file_path),
-                "agent": "knowledge-base",
-                "size": stat.st_size,
-                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                "category": Path(file_path).parts[-2] if len(Path(file_path).parts) > 1 else "root"
-            })
-        except Exception:
-            continue
+    for l1_dir in kb_catalog.subdirectories(KB_ROOT, prefix="L1-"):
+        for entry in kb_catalog.walk(l1_dir, suffix=".md"):
+            kb_files.append(listing_info(entry, "knowledge-base"))
 
     return kb_files
 
 
-def parse_markdown_insights(file_path: str) -> Dict:
-    """Parse a markdown file for key insights"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Extract basic metadata
-        lines = content.split('\n')
-        title = lines[0].strip('# ').strip() if lines else "Untitled"
-
-        # Count sections (## headers)
-        sections = len([l for l in lines if l.startswith('## ')])
-
-        # Word count
-        word_count = len(content.split())
-
-        # Look for confidence scores in the content
-        confidence = None
-        for line in lines:
-            if 'confidence' in line.lower() and '%' in line:
-                try:
-                    # Try to extract percentage
-                    import re
-                    match = re.search(r'(\d+)%', line)
-                    if match:
-                        confidence = int(match.group(1))
-                except:
-                    pass
-
-        return {
-            "title": title,
-            "sections": sections,
-            "word_count": word_count,
-            "confidence": confidence,
-            "has_code": "```" in content,
-            "has_links": "http" in content or "www." in content
-        }
-    except Exception as e:
-        return {"error": str(e)}
-
-
 @router.get("/recent")
 @limiter.limit("60/minute")
 async def get_recent_kb_files(
     request: Request,
+    response: Response,
     limit: int = Query(10, ge=1, le=100, description="Number of recent files to return")
 ):
     """Get recently modified knowledge base files (CACHED)"""
     try:
-        kb_files = scan_kb_files()
+        kb_files = await call_cached(scan_kb_files)
+        cached_response = not_modified(request, response, generation_version(kb_files))
+        if cached_response:
+            return cached_response
 
         # Sort by modified date (most recent first)
         sorted_files = sorted(
@@ -167,9 +122,15 @@ async def get_recent_kb_files(
         # Return only the requested number
         recent_files = sorted_files[:limit]
 
+        # Insights come from the content-hash store; only files that are new
+        # or changed since they were last extracted are read
+        entries = [kb_catalog.entry(f.get('path', '')) for f in recent_files]
+        cataloged = [entry for entry in entries if entry is not None]
+        extracted = iter(await call_cached(kb_insights.get_many, cataloged) if cataloged else [])
+
         # Ensure each file has required fields with proper format
         formatted_files = []
-        for idx, file in enumerate(recent_files):
+        for idx, (file, entry) in enumerate(zip(recent_files, entries)):
             formatted_files.append({
                 "id": str(idx + 1),  # Use index as ID
                 "name": file.get('name', 'Unknown'),
@@ -177,7 +138,8 @@ async def get_recent_kb_files(
                 "modified": file.get('modified', datetime.now().isoformat()),
                 "size": file.get('size', 0),
                 "agent": file.get('agent', 'unknown'),
-                "category": file.get('category', 'general')
+                "category": file.get('category', 'general'),
+                "insights": next(extracted) if entry is not None else None
             })
 
         return {
@@ -190,11 +152,18 @@ async def get_recent_kb_files(
 
 
 @router.get("/stats")
-async def get_kb_stats():
+async def get_kb_stats(request: Request, response: Response):
     """Get overall knowledge base statistics (CACHED)"""
     try:
-        creator_db = load_creator_database()
-        kb_files = scan_kb_files()
+        creator_db = await call_cached(load_creator_database)
+        kb_files = await call_cached(scan_kb_files)
+        # The 7-day window moves daily, so the date is part of the version
+        cached_response = not_modified(
+            request, response,
+            generation_version(creator_db), generation_version(kb_files), datetime.now().date().isoformat()
+        )
+        if cached_response:
+            return cached_response
 
         # Calculate stats
         total_files = len(kb_files)
@@ -232,6 +201,8 @@ async def get_kb_stats():
 @router.get("/files")
 @track_performance(endpoint="GET /api/knowledge/files", query_type="file_scan")
 async def get_kb_files(
+    request: Request,
+    response: Response,
     agent: Optional[str] = None,
     category: Optional[str] = None,
     page: int = Query(1, ge=1, description="Page number"),
@@ -249,7 +220,10 @@ async def get_kb_files(
     """
     try:
         with QueryTimer("scan_kb_files"):
-            kb_files = scan_kb_files()
+            kb_files = await call_cached(scan_kb_files)
+        cached_response = not_modified(request, response, generation_version(kb_files))
+        if cached_response:
+            return cached_response
 
         # Filter by agent if specified
         if agent:
@@ -259,8 +233,8 @@ async def get_kb_files(
         if category:
             kb_files = [f for f in kb_files if f.get('category') == category]
 
-        # Sort by modified date (newest first)
-        kb_files.sort(key=lambda x: x.get('modified', ''), reverse=True)
+        # Sort by modified date (newest first); a new list, the cached scan is shared
+        kb_files = sorted(kb_files, key=lambda x: x.get('modified', ''), reverse=True)
 
         # Use new pagination utility
         params = PaginationParams(page=page, page_size=page_size, offset=offset)
@@ -275,7 +249,7 @@ async def get_kb_files(
 
 
 @router.get("/files/{file_id}")
-async def get_kb_file_details(file_id: str):
+async def get_kb_file_details(request: Request, response: Response, file_id: str):
     """Get detailed information about a specific KB file"""
     try:
         # Decode file_id (base64 encoded path)
@@ -306,21 +280,36 @@ async def get_kb_file_details(file_id: str):
         if not is_allowed:
             UserFriendlyError.forbidden("File path is outside allowed directories")
 
-        if not file_path.exists():
+        # One stat: the catalog may be up to a scan interval old
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
             UserFriendlyError.not_found("File")
+        cataloged = kb_catalog.entry(file_path)
+        entry = CatalogFile(
+            cataloged.path if cataloged is not None else str(file_path),
+            file_path.name, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns
+        )
+        if cataloged is not None and (cataloged.size, cataloged.mtime_ns) != (entry.size, entry.mtime_ns):
+            # Changed since the last walk: list its directory again next time
+            kb_catalog.mark_dirty(os.path.dirname(cataloged.path))
 
-        # Get file stats
-        stat = os.stat(file_path)
+        cached_response = not_modified(request, response, f"{entry.mtime_ns}:{entry.size}")
+        if cached_response:
+            return cached_response
 
-        # Parse insights
-        insights = parse_markdown_insights(str(file_path))
+        # Served from the store while size and mtime match what was extracted;
+        # otherwise the file is read (and only parsed if its content is new)
+        insights = kb_insights.peek(entry)
+        if insights is None:
+            insights = await call_cached(kb_insights.get, entry)
 
         return {
             "path": str(file_path),
             "name": file_path.name,
-            "size": stat.st_size,
-            "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-            "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            "size": entry.size,
+            "created": entry.created,
+            "modified": entry.modified,
             "insights": insights
         }
     except HTTPException:
@@ -331,13 +320,16 @@ async def get_kb_file_details(file_id: str):
 
 @router.get("/creators")
 @limiter.limit("60/minute")
-async def get_creators(request: Request, 
+async def get_creators(request: Request, response: Response,
     priority: Optional[str] = None,
     search: Optional[str] = None
 ):
     """List YouTube creators from the database (CACHED)"""
     try:
-        creator_db = load_creator_database()
+        creator_db = await call_cached(load_creator_database)
+        cached_response = not_modified(request, response, generation_version(creator_db))
+        if cached_response:
+            return cached_response
         creators = creator_db.get("creators", [])
 
         # Filter by priority
@@ -365,10 +357,14 @@ async def get_creators(request: Request,
 
 @router.get("/creators/{creator_id}")
 @limiter.limit("60/minute")
-async def get_creator_details(request: Request, creator_id: str):
+async def get_creator_details(request: Request, response: Response, creator_id: str):
     """Get detailed information about a specific creator"""
     try:
-        creator_db = load_creator_database()
+        creator_db = await call_cached(load_creator_database)
+        kb_files = await call_cached(scan_kb_files)
+        cached_response = not_modified(request, response, generation_version(creator_db), generation_version(kb_files))
+        if cached_response:
+            return cached_response
         creators = creator_db.get("creators", [])
 
         creator = next((c for c in creators if c.get('id') == creator_id), None)
@@ -377,7 +373,6 @@ async def get_creator_details(request: Request, creator_id: str):
             UserFriendlyError.not_found("Creator", creator_id)
 
         # Find related KB files (CACHED)
-        kb_files = scan_kb_files()
         creator_files = [
             f for f in kb_files
             if creator_id in f.get('name', '').lower() or creator_id in f.get('path', '').lower()
@@ -546,6 +541,7 @@ async def get_scan_jobs(request: Request, ):
 @limiter.limit("30/minute")
 async def search_knowledge(
     request: Request,
+    response: Response,
     query: str = Query(
         ...,
         min_length=2,
@@ -574,7 +570,7 @@ async def search_knowledge(
     - Limit: 1-100 results
 
     **Returns:**
-    - Matching files with preview and match count
+    - Matching files ranked by BM25, with a snippet preview, match count and score
     """
     try:
         # Normalize query
@@ -592,47 +588,107 @@ async def search_knowledge(
                     "hyphens, and underscores"
                 )
 
-        kb_files = scan_kb_files()
+        kb_files = await call_cached(scan_kb_files)
+        # File sizes and mtimes are in the scan, so edited files change the version
+        cached_response = not_modified(request, response, generation_version(kb_files))
+        if cached_response:
+            return cached_response
+
+        # Index only the files added or changed since the last scan, then
+        # search the whole corpus without opening any of them
+        await call_cached(kb_search_index.ensure_current, kb_files)
+        results, total = await call_cached(kb_search_index.search, query, agent=agent, limit=limit)
+
+        return {
+            "query": query,
+            "total_matches": total,
+            "results": results
+        }
+    except ValueError as e:
+        UserFriendlyError.validation_error(str(e), field="query" if "query" in str(e) else "agent")
+    except Exception as e:
+        UserFriendlyError.handle_error(e, context=f"searching knowledge base for '{query}'", status_code=500)
+
+
+@router.get("/semantic-search")
+@limiter.limit("30/minute")
+async def semantic_search_knowledge(
+    request: Request,
+    response: Response,
+    query: str = Query(
+        ...,
+        min_length=2,
+        max_length=500,
+        description="Search query"
+    ),
+    agent: Optional[str] = Query(
+        default=None,
+        max_length=100,
+        description="Filter by specific agent",
+        pattern=r'^[a-zA-Z0-9_-]*$'
+    ),
+    limit: int = Query(
+        default=10,
+        ge=1,
+        le=50,
+        description="Maximum number of results"
+    )
+):
+    """
+    Find knowledge base files related to a query by meaning.
+
+    Files are split into chunks and embedded with a local model (or a hashing
+    vectorizer when none is configured); each result is a file with its
+    best-matching chunk.
+
+    **Validation:**
+    - Query: 2-500 characters
+    - Agent filter: Optional, alphanumeric with hyphens/underscores
+    - Limit: 1-50 results
+
+    **Returns:**
+    - Files ranked by cosine similarity, with the matching section heading and preview
+    """
+    try:
+        query = ' '.join(query.split())
+
+        if len(query) < 2:
+            raise ValueError("Search query must be at least 2 characters")
 
         if agent:
-            kb_files = [f for f in kb_files if f.get('agent') == agent]
+            agent = agent.lower().strip()
 
-        query_lower = query.lower()
-        matches = []
+        if not kb_semantic_index.available:
+            UserFriendlyError.service_unavailable("semantic search (numpy is not installed)")
 
-        for file_info in kb_files[:200]:  # Limit files to search
-            try:
-                with open(file_info['path'], 'r', encoding='utf-8') as f:
-                    content = f.read()
+        # Walks the KB catalog, whose change events queue files for embedding
+        kb_files = await call_cached(scan_kb_files)
+        await call_cached(kb_semantic_index.refresh)
 
-                if query_lower in content.lower():
-                    # Find context around match
-                    lines = content.split('\n')
-                    matching_lines = [
-                        (i, line) for i, line in enumerate(lines)
-                        if query_lower in line.lower()
-                    ]
-
-                    matches.append({
-                        **file_info,
-                        "match_count": len(matching_lines),
-                        "preview": matching_lines[0][1][:200] if matching_lines else ""
-                    })
-            except Exception:
-                continue
+        cached_response = not_modified(
+            request, response, generation_version(kb_files), kb_semantic_index.embedder_name
+        )
+        if cached_response:
+            return cached_response
 
-        # Sort by match count
-        matches.sort(key=lambda x: x.get('match_count', 0), reverse=True)
+        listed = {f['path']: f for f in kb_files if not agent or f.get('agent') == agent}
+        matches = await call_cached(kb_semantic_index.search, query, limit=limit, paths=set(listed))
 
         return {
             "query": query,
+            "embedder": kb_semantic_index.embedder_name,
             "total_matches": len(matches),
-            "results": matches[:limit]
+            "results": [
+                {**listed[match['path']], **match}
+                for match in matches
+            ]
         }
+    except HTTPException:
+        raise
     except ValueError as e:
-        UserFriendlyError.validation_error(str(e), field="query" if "query" in str(e) else "agent")
+        UserFriendlyError.validation_error(str(e), field="query")
     except Exception as e:
-        UserFriendlyError.handle_error(e, context=f"searching knowledge base for '{query}'", status_code=500)
+        UserFriendlyError.handle_error(e, context=f"semantic search for '{query}'", status_code=500)
 
 
 # Cache management endpoints
@@ -664,6 +720,10 @@ async def get_kb_cache_stats():
             "creator_database": load_creator_database.cache.get_stats(),
             "kb_files": scan_kb_files.cache.get_stats(),
             "global_cache": kb_cache.get_stats(),
+            "catalog": kb_catalog.get_stats(),
+            "search_index": kb_search_index.get_stats(),
+            "semantic_index": kb_semantic_index.get_stats(),
+            "insights": kb_insights.get_stats(),
             "ttl_seconds": 300
         }
     except Exception as e:
@@ -4,6 +4,7 @@ Monitor git repositories and project status
 """
 
 from fastapi import APIRouter, HTTPException, Query, Request, Path as PathParam
+import asyncio
 from typing import List, Dict, Optional
 from datetime import datetime
 import subprocess
@@ -11,8 +12,10 @@ import os
 from pathlib import Path
 import json
 from middleware.rate_limit import limiter
+from utils.cache import cached, call_cached, get_loader_executor
 from utils.errors import UserFriendlyError, handle_file_error
 from utils.pagination import paginate_list, PaginationParams
+from utils.parallel import parallel_map
 from utils.performance import track_performance
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
@@ -131,8 +134,15 @@ def get_git_status(repo_path: Path) -> Dict:
     return status
 
 
-def scan_project(path: Path) -> Optional[Dict]:
-    """Scan a directory and gather project information"""
+def scan_project(path: Path, include_git: bool = True) -> Optional[Dict]:
+    """
+    Scan a directory and gather project information
+
+    Args:
+        path: Project directory
+        include_git: Also read the git status (changes outside this app, so
+            cached scans leave it out)
+    """
     if not path.exists():
         return None
 
@@ -143,8 +153,8 @@ def scan_project(path: Path) -> Optional[Dict]:
     }
 
     # Check if it's a git repo
-    git_status = get_git_status(path)
-    project["git"] = git_status
+    if include_git:
+        project["git"] = get_git_status(path)
 
     # Count files
     try:
@@ -196,6 +206,25 @@ def scan_project(path: Path) -> Optional[Dict]:
     return project
 
 
+@cached(ttl=60, stale_while_revalidate=True, tags=["projects"])  # Cache for 1 minute, refresh in background
+def scan_all_projects() -> List[Dict]:
+    """Scan every monitored project directory, without git status (CACHED)"""
+    projects = []
+
+    for project_dir in PROJECT_DIRS:
+        project = scan_project(project_dir, include_git=False)
+        if project:
+            projects.append(project)
+
+    return projects
+
+
+def with_git_status(projects: List[Dict]) -> List[Dict]:
+    """Copies of scanned projects with their current git status, read concurrently"""
+    statuses = parallel_map(get_git_status, [Path(project["path"]) for project in projects])
+    return [dict(project, git=status) for project, status in zip(projects, statuses)]
+
+
 @router.get("")
 @limiter.limit("60/minute")
 @track_performance(endpoint="GET /api/projects", query_type="project_scan")
@@ -213,19 +242,19 @@ async def list_projects(
     - **offset**: Alternative to page - start offset
     """
     try:
-        projects = []
-
-        for project_dir in PROJECT_DIRS:
-            project = scan_project(project_dir)
-            if project:
-                projects.append(project)
+        projects = await call_cached(scan_all_projects)
 
         # Use pagination utility
         params = PaginationParams(page=page, page_size=page_size, offset=offset)
-        result = paginate_list(projects, params, cached=False)
+        result = paginate_list(projects, params, cached=True)
+
+        # File counts and sizes come from the cache; git status is read fresh
+        # for the returned page, off the event loop
+        loop = asyncio.get_running_loop()
+        page_projects = await loop.run_in_executor(get_loader_executor(), with_git_status, result.pop('items'))
 
         # Rename 'items' to 'projects' for backward compatibility
-        result['projects'] = result.pop('items')
+        result['projects'] = page_projects
         result['total'] = result['meta']['total']
 
         return result
@@ -0,0 +1,256 @@
+"""
+Benchmark the agent markdown parser
+
+Parses the full L1/L2/L3 agent corpus with the previous multi-pass parsers
+and with the single-pass parser in services/markdown_parser.py, checks that
+both produce the same agents, and reports the speedup.
+
+Usage:
+    python benchmark_agent_parser.py [--root C:/Ziggie/ai-agents] [--iterations 20]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# Run from the backend directory (the script's directory is on sys.path)
+from services.markdown_parser import parse_agent_document, parse_sub_agents, parse_micro_agents
+
+
+DEFAULT_ROOTS = [
+    Path("C:/Ziggie/ai-agents"),
+    Path(__file__).resolve().parents[2] / "ai-agents"
+]
+
+
+# ---------------------------------------------------------------------------
+# Previous multi-pass parsers (api/agents.py), kept here as the baseline
+# ---------------------------------------------------------------------------
+
+def legacy_parse_l1(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    lines = content.split('\n')
+
+    title = ""
+    for line in lines:
+        if line.startswith('# '):
+            title = line.strip('# ').strip()
+            break
+
+    role = ""
+    for i, line in enumerate(lines):
+        if line.startswith('## ROLE') or line.startswith('## Role'):
+            if i + 1 < len(lines):
+                role = lines[i + 1].strip()
+            break
+
+    objective = ""
+    for i, line in enumerate(lines):
+        if line.startswith('## PRIMARY OBJECTIVE') or line.startswith('## Primary Objective'):
+            if i + 1 < len(lines):
+                objective = lines[i + 1].strip()
+            break
+
+    responsibilities = []
+    in_responsibilities = False
+    for line in lines:
+        if 'CORE RESPONSIBILITIES' in line or 'RESPONSIBILITIES' in line:
+            in_responsibilities = True
+            continue
+        if in_responsibilities and line.startswith('## '):
+            if 'RESPONSIBILITIES' not in line:
+                break
+        if in_responsibilities and line.startswith('### '):
+            responsibilities.append(line.strip('# ').strip())
+
+    permissions = {"read_write": [], "read_only": []}
+    in_permissions = False
+    current_perm_type = None
+    for line in lines:
+        if 'ACCESS PERMISSIONS' in line:
+            in_permissions = True
+            continue
+        if in_permissions:
+            if line.startswith('## '):
+                break
+            if 'Read/Write' in line or 'Read-Write' in line:
+                current_perm_type = "read_write"
+            elif 'Read-Only' in line or 'Read Only' in line:
+                current_perm_type = "read_only"
+            elif line.strip().startswith('-') and current_perm_type:
+                path = line.strip('- ').strip()
+                if path:
+                    permissions[current_perm_type].append(path)
+
+    tools = []
+    in_tools = False
+    for line in lines:
+        if 'TOOLS' in line and 'REFERENCES' in line:
+            in_tools = True
+            continue
+        if in_tools:
+            if line.startswith('## '):
+                break
+            if line.startswith('### '):
+                tools.append(line.strip('# ').strip())
+
+    return {
+        "title": title,
+        "role": role,
+        "objective": objective,
+        "responsibilities": responsibilities,
+        "permissions": permissions,
+        "tools": tools,
+        "has_content": len(content) > 0,
+        "word_count": len(content.split()),
+        "sections": len([line for line in lines if line.startswith('## ')])
+    }
+
+
+def legacy_parse_l2(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        lines = f.read().split('\n')
+
+    pattern = re.compile(r'###\s+Sub-Agent\s+(\d+)\.(\d+):\s+\*\*(.+?)\*\*')
+    agents = []
+    for i, line in enumerate(lines):
+        match = pattern.search(line)
+        if match:
+            role = ""
+            if i + 1 < len(lines) and lines[i + 1].startswith('**Role:**'):
+                role = lines[i + 1].replace('**Role:**', '').strip()
+
+            capabilities = []
+            for j in range(i + 1, min(i + 20, len(lines))):
+                if '**Capabilities:**' in lines[j]:
+                    for k in range(j + 1, min(j + 10, len(lines))):
+                        if lines[k].startswith('- '):
+                            capabilities.append(lines[k].strip('- ').strip())
+                        elif lines[k].startswith('#'):
+                            break
+                    break
+
+            agents.append({
+                "id": f"L2.{match.group(1)}.{match.group(2)}",
+                "level": "L2",
+                "name": match.group(3),
+                "role": role,
+                "parent_l1": match.group(1),
+                "capabilities": capabilities,
+                "source": "SUB_AGENT_ARCHITECTURE.md"
+            })
+    return agents
+
+
+def legacy_parse_l3(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        lines = f.read().split('\n')
+
+    pattern = re.compile(r'####\s+L3\.(\d+)\.(\d+)\.(\d+):\s+(.+)')
+    agents = []
+    for i, line in enumerate(lines):
+        match = pattern.search(line)
+        if match:
+            task = ""
+            if i + 1 < len(lines):
+                next_line = lines[i + 1].strip()
+                if next_line and not next_line.startswith('#'):
+                    task = next_line
+
+            agents.append({
+                "id": f"L3.{match.group(1)}.{match.group(2)}.{match.group(3)}",
+                "level": "L3",
+                "name": match.group(4),
+                "task": task,
+                "parent_l1": match.group(1),
+                "parent_l2": f"L2.{match.group(1)}.{match.group(2)}",
+                "source": "L3_MICRO_AGENT_ARCHITECTURE.md"
+            })
+    return agents
+
+
+# ---------------------------------------------------------------------------
+
+def find_root(root):
+    if root:
+        return Path(root)
+    for candidate in DEFAULT_ROOTS:
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def parse_legacy(l1_files, l2_file, l3_file):
+    return ([legacy_parse_l1(p) for p in l1_files], legacy_parse_l2(l2_file), legacy_parse_l3(l3_file))
+
+
+def parse_single_pass(l1_files, l2_file, l3_file):
+    return (
+        [parse_agent_document(p).to_dict() for p in l1_files],
+        [a.to_dict() for a in parse_sub_agents(l2_file)],
+        [a.to_dict() for a in parse_micro_agents(l3_file)]
+    )
+
+
+def time_parser(parser, args, iterations):
+    best = float("inf")
+    for _ in range(iterations):
+        start = time.perf_counter()
+        parser(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare(name, legacy, current):
+    differences = [
+        (old.get("id", index), old, new)
+        for index, (old, new) in enumerate(zip(legacy, current))
+        if old != new
+    ]
+    print(f"  {name}: {len(current)} parsed, {len(differences)} differ from the previous parser")
+    for agent_id, old, new in differences[:5]:
+        changed = sorted(key for key in old if old.get(key) != new.get(key))
+        print(f"    {agent_id}: {', '.join(changed)}")
+    if len(legacy) != len(current):
+        print(f"    count changed: {len(legacy)} -> {len(current)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", help="ai-agents directory (default: C:/Ziggie/ai-agents or the repo copy)")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    root = find_root(args.root)
+    if root is None or not root.exists():
+        print("ai-agents directory not found; pass --root")
+        return 1
+
+    l1_files = sorted(root.glob("[0-9][0-9]_*_AGENT.md"))
+    l2_file = root / "SUB_AGENT_ARCHITECTURE.md"
+    l3_file = root / "L3_MICRO_AGENT_ARCHITECTURE.md"
+    corpus = (l1_files, l2_file, l3_file)
+
+    print(f"Corpus: {root} ({len(l1_files)} L1 files + L2/L3 architecture files)")
+
+    legacy = parse_legacy(*corpus)
+    current = parse_single_pass(*corpus)
+    print("\nOutput check:")
+    for name, old, new in zip(("L1", "L2", "L3"), legacy, current):
+        compare(name, old, new)
+
+    legacy_time = time_parser(parse_legacy, corpus, args.iterations)
+    current_time = time_parser(parse_single_pass, corpus, args.iterations)
+
+    print(f"\nBest of {args.iterations} runs:")
+    print(f"  multi-pass parsers:  {legacy_time * 1000:8.2f} ms")
+    print(f"  single-pass parser:  {current_time * 1000:8.2f} ms")
+    print(f"  speedup:             {legacy_time / current_time:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
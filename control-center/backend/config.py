@@ -2,7 +2,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 
 class Settings(BaseSettings):
@@ -37,6 +37,27 @@ class Settings(BaseSettings):
     # WebSocket update interval (seconds)
     WS_UPDATE_INTERVAL: int = 2
 
+    # Cache configuration
+    CACHE_SWEEP_INTERVAL: int = 60  # Seconds between background expiry sweeps
+    CACHE_FILE_WATCHER: bool = True  # Invalidate agent/KB caches on file changes
+    CACHE_WATCHER_POLLING: bool = False  # Poll instead of native events (network shares)
+    CACHE_WATCHED_TTL: Optional[int] = None  # TTL for watched caches while the watcher runs (None = no expiry)
+    CACHE_LOADER_WORKERS: int = 4  # Threads for blocking cache loads awaited from async handlers
+    IO_WORKERS: int = 8  # Threads for concurrent file reads (L1 agent files, knowledge directory walks)
+    CACHE_DISK_TIER: bool = True  # Persist parsed agent markdown across restarts (keyed by mtime/size)
+    CACHE_WARMUP_ENABLED: bool = True  # Preload agents, KB index, creator DB and projects at startup
+    CACHE_WARMUP_TIMEOUT: Optional[int] = 120  # Seconds before /health/ready stops waiting for warm-up
+    CACHE_MEMORY_BUDGET_MB: Optional[int] = None  # Combined approximate cache size before LRU eviction (None = no limit)
+    CACHE_BACKEND: str = "memory"  # "memory" (per worker) or "redis" (shared across workers)
+    REDIS_URL: Optional[str] = None  # e.g. redis://:password@localhost:6379/0
+    CACHE_REDIS_PREFIX: str = "control-center:cache:"  # Key and pub/sub channel prefix
+
+    # Knowledge base search
+    KB_EMBEDDING_MODEL: Optional[str] = None  # sentence-transformers model for semantic search, e.g. "all-MiniLM-L6-v2" (None = hashing vectorizer)
+
+    # Agent storage
+    AGENTS_SQL_BACKEND: bool = False  # Serve agent listings and agent knowledge from the synced SQL tables
+
     # Port scanning range
     PORT_SCAN_START: int = 3000
     PORT_SCAN_END: int = 9000
@@ -1,6 +1,6 @@
 """Database models for Control Center."""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -31,11 +31,20 @@ class Agent(Base):
     __tablename__ = "agents"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), unique=True, nullable=False)
-    level = Column(String(10), nullable=False)  # L1.1, L2.3, etc.
-    category = Column(String(50), nullable=False)  # Foundation, Execution, etc.
+    name = Column(String(100), unique=True, nullable=False)  # Agent id: 01_art_director, L2.1.1, etc.
+    level = Column(String(10), nullable=False, index=True)  # L1, L2, L3
+    category = Column(String(50), nullable=False)  # Owning L1 agent's name
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # Synced from the agent markdown (services/agent_sync.py)
+    title = Column(String(200), nullable=True)  # Display name
+    parent_l1 = Column(String(20), nullable=True, index=True)  # Raw parent reference, e.g. "1"
+    parent_l2 = Column(String(20), nullable=True, index=True)  # e.g. "L2.1.1"
+    position = Column(Integer, nullable=True, index=True)  # Registry load order (listing order)
+    content_hash = Column(String(32), nullable=True)  # Detects changed agents between syncs
+    data = Column(Text, nullable=True)  # Full parsed agent (JSON), served as-is
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
     # Relationship to knowledge files
     knowledge_files = relationship("KnowledgeFile", back_populates="agent", cascade="all, delete-orphan")
 
@@ -43,11 +52,16 @@ class Agent(Base):
 class KnowledgeFile(Base):
     """Knowledge file model for tracking agent knowledge base."""
     __tablename__ = "knowledge_files"
+    __table_args__ = (
+        Index("ix_knowledge_files_agent_path", "agent_id", "file_path", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     agent_id = Column(Integer, ForeignKey("agents.id"), nullable=False)
     file_path = Column(String(500), nullable=False)
     confidence = Column(Float, default=0.0)  # 0.0 to 1.0
+    size = Column(Integer, nullable=True)  # Bytes, as of the last sync
+    modified = Column(DateTime, nullable=True)  # File mtime, as of the last sync
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationship to agent
@@ -12,6 +12,17 @@ from config import settings
 from database import init_db
 from api import system, services, knowledge, agents, comfyui, projects, usage, docker, cache, health, auth, llm
 from middleware.rate_limit import limiter
+from utils.cache import (
+    cache_sweeper, configure_loader_executor, configure_cache_backend, get_cache_backend,
+    configure_memory_budget
+)
+from utils.parallel import configure_io_executor
+from utils.cache_backends import create_backend
+from utils.disk_cache import parse_cache
+from services.kb_search_index import kb_search_index
+from services.kb_semantic_index import kb_semantic_index
+from services.cache_watcher import cache_watcher
+from services.cache_warmer import cache_warmer
 from process_manager import ProcessManager
 import psutil
 from datetime import datetime
@@ -25,13 +36,42 @@ async def lifespan(app: FastAPI):
     print("Initializing Control Center backend...")
     await init_db()
     print("Database initialized")
-    print("Caching layer enabled (5-minute TTL)")
+    configure_loader_executor(settings.CACHE_LOADER_WORKERS)
+    configure_io_executor(settings.IO_WORKERS)
+    kb_semantic_index.configure(settings.KB_EMBEDDING_MODEL)
+    parse_cache.enabled = settings.CACHE_DISK_TIER
+    if settings.CACHE_MEMORY_BUDGET_MB is not None:
+        configure_memory_budget(settings.CACHE_MEMORY_BUDGET_MB * 1024 * 1024)
+    configure_cache_backend(create_backend(
+        settings.CACHE_BACKEND,
+        settings.REDIS_URL,
+        prefix=settings.CACHE_REDIS_PREFIX
+    ))
+    print(f"Cache backend: {get_cache_backend().name}")
+    cache_sweeper.interval = settings.CACHE_SWEEP_INTERVAL
+    cache_sweeper.start()
+    print("Caching layer enabled (5-minute TTL, LRU-bounded, background expiry sweep)")
+    if settings.CACHE_FILE_WATCHER:
+        cache_watcher.start(
+            polling=settings.CACHE_WATCHER_POLLING,
+            watched_ttl=settings.CACHE_WATCHED_TTL
+        )
+    if settings.CACHE_WARMUP_ENABLED:
+        # Runs in the background; /health/ready reports not ready until it finishes
+        cache_warmer.start(timeout=settings.CACHE_WARMUP_TIMEOUT)
+        print("Cache warm-up started")
     print(f"Server starting on http://{settings.HOST}:{settings.PORT}")
 
     yield
 
     # Shutdown
     print("Shutting down Control Center backend...")
+    await cache_warmer.stop()
+    cache_watcher.stop()
+    cache_sweeper.stop()
+    get_cache_backend().stop()
+    parse_cache.close()
+    kb_search_index.close()
     # Process manager cleanup is handled by atexit registration
 
 
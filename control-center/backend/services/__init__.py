@@ -11,7 +11,18 @@ from services.service_registry import (
     validate_service_paths
 )
 from services.kb_manager import kb_manager, KnowledgeBaseManager
+from services.kb_catalog import kb_catalog, KnowledgeCatalog
+from services.kb_insights import kb_insights, KnowledgeInsights
+from services.kb_search_index import kb_search_index, KnowledgeSearchIndex
+from services.kb_semantic_index import kb_semantic_index, KnowledgeSemanticIndex
 from services.agent_loader import agent_loader, AgentLoader
+from services.cache_watcher import cache_watcher, CacheInvalidationWatcher
+from services.cache_warmer import cache_warmer, CacheWarmer
+from services.agent_registry import AgentRegistry, current_agent_registry, get_agent_registry
+from services.agent_search import AgentSearchIndex
+from services.agent_sync import agent_sync, AgentSync
+from services.incremental_parser import IncrementalDocumentParser
+from services.markdown_parser import AgentDocument, parse_agent_document, parse_sub_agents, parse_micro_agents
 
 __all__ = [
     "ProcessManager",
@@ -25,6 +36,29 @@ __all__ = [
     "validate_service_paths",
     "kb_manager",
     "KnowledgeBaseManager",
+    "kb_catalog",
+    "KnowledgeCatalog",
+    "kb_insights",
+    "KnowledgeInsights",
+    "kb_search_index",
+    "KnowledgeSearchIndex",
+    "kb_semantic_index",
+    "KnowledgeSemanticIndex",
     "agent_loader",
-    "AgentLoader"
+    "AgentLoader",
+    "cache_watcher",
+    "CacheInvalidationWatcher",
+    "cache_warmer",
+    "CacheWarmer",
+    "AgentRegistry",
+    "current_agent_registry",
+    "get_agent_registry",
+    "AgentSearchIndex",
+    "agent_sync",
+    "AgentSync",
+    "IncrementalDocumentParser",
+    "AgentDocument",
+    "parse_agent_document",
+    "parse_sub_agents",
+    "parse_micro_agents"
 ]
@@ -4,9 +4,28 @@ Load and parse agent definitions from markdown files
 """
 
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-import re
+
+from services.markdown_parser import parse_agent_document, parse_sub_agents, parse_micro_agents
+from utils.parallel import parallel_map
+
+
+# (filename, agent id, display name) of the 12 L1 agents
+L1_AGENT_FILES = [
+    ("01_ART_DIRECTOR_AGENT.md", "01_art_director", "Art Director"),
+    ("02_CHARACTER_PIPELINE_AGENT.md", "02_character_pipeline", "Character Pipeline"),
+    ("03_ENVIRONMENT_PIPELINE_AGENT.md", "03_environment_pipeline", "Environment Pipeline"),
+    ("04_GAME_SYSTEMS_DEVELOPER_AGENT.md", "04_game_systems_developer", "Game Systems Developer"),
+    ("05_UI_UX_DEVELOPER_AGENT.md", "05_ui_ux_developer", "UI/UX Developer"),
+    ("06_CONTENT_DESIGNER_AGENT.md", "06_content_designer", "Content Designer"),
+    ("07_INTEGRATION_AGENT.md", "07_integration", "Integration"),
+    ("08_QA_TESTING_AGENT.md", "08_qa_testing", "QA Testing"),
+    ("09_MIGRATION_AGENT.md", "09_migration", "Migration"),
+    ("10_DIRECTOR_AGENT.md", "10_director", "Director"),
+    ("11_STORYBOARD_CREATOR_AGENT.md", "11_storyboard_creator", "Storyboard Creator"),
+    ("12_COPYWRITER_SCRIPTER_AGENT.md", "12_copywriter_scripter", "Copywriter/Scripter")
+]
 
 
 class AgentLoader:
@@ -24,74 +43,24 @@ class AgentLoader:
     def _parse_markdown_file(self, file_path: Path) -> Dict:
         """Parse agent definition from markdown file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            lines = content.split('\n')
-
-            # Extract title
-            title = ""
-            for line in lines:
-                if line.startswith('# '):
-                    title = line.strip('# ').strip()
-                    break
-
-            # Extract sections
-            sections = {}
-            current_section = None
-            section_content = []
-
-            for line in lines:
-                if line.startswith('## '):
-                    # Save previous section
-                    if current_section:
-                        sections[current_section] = '\n'.join(section_content)
-
-                    # Start new section
-                    current_section = line.strip('# ').strip()
-                    section_content = []
-                else:
-                    if current_section:
-                        section_content.append(line)
-
-            # Save last section
-            if current_section:
-                sections[current_section] = '\n'.join(section_content)
-
-            # Extract specific fields
-            role = ""
-            objective = ""
-            responsibilities = []
+            document = parse_agent_document(file_path)
+
+            role_section = document.find_section('ROLE')
+            objective_section = document.find_section('OBJECTIVE')
 
-            # Look for role
-            for key in sections:
-                if 'ROLE' in key.upper():
-                    role = sections[key].strip().split('\n')[0].strip()
-                    break
-
-            # Look for objective
-            for key in sections:
-                if 'OBJECTIVE' in key.upper():
-                    objective = sections[key].strip().split('\n')[0].strip()
-                    break
-
-            # Look for responsibilities
-            for key in sections:
-                if 'RESPONSIBILITIES' in key.upper():
-                    resp_content = sections[key]
-                    # Extract ### headers
-                    for line in resp_content.split('\n'):
-                        if line.startswith('### '):
-                            responsibilities.append(line.strip('# ').strip())
+            responsibilities = []
+            for title, section in document.sections.items():
+                if 'RESPONSIBILITIES' in title.upper():
+                    responsibilities.extend(section.subheadings)
 
             return {
-                "title": title,
-                "role": role,
-                "objective": objective,
+                "title": document.title,
+                "role": role_section.first_line if role_section else "",
+                "objective": objective_section.first_line if objective_section else "",
                 "responsibilities": responsibilities,
-                "sections": list(sections.keys()),
-                "word_count": len(content.split()),
-                "line_count": len(lines)
+                "sections": list(document.sections.keys()),
+                "word_count": document.word_count,
+                "line_count": document.line_count
             }
 
         except Exception as e:
@@ -100,56 +69,44 @@ class AgentLoader:
                 "file": str(file_path)
             }
 
+    def _load_l1_file(self, entry: Tuple[str, str, str]) -> Dict:
+        """Stat and parse one L1 agent file"""
+        filename, agent_id, display_name = entry
+        file_path = self.ai_agents_root / filename
+
+        if file_path.exists():
+            parsed = self._parse_markdown_file(file_path)
+
+            stat = file_path.stat()
+
+            return {
+                "id": agent_id,
+                "level": "L1",
+                "display_name": display_name,
+                "filename": filename,
+                "path": str(file_path),
+                "exists": True,
+                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                "size": stat.st_size,
+                **parsed
+            }
+
+        return {
+            "id": agent_id,
+            "level": "L1",
+            "display_name": display_name,
+            "filename": filename,
+            "exists": False,
+            "error": "File not found"
+        }
+
     def load_l1_agents(self, force_reload: bool = False) -> List[Dict]:
         """Load all L1 main agents"""
         if not force_reload and self._cache["l1"]:
             return self._cache["l1"]
 
-        agents = []
-
-        l1_files = [
-            ("01_ART_DIRECTOR_AGENT.md", "01_art_director", "Art Director"),
-            ("02_CHARACTER_PIPELINE_AGENT.md", "02_character_pipeline", "Character Pipeline"),
-            ("03_ENVIRONMENT_PIPELINE_AGENT.md", "03_environment_pipeline", "Environment Pipeline"),
-            ("04_GAME_SYSTEMS_DEVELOPER_AGENT.md", "04_game_systems_developer", "Game Systems Developer"),
-            ("05_UI_UX_DEVELOPER_AGENT.md", "05_ui_ux_developer", "UI/UX Developer"),
-            ("06_CONTENT_DESIGNER_AGENT.md", "06_content_designer", "Content Designer"),
-            ("07_INTEGRATION_AGENT.md", "07_integration", "Integration"),
-            ("08_QA_TESTING_AGENT.md", "08_qa_testing", "QA Testing"),
-            ("09_MIGRATION_AGENT.md", "09_migration", "Migration"),
-            ("10_DIRECTOR_AGENT.md", "10_director", "Director"),
-            ("11_STORYBOARD_CREATOR_AGENT.md", "11_storyboard_creator", "Storyboard Creator"),
-            ("12_COPYWRITER_SCRIPTER_AGENT.md", "12_copywriter_scripter", "Copywriter/Scripter")
-        ]
-
-        for filename, agent_id, display_name in l1_files:
-            file_path = self.ai_agents_root / filename
-
-            if file_path.exists():
-                parsed = self._parse_markdown_file(file_path)
-
-                stat = file_path.stat()
-
-                agents.append({
-                    "id": agent_id,
-                    "level": "L1",
-                    "display_name": display_name,
-                    "filename": filename,
-                    "path": str(file_path),
-                    "exists": True,
-                    "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                    "size": stat.st_size,
-                    **parsed
-                })
-            else:
-                agents.append({
-                    "id": agent_id,
-                    "level": "L1",
-                    "display_name": display_name,
-                    "filename": filename,
-                    "exists": False,
-                    "error": "File not found"
-                })
+        # Read and parse the files concurrently; results keep file order
+        agents = parallel_map(self._load_l1_file, L1_AGENT_FILES)
 
         self._cache["l1"] = agents
         self._cache["last_loaded"] = datetime.now()
@@ -168,59 +125,7 @@ class AgentLoader:
             return agents
 
         try:
-            with open(sub_agent_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            lines = content.split('\n')
-
-            # Pattern for sub-agents: ### Sub-Agent X.Y: **Name**
-            pattern = re.compile(r'###\s+Sub-Agent\s+(\d+)\.(\d+):\s+\*\*(.+?)\*\*')
-
-            current_l1 = None
-
-            for i, line in enumerate(lines):
-                # Track which L1 agent section we're in
-                if line.startswith('# ') and 'AGENT' in line.upper():
-                    match = re.search(r'(\d+)\.', line)
-                    if match:
-                        current_l1 = match.group(1)
-
-                # Find sub-agent definitions
-                match = pattern.search(line)
-                if match:
-                    l1_num = match.group(1)
-                    l2_num = match.group(2)
-                    name = match.group(3)
-
-                    agent_id = f"L2.{l1_num}.{l2_num}"
-
-                    # Extract role (usually next line)
-                    role = ""
-                    if i + 1 < len(lines) and '**Role:**' in lines[i + 1]:
-                        role = lines[i + 1].replace('**Role:**', '').strip()
-
-                    # Extract capabilities
-                    capabilities = []
-                    for j in range(i + 1, min(i + 20, len(lines))):
-                        if '**Capabilities:**' in lines[j]:
-                            # Read bullet points
-                            for k in range(j + 1, min(j + 10, len(lines))):
-                                if lines[k].startswith('- '):
-                                    capabilities.append(lines[k].strip('- ').strip())
-                                elif lines[k].startswith('#'):
-                                    break
-                            break
-
-                    agents.append({
-                        "id": agent_id,
-                        "level": "L2",
-                        "name": name,
-                        "role": role,
-                        "parent_l1": l1_num,
-                        "capabilities": capabilities,
-                        "source": "SUB_AGENT_ARCHITECTURE.md"
-                    })
-
+            agents = [agent.to_dict() for agent in parse_sub_agents(sub_agent_file)]
         except Exception as e:
             pass
 
@@ -239,41 +144,7 @@ class AgentLoader:
             return agents
 
         try:
-            with open(l3_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            lines = content.split('\n')
-
-            # Pattern for L3 agents: #### L3.X.Y.Z: Name (note: 4 hashes)
-            pattern = re.compile(r'####\s+L3\.(\d+)\.(\d+)\.(\d+):\s+(.+)')
-
-            for i, line in enumerate(lines):
-                match = pattern.search(line)
-                if match:
-                    l1_num = match.group(1)
-                    l2_num = match.group(2)
-                    l3_num = match.group(3)
-                    name = match.group(4)
-
-                    agent_id = f"L3.{l1_num}.{l2_num}.{l3_num}"
-
-                    # Extract task (usually next non-empty line)
-                    task = ""
-                    for j in range(i + 1, min(i + 5, len(lines))):
-                        if lines[j].strip() and not lines[j].startswith('#'):
-                            task = lines[j].strip()
-                            break
-
-                    agents.append({
-                        "id": agent_id,
-                        "level": "L3",
-                        "name": name,
-                        "task": task,
-                        "parent_l1": l1_num,
-                        "parent_l2": f"L2.{l1_num}.{l2_num}",
-                        "source": "L3_MICRO_AGENT_ARCHITECTURE.md"
-                    })
-
+            agents = [agent.to_dict() for agent in parse_micro_agents(l3_file)]
         except Exception as e:
             pass
 
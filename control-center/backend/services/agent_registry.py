@@ -0,0 +1,343 @@
+"""
+Agent Registry
+Indexed view of the L1/L2/L3 agent hierarchy for constant-time lookups
+"""
+
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from utils.etag import content_version
+from services.agent_search import AgentSearchIndex
+
+
+LEVELS = ("L1", "L2", "L3")
+
+# Planned size of the hierarchy: 12 L1 agents with 12 L2 agents each, each
+# with 12 L3 agents
+EXPECTED_COUNTS = {"l1": 12, "l2": 144, "l3": 1728}
+
+# Field under which an agent's children are embedded, per level
+CHILD_FIELDS = {"L1": "sub_agents", "L2": "micro_agents"}
+
+# Numbers taken from an id for the natural sort order (L3.X.Y.Z has four)
+SORT_KEY_NUMBERS = 4
+
+_NUMBER_PATTERN = re.compile(r'\d+')
+
+
+def l1_number(value) -> Optional[int]:
+    """
+    Normalise an L1 reference to its number
+
+    L1 ids look like "01_art_director" while parsed L2/L3 agents carry
+    parent_l1 as "1" or "01", so both are reduced to the integer 1.
+    """
+    if value is None:
+        return None
+    try:
+        return int(str(value).split('_')[0])
+    except ValueError:
+        return None
+
+
+def agent_sort_key(agent: Dict) -> Tuple:
+    """
+    Stable keyset order for an agent
+
+    Level first, then the numbers in the id in natural order (so L2.1.10
+    follows L2.1.9), then the id itself. The key depends only on the agent,
+    so agents added or removed elsewhere never change where it sorts.
+    """
+    level = agent.get('level')
+    rank = LEVELS.index(level) if level in LEVELS else len(LEVELS)
+    agent_id = str(agent.get('id', ''))
+    numbers = [int(n) for n in _NUMBER_PATTERN.findall(agent_id)[:SORT_KEY_NUMBERS]]
+    numbers += [-1] * (SORT_KEY_NUMBERS - len(numbers))
+    return (rank, *numbers, agent_id)
+
+
+class AgentRegistry:
+    """
+    Indexes for one generation of loaded agents
+
+    Built once from the cached L1/L2/L3 lists and then only read:
+    - by id, by level and by raw parent reference (parent_l1 or parent_l2)
+    - L1 agents by number, and precomputed child lists (L1 -> L2, L2 -> L3)
+    - per-L1 L2/L3 counts
+    - a full-text search index of its own, derived from the previous
+      generation's so only changed agents are re-tokenized
+    - agents in agent_sort_key order (ties broken by load position), per
+      level/parent filter, for keyset pagination
+    - the /api/agents/stats payload, materialized once per build
+    - a content version of all agents, used as the ETag of agent responses
+
+    Indexed dicts are the cached objects themselves; use get() for a copy
+    that is safe to annotate.
+
+    Usage:
+        registry = AgentRegistry(l1_agents, l2_agents, l3_agents)
+        agent = registry.get("L2.3.1")
+        children = registry.children_of("L2.3.1")
+    """
+
+    def __init__(self, l1_agents: List[Dict], l2_agents: List[Dict], l3_agents: List[Dict],
+                 search_index: Optional[AgentSearchIndex] = None):
+        """
+        Args:
+            l1_agents, l2_agents, l3_agents: Loaded agent lists
+            search_index: Previous generation's index to derive from; it is
+                not modified (default: build a new one)
+        """
+        self.sources = (l1_agents, l2_agents, l3_agents)
+        self.agents: List[Dict] = l1_agents + l2_agents + l3_agents
+
+        self.by_id: Dict[str, Dict] = {}
+        self.by_level: Dict[str, List[Dict]] = {}
+        self.by_parent: Dict[str, List[Dict]] = {}
+        self.l1_by_number: Dict[int, Dict] = {}
+        self.children: Dict[str, List[Dict]] = {}
+        self.l2_count_by_l1: Dict[int, int] = {}
+        self.l3_count_by_l1: Dict[int, int] = {}
+
+        for agent in self.agents:
+            agent_id = agent.get('id')
+            # First definition wins, matching the previous linear scan
+            if agent_id is not None and agent_id not in self.by_id:
+                self.by_id[agent_id] = agent
+
+            self.by_level.setdefault(agent.get('level'), []).append(agent)
+
+            parent_l1 = agent.get('parent_l1')
+            parent_l2 = agent.get('parent_l2')
+            if parent_l1:
+                self.by_parent.setdefault(parent_l1, []).append(agent)
+            if parent_l2 and parent_l2 != parent_l1:
+                self.by_parent.setdefault(parent_l2, []).append(agent)
+
+        for agent in l1_agents:
+            number = l1_number(agent.get('id'))
+            if number is not None and number not in self.l1_by_number:
+                self.l1_by_number[number] = agent
+            if agent.get('id') is not None:
+                self.children.setdefault(agent['id'], [])
+
+        for agent in l2_agents:
+            number = l1_number(agent.get('parent_l1'))
+            if number is None:
+                continue
+            self.l2_count_by_l1[number] = self.l2_count_by_l1.get(number, 0) + 1
+            parent = self.l1_by_number.get(number)
+            if parent is not None:
+                self.children[parent['id']].append(agent)
+
+        for agent in l3_agents:
+            number = l1_number(agent.get('parent_l1'))
+            if number is not None:
+                self.l3_count_by_l1[number] = self.l3_count_by_l1.get(number, 0) + 1
+            parent_l2 = agent.get('parent_l2')
+            if parent_l2:
+                self.children.setdefault(parent_l2, []).append(agent)
+
+        self.search_index = (search_index or AgentSearchIndex()).derive(self.agents)
+
+        # The load position ends each key, so agents sharing an id still get
+        # distinct keys and a cursor never skips past one of them
+        keyed = sorted(
+            (((*agent_sort_key(agent), position), agent) for position, agent in enumerate(self.agents)),
+            key=lambda pair: pair[0]
+        )
+        self._sort_keys = {id(agent): key for key, agent in keyed}
+        self._sorted: Dict[Tuple, Tuple[List[Dict], List[Tuple]]] = {
+            (None, None): ([agent for _, agent in keyed], [key for key, _ in keyed])
+        }
+
+        self.version = content_version(self.agents)
+        self.built_at = datetime.now().isoformat()
+        self.stats = self._build_stats()
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+    def built_from(self, l1_agents: List[Dict], l2_agents: List[Dict], l3_agents: List[Dict]) -> bool:
+        """Whether this registry indexes exactly these loaded lists"""
+        return all(a is b for a, b in zip(self.sources, (l1_agents, l2_agents, l3_agents)))
+
+    def get(self, agent_id: str) -> Optional[Dict]:
+        """Get a copy of an agent by id (None if unknown)"""
+        agent = self.by_id.get(agent_id)
+        return dict(agent) if agent is not None else None
+
+    def project(self, agent_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Dict]:
+        """
+        An agent reduced to the given fields (None if unknown)
+
+        id is always included and unknown fields are skipped. Naming the
+        level's child field (sub_agents for L1, micro_agents for L2) embeds
+        the children, projected to the same fields. Without fields, a copy
+        of the whole agent is returned, without children.
+        """
+        agent = self.by_id.get(agent_id)
+        if agent is None:
+            return None
+        if fields is None:
+            return dict(agent)
+
+        plain = [field for field in fields if field != 'id' and field not in CHILD_FIELDS.values()]
+        projected = {'id': agent.get('id')}
+        for field in plain:
+            if field in agent:
+                projected[field] = agent[field]
+
+        child_field = CHILD_FIELDS.get(agent.get('level'))
+        if child_field in fields:
+            projected[child_field] = [
+                {'id': child.get('id'), **{field: child[field] for field in plain if field in child}}
+                for child in self.children_of(agent_id)
+            ]
+        return projected
+
+    def children_of(self, agent_id: str) -> List[Dict]:
+        """Direct children: L2 agents of an L1, L3 agents of an L2"""
+        return self.children.get(agent_id, [])
+
+    def walk(self, roots: Sequence[Dict],
+             max_depth: Optional[int] = None) -> Iterator[Tuple[Dict, int, Optional[str]]]:
+        """
+        Lazily visit roots and their descendants in pre-order
+
+        Yields (agent, depth, parent id) with depth 0 for the roots, going at
+        most max_depth levels below them (None = all). Only the pending
+        siblings along the current path are held, never the whole tree.
+        """
+        stack = [(agent, 0, None) for agent in reversed(roots)]
+        while stack:
+            agent, depth, parent_id = stack.pop()
+            yield agent, depth, parent_id
+            if max_depth is None or depth < max_depth:
+                agent_id = agent.get('id')
+                stack.extend((child, depth + 1, agent_id) for child in reversed(self.children_of(agent_id)))
+
+    def parent_of(self, agent_id: str) -> Optional[Dict]:
+        """Direct parent: the L1 of an L2, the L2 of an L3"""
+        agent = self.by_id.get(agent_id)
+        if agent is None:
+            return None
+
+        level = agent.get('level')
+        if level == 'L2':
+            return self.l1_by_number.get(l1_number(agent.get('parent_l1')))
+        if level == 'L3':
+            return self.by_id.get(agent.get('parent_l2'))
+        return None
+
+    def select(self, level: Optional[str] = None, parent: Optional[str] = None) -> List[Dict]:
+        """
+        Agents at a level and/or under a parent reference, in load order
+
+        Args:
+            level: "L1", "L2" or "L3"
+            parent: Raw parent_l1 or parent_l2 value (e.g. "1" or "L2.1.3")
+        """
+        if parent:
+            agents = self.by_parent.get(parent, [])
+            if level:
+                agents = [a for a in agents if a.get('level') == level]
+            return agents
+        if level:
+            return self.by_level.get(level, [])
+        return self.agents
+
+    def select_sorted(self, level: Optional[str] = None,
+                      parent: Optional[str] = None) -> Tuple[List[Dict], List[Tuple]]:
+        """
+        Agents matching select() in agent_sort_key order, with their keys
+
+        Each filter combination is sorted once per registry generation.
+        """
+        selection = self._sorted.get((level, parent))
+        if selection is None:
+            matching = {id(agent) for agent in self.select(level=level, parent=parent)}
+            agents, keys = self._sorted[(None, None)]
+            pairs = [(agent, key) for agent, key in zip(agents, keys) if id(agent) in matching]
+            selection = ([agent for agent, _ in pairs], [key for _, key in pairs])
+            self._sorted[(level, parent)] = selection
+        return selection
+
+    def sort_key(self, agent: Dict) -> Tuple:
+        """Unique keyset key of an indexed agent: agent_sort_key plus its load position"""
+        key = self._sort_keys.get(id(agent))
+        return key if key is not None else (*agent_sort_key(agent), len(self.agents))
+
+    def search(self, query: str, level: Optional[str] = None, parent: Optional[str] = None) -> List[Dict]:
+        """Agents matching query, best match first (see AgentSearchIndex.search)"""
+        return self.search_index.search(query, level=level, parent=parent)
+
+    def counts_for_l1(self, agent_id: str) -> Dict[str, int]:
+        """Number of L2 and L3 agents under an L1 agent"""
+        number = l1_number(agent_id)
+        return {
+            "l2_count": self.l2_count_by_l1.get(number, 0),
+            "l3_count": self.l3_count_by_l1.get(number, 0)
+        }
+
+    def _build_stats(self) -> Dict:
+        """Per-level totals, expected-vs-actual gaps and per-L1 distribution"""
+        l1_agents, l2_agents, l3_agents = self.sources
+        actual = {"l1": len(l1_agents), "l2": len(l2_agents), "l3": len(l3_agents)}
+        actual["total"] = sum(actual.values())
+        expected = dict(EXPECTED_COUNTS, total=sum(EXPECTED_COUNTS.values()))
+
+        distribution = {}
+        for agent in l1_agents:
+            agent_id = agent.get('id', 'unknown')
+            distribution[agent_id] = {
+                "name": agent.get('title', agent_id),
+                **self.counts_for_l1(agent_id)
+            }
+
+        # Format matching frontend expectations
+        return {
+            "total": actual["total"],
+            "by_level": {"L1": actual["l1"], "L2": actual["l2"], "L3": actual["l3"]},
+            "l1_count": actual["l1"],
+            "l2_count": actual["l2"],
+            "l3_count": actual["l3"],
+            "expected": expected,
+            "actual": actual,
+            "gaps": {level: expected[level] - actual[level] for level in expected},
+            "distribution": distribution,
+            "last_updated": self.built_at,
+            "cached": True
+        }
+
+
+_registry: Optional[AgentRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def current_agent_registry() -> Optional[AgentRegistry]:
+    """The most recently built registry (None before the first build)"""
+    return _registry
+
+
+def get_agent_registry(l1_agents: List[Dict], l2_agents: List[Dict], l3_agents: List[Dict]) -> AgentRegistry:
+    """
+    Get the registry for the given agent lists, building it once per cache generation
+
+    The cached loaders return the same list objects until they reload, so the
+    registry is rebuilt only when one of the lists is a different object.
+    A build takes a while, so async callers run this on the loader pool.
+    """
+    global _registry
+    with _registry_lock:
+        current = _registry
+        if current is not None and current.built_from(l1_agents, l2_agents, l3_agents):
+            return current
+
+        # The new registry derives its own search index from the previous one,
+        # which keeps serving searches unchanged until the swap below
+        previous_index = current.search_index if current is not None else None
+        _registry = AgentRegistry(l1_agents, l2_agents, l3_agents, search_index=previous_index)
+        return _registry
@@ -0,0 +1,294 @@
+"""
+Agent Search Index
+Tokenized inverted index over agent fields with prefix matching and ranking
+"""
+
+import bisect
+import re
+from itertools import islice
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Field -> weight. Matches in identifying fields rank above matches in
+# descriptive text.
+FIELD_WEIGHTS: Dict[str, float] = {
+    "id": 3.0,
+    "name": 3.0,
+    "title": 3.0,
+    "role": 2.0,
+    "task": 1.5,
+    "objective": 1.0,
+    "responsibilities": 1.0,
+    "capabilities": 1.0
+}
+
+# A term that is only a prefix of a token scores this fraction of an exact match
+PREFIX_FACTOR = 0.5
+
+# Whole-query prefix match on an agent id (e.g. "l2.3." or "01_art")
+ID_PREFIX_SCORE = 10.0
+
+# Per-term scores and ranked query results kept between refreshes, so
+# search-as-you-type repeats are dictionary lookups
+SEARCH_CACHE_SIZE = 512
+
+_TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens (ids like "01_art_director" split into their parts)"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _field_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+    return str(value)
+
+
+def _signature(agent: Dict) -> Tuple[str, ...]:
+    return tuple(_field_text(agent.get(field)) for field in FIELD_WEIGHTS)
+
+
+def _remember(cache: Dict, key: str, value):
+    """Insert into a bounded dict, dropping the oldest entry when full"""
+    if len(cache) >= SEARCH_CACHE_SIZE:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+
+
+def agent_keys(agents: Iterable[Dict]) -> List[Tuple[str, Dict]]:
+    """
+    Unique, stable keys for agents in load order
+
+    The key is the agent id; the second and later agents sharing an id get
+    "<id>@1", "<id>@2", ... and agents without an id get "#<position>".
+    """
+    seen: Dict[str, int] = {}
+    keyed = []
+    for position, agent in enumerate(agents):
+        key = str(agent.get('id', f"#{position}"))
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        keyed.append((key if count == 0 else f"{key}@{count}", agent))
+    return keyed
+
+
+class AgentSearchIndex:
+    """
+    Inverted index for agent search
+
+    - Each agent's indexed fields are tokenized into postings
+      (token -> {document: weight}); a document's weight for a token is the
+      sum of the weights of the fields it appears in
+    - Every query term must match a token exactly or as a prefix (AND);
+      exact matches score the full weight, prefix matches PREFIX_FACTOR of it
+    - A query that is a prefix of an agent id (e.g. "L2.3.") also matches
+    - Results are ordered by score, then by load order
+
+    refresh() is incremental: only agents whose indexed fields changed are
+    re-tokenized, and tokens are removed from the postings when their last
+    document goes away.
+
+    Usage:
+        index = AgentSearchIndex()
+        index.refresh(agents)
+        results = index.search("style ana")
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._agents: Dict[str, Dict] = {}
+        self._signatures: Dict[str, Tuple[str, ...]] = {}
+        self._doc_tokens: Dict[str, Dict[str, float]] = {}
+        self._order: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._vocabulary: List[str] = []
+        self._ids: List[Tuple[str, str]] = []
+        self._term_cache: Dict[str, Dict[str, float]] = {}
+        self._query_cache: Dict[str, List[str]] = {}
+        self._last_refresh = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def refresh(self, agents: Iterable[Dict]) -> Dict[str, int]:
+        """
+        Bring the index in line with a new generation of agents
+
+        Returns:
+            Counts of added, updated, removed and unchanged documents
+        """
+        keyed = agent_keys(agents)
+
+        with self._lock:
+            counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+            current = set()
+
+            for key, agent in keyed:
+                current.add(key)
+                signature = _signature(agent)
+                previous = self._signatures.get(key)
+
+                if previous == signature:
+                    counts["unchanged"] += 1
+                else:
+                    if previous is not None:
+                        self._remove_document(key)
+                        counts["updated"] += 1
+                    else:
+                        counts["added"] += 1
+                    self._add_document(key, signature)
+                    self._signatures[key] = signature
+
+                # Always point at the newest dict, even if its text is unchanged
+                self._agents[key] = agent
+
+            for key in [k for k in self._agents if k not in current]:
+                self._remove_document(key)
+                del self._agents[key]
+                del self._signatures[key]
+                counts["removed"] += 1
+
+            self._order = {key: position for position, (key, _) in enumerate(keyed)}
+            self._ids = sorted((str(agent.get('id', '')).lower(), key) for key, agent in keyed)
+            # Order can change without any text changing, so ranked results always go
+            self._query_cache.clear()
+            if counts["added"] or counts["updated"] or counts["removed"]:
+                self._term_cache.clear()
+            self._last_refresh = counts
+            return counts
+
+    def derive(self, agents: Iterable[Dict]) -> "AgentSearchIndex":
+        """
+        A new index for a new generation of agents, leaving this one untouched
+
+        Documents whose indexed fields are unchanged keep their tokens, so
+        only changed agents are re-tokenized (as with refresh), while searches
+        on this index keep seeing the previous generation.
+        """
+        index = AgentSearchIndex()
+        with self._lock:
+            index._agents = dict(self._agents)
+            index._signatures = dict(self._signatures)
+            # Per-document token dicts are never modified once built
+            index._doc_tokens = dict(self._doc_tokens)
+            index._postings = {token: dict(postings) for token, postings in self._postings.items()}
+            index._vocabulary = list(self._vocabulary)
+        index.refresh(agents)
+        return index
+
+    def _add_document(self, key: str, signature: Tuple[str, ...]):
+        tokens: Dict[str, float] = {}
+        for weight, text in zip(FIELD_WEIGHTS.values(), signature):
+            for token in set(tokenize(text)):
+                tokens[token] = tokens.get(token, 0.0) + weight
+
+        for token, weight in tokens.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._vocabulary, token)
+            postings[key] = weight
+        self._doc_tokens[key] = tokens
+
+    def _remove_document(self, key: str):
+        for token in self._doc_tokens.pop(key, {}):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[token]
+                index = bisect.bisect_left(self._vocabulary, token)
+                if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                    del self._vocabulary[index]
+
+    def _term_scores(self, term: str) -> Dict[str, float]:
+        """Best score per document for one query term (exact or prefix)"""
+        scores = self._term_cache.get(term)
+        if scores is not None:
+            return scores
+
+        scores = {}
+        start = bisect.bisect_left(self._vocabulary, term)
+        for token in islice(self._vocabulary, start, None):
+            if not token.startswith(term):
+                break
+            factor = 1.0 if token == term else PREFIX_FACTOR
+            for key, weight in self._postings[token].items():
+                score = weight * factor
+                if score > scores.get(key, 0.0):
+                    scores[key] = score
+
+        _remember(self._term_cache, term, scores)
+        return scores
+
+    def _id_prefix_keys(self, query: str) -> List[str]:
+        start = bisect.bisect_left(self._ids, (query, ""))
+        keys = []
+        for agent_id, key in islice(self._ids, start, None):
+            if not agent_id.startswith(query):
+                break
+            keys.append(key)
+        return keys
+
+    def _rank(self, whole: str) -> List[str]:
+        scores: Dict[str, float] = {}
+        terms = tokenize(whole)
+        if terms:
+            term_scores = sorted((self._term_scores(term) for term in terms), key=len)
+            for key, score in term_scores[0].items():
+                total = score
+                for other in term_scores[1:]:
+                    match = other.get(key)
+                    if match is None:
+                        break
+                    total += match
+                else:
+                    scores[key] = total
+
+        if whole:
+            for key in self._id_prefix_keys(whole):
+                scores[key] = scores.get(key, 0.0) + ID_PREFIX_SCORE
+
+        order = self._order
+        return sorted(scores, key=lambda key: (-scores[key], order.get(key, 0)))
+
+    def search(self, query: str, level: Optional[str] = None, parent: Optional[str] = None) -> List[Dict]:
+        """
+        Ranked agents matching every term of query
+
+        Args:
+            query: Free text; each word may be a prefix (e.g. "sty ana")
+            level: Only agents at this level ("L1", "L2", "L3")
+            parent: Only agents with this raw parent_l1 or parent_l2 value
+        """
+        whole = query.strip().lower()
+
+        with self._lock:
+            ranked = self._query_cache.get(whole)
+            if ranked is None:
+                ranked = self._rank(whole)
+                _remember(self._query_cache, whole, ranked)
+            agents = [self._agents[key] for key in ranked]
+
+        if level:
+            agents = [a for a in agents if a.get('level') == level]
+        if parent:
+            agents = [a for a in agents if parent in (a.get('parent_l1'), a.get('parent_l2'))]
+        return agents
+
+    def get_stats(self) -> Dict:
+        """Index size and the result of the last refresh"""
+        with self._lock:
+            return {
+                "documents": len(self._agents),
+                "tokens": len(self._postings),
+                "cached_terms": len(self._term_cache),
+                "cached_queries": len(self._query_cache),
+                "last_refresh": dict(self._last_refresh)
+            }
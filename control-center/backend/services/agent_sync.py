@@ -0,0 +1,251 @@
+"""
+Agent SQL Sync
+Upserts the parsed agent hierarchy and its knowledge files into the agents and knowledge_files tables
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Agent, KnowledgeFile
+from services.agent_registry import AgentRegistry, l1_number
+from services.agent_search import agent_keys
+from utils.etag import content_version, generation_version
+
+
+# Rows per INSERT/UPDATE/DELETE statement (keeps SQLite under its bound-parameter limit)
+SYNC_BATCH_SIZE = 500
+
+# Category of agents whose L1 parent is unknown
+UNASSIGNED_CATEGORY = "Unassigned"
+
+
+def _batches(rows: List, size: int = SYNC_BATCH_SIZE) -> Iterable[List]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _category(registry: AgentRegistry, agent: Dict) -> str:
+    """Name of the L1 agent an agent belongs to"""
+    if agent.get('level') == 'L1':
+        owner = agent
+    else:
+        owner = registry.l1_by_number.get(l1_number(agent.get('parent_l1')))
+    if owner is None:
+        return UNASSIGNED_CATEGORY
+    return str(owner.get('name') or owner.get('title') or owner.get('id'))[:50]
+
+
+def agent_row(registry: AgentRegistry, agent: Dict, position: int, name: Optional[str] = None) -> Dict:
+    """
+    Column values for one parsed agent
+
+    Args:
+        name: Unique row name (default: the agent id), see agent_keys
+    """
+    title = agent.get('name') or agent.get('title')
+    return {
+        "name": name if name is not None else str(agent['id']),
+        "level": agent.get('level') or "",
+        "category": _category(registry, agent),
+        "title": str(title)[:200] if title else None,
+        "parent_l1": agent.get('parent_l1'),
+        "parent_l2": agent.get('parent_l2'),
+        "position": position,
+        "content_hash": content_version(agent),
+        "data": json.dumps(agent, default=str)
+    }
+
+
+def _modified(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+class AgentSync:
+    """
+    Mirrors the agent registry and agent knowledge files into SQL
+
+    A sync reads the existing rows once, diffs them against the registry by
+    agent key (the agent id, or "<id>@n" for repeated ids, see agent_keys)
+    and knowledge files by agent and path, then issues bulk INSERT, UPDATE
+    and DELETE statements for the differences only. Agents are
+    compared by a content hash and their position in the registry's load
+    order, so an unchanged hierarchy costs one SELECT per table.
+
+    ensure_current() skips the sync entirely while the registry and
+    knowledge generations are the ones last synced.
+
+    Usage:
+        await agent_sync.ensure_current(session, registry, knowledge)
+        agent_sync.get_status()
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self.synced_version: Optional[str] = None
+        self.last_sync: Optional[Dict] = None
+        self.syncs = 0
+
+    @staticmethod
+    def version_of(registry: AgentRegistry, knowledge: Dict[str, List[Dict]]) -> str:
+        """Combined version of an agent registry and a knowledge scan"""
+        return f"{registry.version}:{generation_version(knowledge)}"
+
+    async def ensure_current(self, session: AsyncSession, registry: AgentRegistry,
+                             knowledge: Dict[str, List[Dict]]) -> Optional[Dict]:
+        """
+        Sync unless this registry/knowledge generation is already in SQL
+
+        Returns:
+            The sync result, or None if nothing needed syncing
+        """
+        version = self.version_of(registry, knowledge)
+        if version == self.synced_version:
+            return None
+
+        async with self._lock:
+            # Another request may have synced this generation while we waited
+            if version == self.synced_version:
+                return None
+            return await self.sync(session, registry, knowledge)
+
+    async def sync(self, session: AsyncSession, registry: AgentRegistry,
+                   knowledge: Dict[str, List[Dict]]) -> Dict:
+        """
+        Upsert every agent and knowledge file, removing rows that disappeared
+
+        Args:
+            session: Session to sync with (committed on success)
+            registry: Parsed agents
+            knowledge: L1 agent id -> knowledge files (path, size, modified)
+
+        Returns:
+            Inserted/updated/deleted/unchanged counts for agents and knowledge files
+        """
+        start = time.perf_counter()
+        version = self.version_of(registry, knowledge)
+
+        try:
+            agents = await self._sync_agents(session, registry)
+            agent_ids = dict((await session.execute(select(Agent.name, Agent.id))).all())
+            files = await self._sync_knowledge(session, agent_ids, knowledge)
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+        self.synced_version = version
+        self.syncs += 1
+        self.last_sync = {
+            "synced_at": datetime.now().isoformat(),
+            "version": version,
+            "agents": agents,
+            "knowledge_files": files,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+        return self.last_sync
+
+    async def _sync_agents(self, session: AsyncSession, registry: AgentRegistry) -> Dict[str, int]:
+        existing: Dict[str, Tuple[int, Optional[str], Optional[int]]] = {
+            name: (row_id, content_hash, position)
+            for row_id, name, content_hash, position in (
+                await session.execute(select(Agent.id, Agent.name, Agent.content_hash, Agent.position))
+            ).all()
+        }
+
+        # Every registry agent gets a row; repeated ids are stored as "<id>@n".
+        # position is the load order, which the in-memory listing uses too
+        inserts, updates, seen = [], [], set()
+        for position, (name, agent) in enumerate(agent_keys(registry.agents)):
+            seen.add(name)
+
+            row = agent_row(registry, agent, position, name)
+            current = existing.get(row['name'])
+            if current is None:
+                inserts.append(row)
+            elif current[1:] != (row['content_hash'], position):
+                updates.append({"id": current[0], **row, "updated_at": datetime.utcnow()})
+
+        removed = [row_id for name, (row_id, _, _) in existing.items() if name not in seen]
+
+        for batch in _batches(removed):
+            await session.execute(delete(KnowledgeFile).where(KnowledgeFile.agent_id.in_(batch)))
+            await session.execute(delete(Agent).where(Agent.id.in_(batch)))
+        for batch in _batches(inserts):
+            await session.execute(insert(Agent), batch)
+        for batch in _batches(updates):
+            await session.execute(update(Agent), batch)
+
+        return {
+            "inserted": len(inserts),
+            "updated": len(updates),
+            "deleted": len(removed),
+            "unchanged": len(seen) - len(inserts) - len(updates)
+        }
+
+    async def _sync_knowledge(self, session: AsyncSession, agent_ids: Dict[str, int],
+                              knowledge: Dict[str, List[Dict]]) -> Dict[str, int]:
+        existing: Dict[Tuple[int, str], Tuple[int, Optional[int], Optional[datetime]]] = {
+            (agent_id, file_path): (row_id, size, modified)
+            for row_id, agent_id, file_path, size, modified in (
+                await session.execute(select(
+                    KnowledgeFile.id, KnowledgeFile.agent_id, KnowledgeFile.file_path,
+                    KnowledgeFile.size, KnowledgeFile.modified
+                ))
+            ).all()
+        }
+
+        inserts, updates, seen = [], [], set()
+        for agent_name, files in knowledge.items():
+            agent_id = agent_ids.get(agent_name)
+            if agent_id is None:
+                continue
+            for file_info in files:
+                key = (agent_id, file_info['path'])
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                size, modified = file_info.get('size'), _modified(file_info.get('modified'))
+                current = existing.get(key)
+                if current is None:
+                    inserts.append({"agent_id": agent_id, "file_path": file_info['path'],
+                                    "size": size, "modified": modified})
+                elif current[1:] != (size, modified):
+                    updates.append({"id": current[0], "size": size, "modified": modified})
+
+        removed = [row_id for key, (row_id, _, _) in existing.items() if key not in seen]
+
+        for batch in _batches(removed):
+            await session.execute(delete(KnowledgeFile).where(KnowledgeFile.id.in_(batch)))
+        for batch in _batches(inserts):
+            await session.execute(insert(KnowledgeFile), batch)
+        for batch in _batches(updates):
+            await session.execute(update(KnowledgeFile), batch)
+
+        return {
+            "inserted": len(inserts),
+            "updated": len(updates),
+            "deleted": len(removed),
+            "unchanged": len(seen) - len(inserts) - len(updates)
+        }
+
+    def get_status(self) -> Dict:
+        """Sync count and the result of the last sync"""
+        return {
+            "syncs": self.syncs,
+            "synced_version": self.synced_version,
+            "last_sync": self.last_sync
+        }
+
+
+# Global instance used by the agents API when AGENTS_SQL_BACKEND is on
+agent_sync = AgentSync()
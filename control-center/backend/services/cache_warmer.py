@@ -0,0 +1,158 @@
+"""
+Cache Warm-up
+Preloads the expensive caches at startup so the first dashboard load is served hot
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from utils.cache import call_cached
+
+
+def _default_steps() -> Dict[str, Callable]:
+    """Loaders warmed at startup (imported lazily to avoid import cycles)"""
+    from api import agents, knowledge, projects
+
+    return {
+        "l1_agents": agents.load_l1_agents,
+        "l2_agents": agents.load_l2_agents,
+        "l3_agents": agents.load_l3_agents,
+        "kb_files": knowledge.scan_kb_files,
+        "creator_database": knowledge.load_creator_database,
+        "projects": projects.scan_all_projects
+    }
+
+
+class CacheWarmer:
+    """
+    Runs the cache loaders in parallel and tracks their progress
+
+    States:
+    - idle: warm-up not scheduled (e.g. disabled) - does not block readiness
+    - running: loaders in progress - /health/ready reports not ready
+    - complete: every step finished, failed or timed out - readiness flips
+
+    A failed or timed-out step does not keep the service out of rotation;
+    that cache simply loads on first use as it would without warm-up.
+
+    Usage:
+        cache_warmer.start(timeout=120)   # from the application lifespan
+        cache_warmer.get_status()         # progress for /health/ready
+    """
+
+    def __init__(self, steps: Optional[Dict[str, Callable]] = None):
+        """
+        Args:
+            steps: Name -> loader mapping (default: agents, KB, creator DB, projects)
+        """
+        self._steps = steps
+        self._task: Optional[asyncio.Task] = None
+        self.state = "idle"
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.progress: Dict[str, Dict] = {}
+
+    @property
+    def ready(self) -> bool:
+        """Whether warm-up no longer holds back readiness"""
+        return self.state != "running"
+
+    def start(self, timeout: Optional[float] = None) -> asyncio.Task:
+        """
+        Schedule warm-up on the running event loop
+
+        Marks the warmer as running immediately, so readiness is held back
+        from the moment the application starts.
+
+        Args:
+            timeout: Seconds before unfinished steps are abandoned (None = wait)
+        """
+        if self._task is not None and not self._task.done():
+            return self._task
+
+        self._reset()
+        self._task = asyncio.get_running_loop().create_task(self.run(timeout))
+        return self._task
+
+    async def stop(self):
+        """Cancel a warm-up still in progress"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def _reset(self):
+        steps = self._steps if self._steps is not None else _default_steps()
+        self._loaders = steps
+        self.progress = {name: {"status": "pending", "duration_ms": None, "error": None} for name in steps}
+        self.state = "running"
+        self.started_at = time.time()
+        self.finished_at = None
+
+    async def _warm(self, name: str, loader: Callable):
+        step = self.progress[name]
+        step["status"] = "running"
+        start = time.perf_counter()
+        try:
+            await call_cached(loader)
+            step["status"] = "done"
+        except asyncio.CancelledError:
+            step["status"] = "timeout"
+            raise
+        except Exception as e:
+            step["status"] = "failed"
+            step["error"] = str(e)
+        finally:
+            step["duration_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    async def run(self, timeout: Optional[float] = None):
+        """
+        Warm every step in parallel
+
+        Args:
+            timeout: Seconds before unfinished steps are abandoned (None = wait)
+        """
+        if self.state != "running":
+            self._reset()
+
+        tasks = [asyncio.ensure_future(self._warm(name, loader)) for name, loader in self._loaders.items()]
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.state = "complete"
+            self.finished_at = time.time()
+
+        summary = ", ".join(f"{name}={step['status']}" for name, step in self.progress.items())
+        print(f"Cache warm-up complete in {self.finished_at - self.started_at:.2f}s ({summary})")
+
+    def get_status(self) -> Dict:
+        """Get warm-up state and per-step progress"""
+        total = len(self.progress)
+        finished = sum(1 for step in self.progress.values() if step["status"] not in ("pending", "running"))
+        end = self.finished_at or time.time()
+
+        return {
+            "state": self.state,
+            "ready": self.ready,
+            "completed_steps": finished,
+            "total_steps": total,
+            "percent": round(finished / total * 100, 1) if total else 100.0,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else None,
+            "elapsed_seconds": round(end - self.started_at, 2) if self.started_at else 0.0,
+            "steps": {name: dict(step) for name, step in self.progress.items()}
+        }
+
+
+# Global instance
+cache_warmer = CacheWarmer()
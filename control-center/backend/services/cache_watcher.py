@@ -0,0 +1,283 @@
+"""
+Cache Invalidation Watcher
+Watches agent and knowledge base files and invalidates only the affected caches
+"""
+
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.observers.polling import PollingObserver
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # watchdog not installed - fall back to TTL-only caching
+    Observer = None
+    PollingObserver = None
+    FileSystemEventHandler = object
+
+
+# L1 agent definitions live at the top of AI_AGENTS_ROOT, e.g. 01_ART_DIRECTOR_AGENT.md
+L1_FILE_PATTERN = re.compile(r'^\d{2}_.+_AGENT\.md$')
+L2_ARCHITECTURE_FILE = "SUB_AGENT_ARCHITECTURE.md"
+L3_ARCHITECTURE_FILE = "L3_MICRO_AGENT_ARCHITECTURE.md"
+
+
+def _is_within(path: Path, root: Path) -> bool:
+    try:
+        path.relative_to(root)
+        return True
+    except ValueError:
+        return False
+
+
+def _top_directory(path: Path, root: Path) -> Optional[str]:
+    """Name of the entry directly under root that path is in ("" for root itself, None if outside)"""
+    try:
+        parts = path.relative_to(root).parts
+    except ValueError:
+        return None
+    return parts[0] if parts else ""
+
+
+class CacheInvalidationHandler(FileSystemEventHandler):
+    """Maps file system events to targeted cache invalidations"""
+
+    def __init__(self, watcher: "CacheInvalidationWatcher"):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        """Handle created/modified/deleted/moved events"""
+        paths = [event.src_path]
+        dest_path = getattr(event, "dest_path", None)
+        if dest_path:
+            paths.append(dest_path)
+
+        for path in paths:
+            self.watcher.handle_change(Path(path), is_directory=event.is_directory)
+
+
+class CacheInvalidationWatcher:
+    """
+    Watches AI_AGENTS_ROOT and KB_ROOT and invalidates affected cache entries
+
+    - An L1 agent file change drops that file's parsed entry and the L1 list
+    - SUB_AGENT_ARCHITECTURE.md / L3_MICRO_AGENT_ARCHITECTURE.md drop the L2 / L3 lists
+    - KB markdown changes drop the KB listings tagged with the changed agent
+      directory (kb:<agent-dir>) and mark the directory dirty in the KB
+      catalog; creator-database.json drops the creator DB
+
+    While the watcher is running, the watched caches no longer need a short
+    TTL, so their TTL is raised to ``watched_ttl`` (None = never expire). If
+    watchdog is unavailable the watcher stays stopped and the TTLs are left alone.
+    """
+
+    def __init__(self):
+        self.observer = None
+        self._lock = threading.Lock()
+        self._original_ttls: Dict[str, Optional[float]] = {}
+        self._stats = {
+            "events": 0,
+            "invalidations": 0,
+            "last_event": None,
+            "last_invalidated": []
+        }
+
+    @property
+    def running(self) -> bool:
+        return self.observer is not None and self.observer.is_alive()
+
+    def _watch_paths(self) -> List[Tuple[Path, bool]]:
+        """Directories to watch as (path, recursive) pairs"""
+        from api import agents, knowledge
+
+        candidates = [
+            (agents.AI_AGENTS_ROOT, False),
+            (knowledge.AI_AGENTS_ROOT / "ai-agents", True),
+            (knowledge.KB_ROOT, True),
+            (agents.AI_AGENTS_ROOT / "ai-agents", True),
+            (agents.KB_ROOT, True)
+        ]
+
+        watch = []
+        for path, recursive in candidates:
+            if not path.exists():
+                continue
+            # Skip directories already covered by a recursive watch
+            if any(r and _is_within(path, p) for p, r in watch):
+                continue
+            watch.append((path, recursive))
+        return watch
+
+    def _watched_functions(self) -> Dict[str, object]:
+        from api import agents, knowledge
+
+        return {
+            "parse_agent_markdown": agents.parse_agent_markdown,
+            "load_l1_agents": agents.load_l1_agents,
+            "load_l2_agents": agents.load_l2_agents,
+            "load_l3_agents": agents.load_l3_agents,
+            "scan_kb_files": knowledge.scan_kb_files,
+            "scan_all_agent_knowledge": agents.scan_all_agent_knowledge,
+            "load_creator_database": knowledge.load_creator_database
+        }
+
+    def start(self, polling: bool = False, watched_ttl: Optional[float] = None) -> bool:
+        """
+        Start watching
+
+        Args:
+            polling: Use watchdog's PollingObserver (for network shares without native events)
+            watched_ttl: TTL applied to watched caches while running (None = never expire)
+
+        Returns:
+            True if the watcher is running
+        """
+        if self.running:
+            return True
+
+        if Observer is None:
+            print("Cache watcher disabled: watchdog is not installed (caches use fixed TTLs)")
+            return False
+
+        watch_paths = self._watch_paths()
+        if not watch_paths:
+            print("Cache watcher disabled: no agent or knowledge base directories found")
+            return False
+
+        observer = PollingObserver() if polling else Observer()
+        handler = CacheInvalidationHandler(self)
+        for path, recursive in watch_paths:
+            observer.schedule(handler, str(path), recursive=recursive)
+
+        try:
+            observer.start()
+        except Exception as e:
+            print(f"Cache watcher failed to start: {e}")
+            return False
+
+        self.observer = observer
+
+        # File edits now arrive as events, so the KB catalog can skip re-stat'ing
+        # the files of unchanged directories
+        from services.kb_catalog import kb_catalog
+        kb_catalog.trust_directory_mtime = True
+
+        # Freshness now comes from file events rather than expiry
+        for name, func in self._watched_functions().items():
+            self._original_ttls[name] = func.cache.ttl
+            func.cache.ttl = watched_ttl
+
+        print(f"Cache watcher started on {len(watch_paths)} directories")
+        return True
+
+    def stop(self):
+        """Stop watching and restore the original TTLs"""
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join(timeout=5)
+            self.observer = None
+
+            from services.kb_catalog import kb_catalog
+            kb_catalog.trust_directory_mtime = False
+
+        if self._original_ttls:
+            functions = self._watched_functions()
+            for name, ttl in self._original_ttls.items():
+                functions[name].cache.ttl = ttl
+            self._original_ttls.clear()
+
+    def handle_change(self, path: Path, is_directory: bool = False) -> List[str]:
+        """
+        Invalidate the caches affected by a change to path
+
+        Returns:
+            Names of the invalidated caches
+        """
+        from api import agents, knowledge
+        from services.agent_loader import agent_loader
+
+        invalidated = []
+
+        if not is_directory and path.parent == agents.AI_AGENTS_ROOT:
+            if L1_FILE_PATTERN.match(path.name):
+                agents.parse_agent_markdown.invalidate(str(path))
+                agents.load_l1_agents.invalidate()
+                agent_loader.clear_cache()
+                invalidated.append(f"l1_agents:{path.name}")
+            elif path.name == L2_ARCHITECTURE_FILE:
+                agents.load_l2_agents.invalidate()
+                agent_loader.clear_cache()
+                invalidated.append("l2_agents")
+            elif path.name == L3_ARCHITECTURE_FILE:
+                agents.load_l3_agents.invalidate()
+                agent_loader.clear_cache()
+                invalidated.append("l3_agents")
+
+        if path == knowledge.CREATOR_DB:
+            knowledge.load_creator_database.invalidate()
+            invalidated.append("creator_database")
+        elif is_directory or path.suffix == ".md":
+            invalidated.extend(self._invalidate_knowledge(path, is_directory))
+
+        with self._lock:
+            self._stats["events"] += 1
+            self._stats["last_event"] = datetime.now().isoformat()
+            if invalidated:
+                self._stats["invalidations"] += len(invalidated)
+                self._stats["last_invalidated"] = invalidated
+
+        return invalidated
+
+    def _invalidate_knowledge(self, path: Path, is_directory: bool) -> List[str]:
+        """Drop the KB listings covering a changed markdown file or directory, by tag"""
+        from api import agents, knowledge
+        from services.kb_catalog import kb_catalog
+
+        invalidated = []
+
+        agent_dir = _top_directory(path, knowledge.AI_AGENTS_ROOT / "ai-agents")
+        if agent_dir is not None or _is_within(path, knowledge.KB_ROOT):
+            if agent_dir:
+                tag = f"kb:{agent_dir}"
+            elif agent_dir is None and path != knowledge.KB_ROOT:
+                tag = "kb:knowledge-base"
+            else:
+                # A whole root moved or went away
+                tag = "kb:files"
+            knowledge.scan_kb_files.invalidate_tags(tag)
+            # Directory moves/deletes can add or remove many files at once
+            kb_catalog.mark_dirty(path.parent)
+            if is_directory:
+                kb_catalog.mark_dirty(path)
+            invalidated.append("kb_files")
+
+        # Agent knowledge lists ai-agents/<dir> and knowledge-base/L1-<dir> per L1 agent
+        agent_dir = _top_directory(path, agents.AI_AGENTS_ROOT / "ai-agents")
+        if agent_dir is None:
+            l1_dir = _top_directory(path, agents.KB_ROOT)
+            if l1_dir is not None and (l1_dir == "" or l1_dir.startswith("L1-")):
+                agent_dir = l1_dir[len("L1-"):]
+        if agent_dir == "":
+            agents.scan_all_agent_knowledge.invalidate_tags("kb:agent-knowledge")
+            invalidated.append("agent_knowledge")
+        elif agent_dir in agents.AGENT_KB_DIRECTORIES.values():
+            agents.scan_all_agent_knowledge.invalidate_tags(f"kb:{agent_dir}")
+            invalidated.append(f"agent_knowledge:{agent_dir}")
+
+        return invalidated
+
+    def get_status(self) -> Dict:
+        """Get watcher status and event counters"""
+        with self._lock:
+            return {
+                "running": self.running,
+                "watched_paths": [str(p) for p, _ in self._watch_paths()] if self.running else [],
+                **self._stats
+            }
+
+
+# Global instance
+cache_watcher = CacheInvalidationWatcher()
@@ -0,0 +1,317 @@
+"""
+Knowledge Base Catalog
+Incremental catalog of the KB directory trees, walked with os.scandir and reused by directory mtime
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Set
+
+
+# File types the catalog tracks
+CATALOG_SUFFIXES = (".md", ".json")
+
+# A directory modified this recently may change again within the same mtime
+# tick, so its listing is not reused until it is older than this
+RACY_WINDOW_NS = 2_000_000_000
+
+# Add/change/delete events kept for inspection
+EVENT_HISTORY = 500
+
+
+class CatalogFile(NamedTuple):
+    """A cataloged file and its stat at the time it was listed"""
+    path: str
+    name: str
+    size: int
+    mtime_ns: int
+    ctime_ns: int
+
+    @property
+    def modified(self) -> str:
+        return datetime.fromtimestamp(self.mtime_ns / 1e9).isoformat()
+
+    @property
+    def created(self) -> str:
+        return datetime.fromtimestamp(self.ctime_ns / 1e9).isoformat()
+
+
+class _Directory:
+    """Cached listing of one directory"""
+
+    __slots__ = ("mtime_ns", "files", "subdirs", "racy")
+
+    def __init__(self, mtime_ns: int, files: Dict[str, CatalogFile], subdirs: List[str], racy: bool):
+        self.mtime_ns = mtime_ns
+        self.files = files
+        self.subdirs = subdirs
+        self.racy = racy
+
+
+def listing_info(entry: CatalogFile, agent: str) -> Dict:
+    """KB file listing entry (as served by the knowledge API and indexed for search)"""
+    return {
+        "path": entry.path,
+        "name": entry.name,
+        "agent": agent,
+        "size": entry.size,
+        "modified": entry.modified,
+        "category": os.path.basename(os.path.dirname(entry.path)) or "root"
+    }
+
+
+def _event(kind: str, entry: CatalogFile) -> Dict:
+    return {
+        "type": kind,
+        "path": entry.path,
+        "size": entry.size,
+        "mtime_ns": entry.mtime_ns,
+        "modified": entry.modified
+    }
+
+
+class KnowledgeCatalog:
+    """
+    Long-lived catalog of the files under the KB roots
+
+    - Each directory is listed with os.scandir (one pass for files and
+      subdirectories) and its listing is kept with the directory's mtime
+    - On the next walk a directory whose mtime is unchanged reuses its
+      listing; only directories where entries were added, removed or renamed
+      are listed again
+    - Editing a file does not change its directory's mtime, so files in reused
+      directories are re-stat'ed, unless trust_directory_mtime is set (the
+      cache watcher sets it while running and marks the directories of
+      changed files dirty instead)
+    - Every difference found is emitted as an added/changed/deleted event to
+      the subscribed listeners
+
+    Usage:
+        files = kb_catalog.walk(KB_ROOT / "L1-art-director", suffix=".md")
+        kb_catalog.subscribe(lambda events: ...)
+    """
+
+    def __init__(self, suffixes=CATALOG_SUFFIXES):
+        """
+        Args:
+            suffixes: File name suffixes to catalog (case-insensitive)
+        """
+        self.suffixes = tuple(suffix.lower() for suffix in suffixes)
+        self.trust_directory_mtime = False
+        self._dirs: Dict[str, _Directory] = {}
+        self._dirty: Set[str] = set()
+        self._lock = threading.RLock()
+        self._pending: List[Dict] = []
+        self._listeners: List[Callable[[List[Dict]], None]] = []
+        self.recent_events: Deque[Dict] = deque(maxlen=EVENT_HISTORY)
+        self._stats = {
+            "walks": 0,
+            "listed": 0,
+            "reused": 0,
+            "restats": 0,
+            "events": {"added": 0, "changed": 0, "deleted": 0}
+        }
+
+    def walk(self, root, suffix: Optional[str] = None) -> List[CatalogFile]:
+        """
+        Files under root (recursively), bringing the catalog up to date
+
+        Args:
+            root: Directory to walk (missing directories yield nothing)
+            suffix: Only files ending with this suffix (e.g. ".md")
+
+        Returns:
+            Files in pre-order, sorted by name within each directory
+        """
+        suffix = suffix.lower() if suffix else None
+        files = []
+        scan_ns = time.time_ns()
+
+        with self._lock:
+            stack = [os.path.normpath(str(root))]
+            while stack:
+                dir_path = stack.pop()
+                directory = self._refresh(dir_path, scan_ns)
+                if directory is None:
+                    continue
+                files.extend(
+                    entry for entry in directory.files.values()
+                    if suffix is None or entry.name.lower().endswith(suffix)
+                )
+                stack.extend(os.path.join(dir_path, name) for name in reversed(directory.subdirs))
+
+            self._stats["walks"] += 1
+            events = self._take_events()
+
+        self._notify(events)
+        return files
+
+    def subdirectories(self, root, prefix: str = "") -> List[str]:
+        """Paths of root's immediate subdirectories whose names start with prefix"""
+        root = os.path.normpath(str(root))
+        with self._lock:
+            directory = self._refresh(root, time.time_ns())
+            events = self._take_events()
+
+        self._notify(events)
+        if directory is None:
+            return []
+        return [os.path.join(root, name) for name in directory.subdirs if name.startswith(prefix)]
+
+    def entry(self, path) -> Optional[CatalogFile]:
+        """The cataloged file at path, as of the last walk (None if not cataloged)"""
+        path = os.path.normpath(str(path))
+        with self._lock:
+            directory = self._dirs.get(os.path.dirname(path))
+            return directory.files.get(os.path.basename(path)) if directory is not None else None
+
+    def files(self, suffix: Optional[str] = None) -> List[CatalogFile]:
+        """Every file currently cataloged (as of the last walks, nothing is re-read)"""
+        suffix = suffix.lower() if suffix else None
+        with self._lock:
+            return [
+                entry for directory in self._dirs.values() for entry in directory.files.values()
+                if suffix is None or entry.name.lower().endswith(suffix)
+            ]
+
+    def mark_dirty(self, path):
+        """Force the directory at path to be listed again on the next walk"""
+        with self._lock:
+            self._dirty.add(os.path.normpath(str(path)))
+
+    def subscribe(self, listener: Callable[[List[Dict]], None]):
+        """Call listener with each batch of add/change/delete events"""
+        self._listeners.append(listener)
+
+    def clear(self):
+        """Forget every listing (the next walk lists everything, emitting no deletes)"""
+        with self._lock:
+            self._dirs.clear()
+            self._dirty.clear()
+
+    def _refresh(self, dir_path: str, scan_ns: int) -> Optional[_Directory]:
+        """Current listing of dir_path, reused if the directory is unchanged"""
+        cached = self._dirs.get(dir_path)
+        try:
+            stat = os.stat(dir_path)
+        except OSError:
+            self._drop(dir_path)
+            return None
+
+        if (cached is not None and cached.mtime_ns == stat.st_mtime_ns
+                and not cached.racy and dir_path not in self._dirty):
+            self._stats["reused"] += 1
+            if not self.trust_directory_mtime:
+                self._restat(cached)
+            return cached
+
+        self._dirty.discard(dir_path)
+        try:
+            listing = self._list(dir_path, stat.st_mtime_ns, scan_ns)
+        except OSError:
+            self._drop(dir_path)
+            return None
+
+        self._diff(dir_path, cached, listing)
+        self._dirs[dir_path] = listing
+        return listing
+
+    def _list(self, dir_path: str, mtime_ns: int, scan_ns: int) -> _Directory:
+        files, subdirs = [], []
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif entry.name.lower().endswith(self.suffixes) and entry.is_file():
+                        stat = entry.stat()
+                        files.append(CatalogFile(
+                            entry.path, entry.name, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns
+                        ))
+                except OSError:
+                    continue
+
+        self._stats["listed"] += 1
+        files.sort(key=lambda entry: entry.name)
+        subdirs.sort()
+        return _Directory(
+            mtime_ns,
+            {entry.name: entry for entry in files},
+            subdirs,
+            racy=scan_ns - mtime_ns < RACY_WINDOW_NS
+        )
+
+    def _restat(self, directory: _Directory):
+        """Pick up edits to the files of an unchanged directory"""
+        for name, entry in list(directory.files.items()):
+            self._stats["restats"] += 1
+            try:
+                stat = os.stat(entry.path)
+            except OSError:
+                del directory.files[name]
+                self._pending.append(_event("deleted", entry))
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (entry.size, entry.mtime_ns):
+                updated = entry._replace(
+                    size=stat.st_size, mtime_ns=stat.st_mtime_ns, ctime_ns=stat.st_ctime_ns
+                )
+                directory.files[name] = updated
+                self._pending.append(_event("changed", updated))
+
+    def _diff(self, dir_path: str, old: Optional[_Directory], new: _Directory):
+        old_files = old.files if old is not None else {}
+        for name, entry in new.files.items():
+            previous = old_files.get(name)
+            if previous is None:
+                self._pending.append(_event("added", entry))
+            elif (previous.size, previous.mtime_ns) != (entry.size, entry.mtime_ns):
+                self._pending.append(_event("changed", entry))
+        for name, entry in old_files.items():
+            if name not in new.files:
+                self._pending.append(_event("deleted", entry))
+
+        if old is not None:
+            for name in set(old.subdirs) - set(new.subdirs):
+                self._drop(os.path.join(dir_path, name))
+
+    def _drop(self, dir_path: str):
+        """Forget a directory and everything cataloged below it"""
+        inside = dir_path.rstrip(os.sep) + os.sep
+        for path in [p for p in self._dirs if p == dir_path or p.startswith(inside)]:
+            for entry in self._dirs.pop(path).files.values():
+                self._pending.append(_event("deleted", entry))
+        self._dirty.discard(dir_path)
+
+    def _take_events(self) -> List[Dict]:
+        events, self._pending = self._pending, []
+        for event in events:
+            self._stats["events"][event["type"]] += 1
+        self.recent_events.extend(events)
+        return events
+
+    def _notify(self, events: List[Dict]):
+        if not events:
+            return
+        for listener in list(self._listeners):
+            try:
+                listener(events)
+            except Exception as e:
+                print(f"KB catalog listener failed: {e}")
+
+    def get_stats(self) -> Dict:
+        """Directory/file counts, listing reuse counters and event totals"""
+        with self._lock:
+            return {
+                "directories": len(self._dirs),
+                "files": sum(len(d.files) for d in self._dirs.values()),
+                "trust_directory_mtime": self.trust_directory_mtime,
+                **self._stats,
+                "events": dict(self._stats["events"])
+            }
+
+
+# Global instance shared by the knowledge API and the KB manager
+kb_catalog = KnowledgeCatalog()
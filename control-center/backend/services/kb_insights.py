@@ -0,0 +1,178 @@
+"""
+Knowledge Base Insights
+Markdown insight metadata, extracted once per content hash and kept alongside the KB catalog
+"""
+
+import hashlib
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from services.kb_catalog import CatalogFile, KnowledgeCatalog, kb_catalog
+from utils.parallel import parallel_map
+
+
+# First percentage on a line mentioning confidence, e.g. "Confidence: 85%"
+_CONFIDENCE_PATTERN = re.compile(r'(\d+)%')
+
+
+def extract_insights(content: str) -> Dict:
+    """Title, section count, word count, confidence and code/link flags of a markdown document"""
+    lines = content.split('\n')
+
+    # The last confidence percentage in the document wins
+    confidence = None
+    for line in lines:
+        if '%' in line and 'confidence' in line.lower():
+            match = _CONFIDENCE_PATTERN.search(line)
+            if match:
+                confidence = int(match.group(1))
+
+    return {
+        "title": lines[0].strip('# ').strip() if lines else "Untitled",
+        "sections": sum(1 for line in lines if line.startswith('## ')),
+        "word_count": len(content.split()),
+        "confidence": confidence,
+        "has_code": "```" in content,
+        "has_links": "http" in content or "www." in content
+    }
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _read_insights(path: str) -> Tuple[Optional[str], Dict]:
+    """(content hash, insights) of a file; no hash if it could not be read"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        return None, {"error": str(e)}
+
+    digest = content_hash(data)
+    try:
+        return digest, extract_insights(data.decode('utf-8'))
+    except UnicodeDecodeError as e:
+        return digest, {"error": str(e)}
+
+
+class KnowledgeInsights:
+    """
+    Insight metadata of KB markdown files, keyed by content hash
+
+    - Each path remembers the size, mtime and content hash it had when it was
+      read; while the catalog reports the same size and mtime, its insights
+      are served from memory without opening the file
+    - A file whose stat changed is read and hashed again, but only parsed if
+      the hash is new (touched files, reverted edits and copies reuse the
+      existing insights)
+    - Catalog events are only recorded: added and changed markdown files are
+      marked pending and deleted ones forgotten, so walks and listings never
+      read files. Pending files are extracted on their first get/get_many
+      (changed files are read concurrently on the file I/O pool)
+
+    Usage:
+        insights = kb_insights.get_many(kb_catalog.files(".md"))
+    """
+
+    def __init__(self, catalog: KnowledgeCatalog):
+        self._lock = threading.Lock()
+        self._by_hash: Dict[str, Dict] = {}
+        self._by_path: Dict[str, Tuple[int, int, str]] = {}
+        self._refs: Counter = Counter()
+        self._pending: Set[str] = set()
+        self._stats = {"hits": 0, "reads": 0, "parses": 0}
+        catalog.subscribe(self._on_catalog_events)
+
+    def _on_catalog_events(self, events: List[Dict]):
+        # Runs inside catalog walks, so nothing is read here
+        with self._lock:
+            for event in events:
+                if not event["path"].lower().endswith(".md"):
+                    continue
+                if event["type"] == "deleted":
+                    self._pending.discard(event["path"])
+                    self._forget(event["path"])
+                else:
+                    self._pending.add(event["path"])
+
+    def _forget(self, path: str):
+        previous = self._by_path.pop(path, None)
+        if previous is not None:
+            self._release(previous[2])
+
+    def _release(self, digest: str):
+        self._refs[digest] -= 1
+        if self._refs[digest] <= 0:
+            del self._refs[digest]
+            self._by_hash.pop(digest, None)
+
+    def peek(self, entry: CatalogFile) -> Optional[Dict]:
+        """Insights of a cataloged file if already extracted for its current stat"""
+        with self._lock:
+            known = self._by_path.get(entry.path)
+            if known is None or known[:2] != (entry.size, entry.mtime_ns):
+                return None
+            self._stats["hits"] += 1
+            return self._by_hash[known[2]]
+
+    def get(self, entry: CatalogFile) -> Dict:
+        """Insights of a cataloged file, reading it only if it changed since it was last read"""
+        return self.get_many([entry])[0]
+
+    def get_many(self, entries: List[CatalogFile]) -> List[Dict]:
+        """Insights of cataloged files, in order; changed files are read concurrently"""
+        return self._get_many([(entry.path, entry.size, entry.mtime_ns) for entry in entries])
+
+    def _get_many(self, files: List[Tuple[str, int, int]]) -> List[Dict]:
+        results: List[Optional[Dict]] = [None] * len(files)
+        missing = []
+        with self._lock:
+            for i, (path, size, mtime_ns) in enumerate(files):
+                known = self._by_path.get(path)
+                if known is not None and known[:2] == (size, mtime_ns):
+                    results[i] = self._by_hash[known[2]]
+                    self._stats["hits"] += 1
+                else:
+                    missing.append(i)
+
+        if not missing:
+            return results
+
+        read = parallel_map(_read_insights, [files[i][0] for i in missing])
+
+        with self._lock:
+            self._stats["reads"] += len(missing)
+            for i, (digest, insights) in zip(missing, read):
+                path, size, mtime_ns = files[i]
+                if digest is None:
+                    results[i] = insights
+                    continue
+                if digest in self._by_hash:
+                    insights = self._by_hash[digest]
+                else:
+                    self._by_hash[digest] = insights
+                    self._stats["parses"] += 1
+
+                self._refs[digest] += 1
+                self._pending.discard(path)
+                self._forget(path)
+                self._by_path[path] = (size, mtime_ns, digest)
+                results[i] = insights
+        return results
+
+    def get_stats(self) -> Dict:
+        """Files and distinct contents held, files awaiting extraction, and hit/read/parse counters"""
+        with self._lock:
+            return {
+                "files": len(self._by_path),
+                "contents": len(self._by_hash),
+                "pending": len(self._pending),
+                **self._stats
+            }
+
+
+# Global instance used by the knowledge API
+kb_insights = KnowledgeInsights(kb_catalog)
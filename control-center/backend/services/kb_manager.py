@@ -10,6 +10,9 @@ import json
 import subprocess
 import glob
 
+from services.kb_catalog import CatalogFile, kb_catalog, listing_info
+from services.kb_search_index import kb_search_index
+
 
 class KnowledgeBaseManager:
     """Manager for Knowledge Base operations"""
@@ -49,42 +52,49 @@ class KnowledgeBaseManager:
         creators = db.get("creators", [])
         return [c for c in creators if c.get("priority") == priority]
 
+    AGENT_DIRS = [
+        "art-director",
+        "character-pipeline",
+        "environment-pipeline",
+        "game-systems",
+        "ui-ux",
+        "content-designer",
+        "integration",
+        "qa-testing"
+    ]
+
+    def _agent_directories(self) -> List[Path]:
+        return [self.ai_agents_root / "ai-agents" / agent_dir for agent_dir in self.AGENT_DIRS]
+
+    def catalog_files(self, suffix: Optional[str] = None) -> List[CatalogFile]:
+        """
+        Cataloged files (path, name, size, mtime) of the L1 and agent directories
+
+        Served from the KB catalog: only directories changed since the last
+        walk are listed again.
+        """
+        directories = [Path(p) for p in kb_catalog.subdirectories(self.kb_root, prefix="L1-")]
+        files = []
+        for directory in directories + self._agent_directories():
+            files.extend(kb_catalog.walk(directory, suffix=suffix))
+        return files
+
     def scan_kb_directories(self) -> Dict[str, List[Path]]:
         """Scan knowledge base directories for files"""
         kb_structure = {
-            "L1_directories": [],
-            "agent_directories": [],
+            "L1_directories": [Path(p) for p in kb_catalog.subdirectories(self.kb_root, prefix="L1-")],
+            "agent_directories": [d for d in self._agent_directories() if d.exists()],
             "markdown_files": [],
             "json_files": []
         }
 
-        # Scan L1 directories in knowledge-base
-        if self.kb_root.exists():
-            for item in self.kb_root.iterdir():
-                if item.is_dir() and item.name.startswith("L1-"):
-                    kb_structure["L1_directories"].append(item)
-
-        # Scan agent directories
-        agent_dirs = [
-            "art-director",
-            "character-pipeline",
-            "environment-pipeline",
-            "game-systems",
-            "ui-ux",
-            "content-designer",
-            "integration",
-            "qa-testing"
-        ]
-
-        for agent_dir in agent_dirs:
-            dir_path = self.ai_agents_root / "ai-agents" / agent_dir
-            if dir_path.exists():
-                kb_structure["agent_directories"].append(dir_path)
-
-        # Scan for markdown files
+        # One catalog walk per directory yields both file types
         for directory in kb_structure["L1_directories"] + kb_structure["agent_directories"]:
-            kb_structure["markdown_files"].extend(directory.rglob("*.md"))
-            kb_structure["json_files"].extend(directory.rglob("*.json"))
+            for entry in kb_catalog.walk(directory):
+                if entry.name.lower().endswith(".md"):
+                    kb_structure["markdown_files"].append(Path(entry.path))
+                elif entry.name.lower().endswith(".json"):
+                    kb_structure["json_files"].append(Path(entry.path))
 
         return kb_structure
 
@@ -119,13 +129,8 @@ class KnowledgeBaseManager:
             stats["creators"]["by_priority"][priority] = \
                 stats["creators"]["by_priority"].get(priority, 0) + 1
 
-        # Calculate total size
-        total_size = 0
-        for file_path in structure["markdown_files"] + structure["json_files"]:
-            try:
-                total_size += file_path.stat().st_size
-            except:
-                pass
+        # Calculate total size (from the catalog, no per-file stat)
+        total_size = sum(entry.size for entry in self.catalog_files())
 
         stats["storage"]["total_size_bytes"] = total_size
         stats["storage"]["total_size_mb"] = round(total_size / (1024 * 1024), 2)
@@ -178,45 +183,37 @@ class KnowledgeBaseManager:
 
         return files
 
-    def search_kb_content(self, query: str, agent_filter: Optional[str] = None) -> List[Dict]:
-        """Search KB content for a query"""
-        structure = self.scan_kb_directories()
-        results = []
-
-        query_lower = query.lower()
-
-        for md_file in structure["markdown_files"]:
-            try:
-                with open(md_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-
-                if query_lower in content.lower():
-                    # Count occurrences
-                    count = content.lower().count(query_lower)
-
-                    # Find context (first occurrence)
-                    lines = content.split('\n')
-                    context_line = ""
-                    for line in lines:
-                        if query_lower in line.lower():
-                            context_line = line.strip()
-                            break
+    def kb_file_listing(self) -> List[Dict]:
+        """
+        Markdown files of the agent and L1 directories, tagged with their agent
 
-                    results.append({
-                        "file": str(md_file),
-                        "name": md_file.name,
-                        "occurrences": count,
-                        "context": context_line[:200],
-                        "size": md_file.stat().st_size,
-                        "modified": datetime.fromtimestamp(md_file.stat().st_mtime).isoformat()
-                    })
-            except Exception:
-                continue
-
-        # Sort by number of occurrences
-        results.sort(key=lambda x: x["occurrences"], reverse=True)
+        The same listing as the knowledge API's file scan, so both share one
+        search index.
+        """
+        files = []
+        for agent_dir, directory in zip(self.AGENT_DIRS, self._agent_directories()):
+            files.extend(listing_info(entry, agent_dir) for entry in kb_catalog.walk(directory, suffix=".md"))
+        for l1_dir in kb_catalog.subdirectories(self.kb_root, prefix="L1-"):
+            files.extend(listing_info(entry, "knowledge-base") for entry in kb_catalog.walk(l1_dir, suffix=".md"))
+        return files
 
-        return results
+    def search_kb_content(self, query: str, agent_filter: Optional[str] = None) -> List[Dict]:
+        """Search KB content for a query"""
+        # Only new or changed files are read; ranking is BM25 over the whole index
+        kb_search_index.ensure_current(self.kb_file_listing())
+        matches, _ = kb_search_index.search(query, agent=agent_filter, limit=None)
+
+        return [
+            {
+                "file": match["path"],
+                "name": match["name"],
+                "occurrences": match["match_count"],
+                "context": match["preview"],
+                "size": match["size"],
+                "modified": match["modified"]
+            }
+            for match in matches
+        ]
 
     def trigger_scan(
         self,
@@ -266,21 +263,17 @@ class KnowledgeBaseManager:
 
     def get_recent_insights(self, limit: int = 10) -> List[Dict]:
         """Get recently created insight files"""
-        structure = self.scan_kb_directories()
         files_with_time = []
 
-        for md_file in structure["markdown_files"]:
-            try:
-                stat = md_file.stat()
-                files_with_time.append({
-                    "file": str(md_file),
-                    "name": md_file.name,
-                    "modified": datetime.fromtimestamp(stat.st_mtime),
-                    "modified_iso": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                    "size": stat.st_size
-                })
-            except Exception:
-                continue
+        for entry in self.catalog_files(".md"):
+            modified = datetime.fromtimestamp(entry.mtime_ns / 1e9)
+            files_with_time.append({
+                "file": entry.path,
+                "name": entry.name,
+                "modified": modified,
+                "modified_iso": modified.isoformat(),
+                "size": entry.size
+            })
 
         # Sort by modified time (newest first)
         files_with_time.sort(key=lambda x: x["modified"], reverse=True)
@@ -343,16 +336,15 @@ class KnowledgeBaseManager:
             }
 
         # Find related files
-        structure = self.scan_kb_directories()
         related_files = []
 
-        for md_file in structure["markdown_files"]:
-            if creator_id in str(md_file).lower():
+        for entry in self.catalog_files(".md"):
+            if creator_id in entry.path.lower():
                 related_files.append({
-                    "file": str(md_file),
-                    "name": md_file.name,
-                    "size": md_file.stat().st_size,
-                    "modified": datetime.fromtimestamp(md_file.stat().st_mtime).isoformat()
+                    "file": entry.path,
+                    "name": entry.name,
+                    "size": entry.size,
+                    "modified": entry.modified
                 })
 
         return {
@@ -0,0 +1,303 @@
+"""
+Knowledge Base Search Index
+Persistent SQLite FTS5 full-text index over the KB markdown files
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from utils.disk_cache import CACHE_DIR
+from utils.etag import generation_version
+from utils.parallel import parallel_map
+
+
+# Column weights for bm25(): a query word in the file name outranks one in the body
+NAME_WEIGHT = 4.0
+CONTENT_WEIGHT = 1.0
+
+# Tokens of body text around the best match returned as the preview
+SNIPPET_TOKENS = 24
+PREVIEW_LENGTH = 200
+
+# Bump when the tables change; older databases are rebuilt
+SCHEMA_VERSION = 2
+
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for a free-text query
+
+    Every whitespace-separated word must match (AND). A word is matched as a
+    phrase of its tokens with the last one a prefix, so "IP-Adapter" matches
+    "ip adapter" and "adapt" matches "adapter". Returns None if the query
+    has no word characters.
+    """
+    phrases = []
+    for word in query.split():
+        tokens = _WORD_PATTERN.findall(word.lower())
+        if tokens:
+            phrases.append('"' + " ".join(tokens) + '" *')
+    return " AND ".join(phrases) if phrases else None
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _occurrences(content: str, query: str) -> int:
+    """Case-insensitive occurrences of the query words in content"""
+    content_lower = content.lower()
+    return sum(content_lower.count(word) for word in set(query.lower().split()))
+
+
+class KnowledgeSearchIndex:
+    """
+    Full-text index of KB files, persisted in SQLite
+
+    - kb_documents holds one row per indexed file, keyed by path (size,
+      modified time, agent and the file's listing info); kb_documents_fts
+      holds its name and content under the same rowid
+    - sync() diffs the KB file listing against the stored size/modified of
+      each path: only new or changed files are read (concurrently) and
+      re-indexed, and files no longer listed are dropped
+    - search() ranks with BM25 and returns a snippet around the best match,
+      over the whole corpus (or one agent's files), without touching the KB
+      files
+
+    The knowledge API and the KB manager list the same files and share the
+    one index. It survives restarts, so the first sync after startup reads
+    only the files that changed while the backend was down.
+
+    Usage:
+        kb_search_index.ensure_current(kb_files)
+        results, total = kb_search_index.search("ip adapter", agent="art-director", limit=20)
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: SQLite database file (created on first use)
+        """
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._synced: Optional[str] = None
+        self.syncs = 0
+        self.searches = 0
+        self.last_sync: Optional[Dict] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS kb_documents")
+                conn.execute("DROP TABLE IF EXISTS kb_documents_fts")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS kb_documents (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL UNIQUE,
+                    agent TEXT,
+                    size INTEGER,
+                    modified TEXT,
+                    info TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_kb_documents_agent ON kb_documents (agent)")
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS kb_documents_fts USING fts5(
+                    name, content, tokenize = 'unicode61', prefix = '2 3'
+                )
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def ensure_current(self, files: List[Dict]) -> Optional[Dict]:
+        """
+        Sync unless this file listing generation was the last one synced
+
+        Returns:
+            The sync result, or None if nothing needed syncing
+        """
+        version = generation_version(files)
+        if self._synced == version:
+            return None
+
+        with self._sync_lock:
+            if self._synced == version:
+                return None
+            result = self.sync(files)
+            self._synced = version
+            return result
+
+    def sync(self, files: List[Dict]) -> Dict:
+        """
+        Bring the index up to date with the KB file listing
+
+        Args:
+            files: File info dicts with at least path and name (size, modified,
+                agent and any other fields are stored and returned by search)
+
+        Returns:
+            Indexed/removed/unchanged counts
+        """
+        start = time.perf_counter()
+
+        with self._lock:
+            existing = {
+                path: (row_id, size, modified)
+                for row_id, path, size, modified in self._connect().execute(
+                    "SELECT id, path, size, modified FROM kb_documents"
+                )
+            }
+
+        listed = {file_info['path']: file_info for file_info in files}
+        changed = [
+            file_info for path, file_info in listed.items()
+            if existing.get(path, (None, None, None))[1:] != (file_info.get('size'), file_info.get('modified'))
+        ]
+        removed = [row[0] for path, row in existing.items() if path not in listed]
+
+        # Reading is the slow part; done outside the lock on the file I/O pool
+        contents = parallel_map(_read_text, [file_info['path'] for file_info in changed])
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                for row_id in removed:
+                    conn.execute("DELETE FROM kb_documents_fts WHERE rowid = ?", (row_id,))
+                    conn.execute("DELETE FROM kb_documents WHERE id = ?", (row_id,))
+
+                indexed = 0
+                for file_info, content in zip(changed, contents):
+                    current = existing.get(file_info['path'])
+                    if current is not None:
+                        conn.execute("DELETE FROM kb_documents_fts WHERE rowid = ?", (current[0],))
+                        conn.execute("DELETE FROM kb_documents WHERE id = ?", (current[0],))
+                    if content is None:
+                        continue
+
+                    row_id = conn.execute(
+                        "INSERT INTO kb_documents (path, agent, size, modified, info) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (file_info['path'], file_info.get('agent'), file_info.get('size'),
+                         file_info.get('modified'), json.dumps(file_info, default=str))
+                    ).lastrowid
+                    conn.execute(
+                        "INSERT INTO kb_documents_fts (rowid, name, content) VALUES (?, ?, ?)",
+                        (row_id, file_info.get('name', ''), content)
+                    )
+                    indexed += 1
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+
+            self.syncs += 1
+            self.last_sync = {
+                "synced_at": datetime.now().isoformat(),
+                "indexed": indexed,
+                "removed": len(removed),
+                "unchanged": len(listed) - len(changed),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+            }
+            return self.last_sync
+
+    def search(
+        self,
+        query: str,
+        agent: Optional[str] = None,
+        limit: Optional[int] = 20
+    ) -> Tuple[List[Dict], int]:
+        """
+        Ranked full-text search
+
+        Args:
+            query: Free-text query (see build_match_query)
+            agent: Only files whose listing agent is this
+            limit: Maximum results (None for all)
+
+        Returns:
+            (results, total matches). Each result is the file's listing info
+            plus match_count, preview and score (BM25, higher is better).
+        """
+        match = build_match_query(query)
+        if match is None:
+            return [], 0
+
+        where = "kb_documents_fts MATCH ?"
+        params: List = [match]
+        if agent is not None:
+            where += " AND d.agent = ?"
+            params.append(agent)
+
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM kb_documents_fts JOIN kb_documents d ON d.id = kb_documents_fts.rowid "
+                f"WHERE {where}",
+                params
+            ).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT d.info, kb_documents_fts.content, "
+                f"snippet(kb_documents_fts, 1, '', '', '...', {SNIPPET_TOKENS}), "
+                f"bm25(kb_documents_fts, {NAME_WEIGHT}, {CONTENT_WEIGHT}) AS rank "
+                f"FROM kb_documents_fts JOIN kb_documents d ON d.id = kb_documents_fts.rowid "
+                f"WHERE {where} ORDER BY rank, d.path LIMIT ?",
+                params + [-1 if limit is None else limit]
+            ).fetchall()
+            self.searches += 1
+
+        results = [
+            {
+                **json.loads(info),
+                "match_count": _occurrences(content, query),
+                "preview": " ".join(snippet.split())[:PREVIEW_LENGTH],
+                "score": round(-rank, 4)
+            }
+            for info, content, snippet, rank in rows
+        ]
+        return results, total
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_stats(self) -> Dict:
+        """Indexed document count, database size and the last sync"""
+        with self._lock:
+            documents = 0
+            if self._conn is not None or self.db_path.exists():
+                documents = self._connect().execute("SELECT COUNT(*) FROM kb_documents").fetchone()[0]
+            return {
+                "path": str(self.db_path),
+                "documents": documents,
+                "size_bytes": self.db_path.stat().st_size if self.db_path.exists() else 0,
+                "syncs": self.syncs,
+                "searches": self.searches,
+                "last_sync": self.last_sync
+            }
+
+
+# Global instance used by /api/knowledge/search and the KB manager
+kb_search_index = KnowledgeSearchIndex(CACHE_DIR / "kb_search.db")
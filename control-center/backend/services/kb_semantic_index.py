@@ -0,0 +1,413 @@
+"""
+Knowledge Base Semantic Index
+Chunked embedding index over the KB markdown files, kept current from KB catalog events
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy not installed - semantic search is unavailable
+    np = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # no local embedding model - the hashing vectorizer is used
+    SentenceTransformer = None
+
+from services.kb_catalog import KnowledgeCatalog, kb_catalog
+from utils.disk_cache import CACHE_DIR
+from utils.parallel import parallel_map
+
+
+# Words per chunk, and words repeated between consecutive chunks of a long section
+CHUNK_WORDS = 200
+CHUNK_OVERLAP = 40
+
+# Dimensions of the hashing vectorizer
+HASHING_DIM = 1024
+
+# Weight of a character trigram relative to a whole word in the hashing vectorizer
+TRIGRAM_WEIGHT = 0.25
+
+# Chunks ranked per requested result before falling back to a full sort
+CANDIDATE_FACTOR = 8
+
+# Characters of chunk text returned as the preview
+PREVIEW_LENGTH = 300
+
+# Bump when the chunking or the stored layout changes
+INDEX_VERSION = 1
+
+_HEADING_PATTERN = re.compile(r'^#{1,6}\s+(.*)$')
+_TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+
+def chunk_markdown(text: str, max_words: int = CHUNK_WORDS,
+                   overlap: int = CHUNK_OVERLAP) -> List[Tuple[str, str]]:
+    """
+    Split markdown into (heading, text) chunks
+
+    Each section (text under a heading) is one chunk; sections longer than
+    max_words are split into windows overlapping by overlap words.
+    """
+    sections, heading, lines = [], "", []
+    for line in text.splitlines():
+        match = _HEADING_PATTERN.match(line)
+        if match:
+            sections.append((heading, lines))
+            heading, lines = match.group(1).strip(), []
+        else:
+            lines.append(line)
+    sections.append((heading, lines))
+
+    chunks = []
+    step = max_words - overlap
+    for heading, lines in sections:
+        words = " ".join(lines).split()
+        if not words:
+            continue
+        for start in range(0, max(len(words) - overlap, 1), step):
+            chunks.append((heading, " ".join(words[start:start + max_words])))
+    return chunks
+
+
+class HashingEmbedder:
+    """
+    Signed feature hashing of words and character trigrams
+
+    Needs no model. It matches shared words and word stems ("weights" and
+    "weight"); related words with no spelling in common only match with a
+    real embedding model.
+    """
+
+    def __init__(self, dim: int = HASHING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> Dict[int, float]:
+        features: Dict[int, float] = {}
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            padded = f"#{token}#"
+            grams = [(token, 1.0)] + [(padded[i:i + 3], TRIGRAM_WEIGHT) for i in range(len(token))]
+            for gram, weight in grams:
+                h = zlib.crc32(gram.encode("utf-8"))
+                index = h % self.dim
+                features[index] = features.get(index, 0.0) + (weight if h & 0x80000000 else -weight)
+        return features
+
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        """Unit-length float32 vectors, one row per text"""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            if features:
+                values = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+                matrix[row, np.fromiter(features.keys(), dtype=np.int64, count=len(features))] = (
+                    np.sign(values) * np.log1p(np.abs(values))
+                )
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model run on the CPU"""
+
+    def __init__(self, model_name: str):
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = model_name
+
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        """Unit-length float32 vectors, one row per text"""
+        vectors = self.model.encode(texts, batch_size=32, normalize_embeddings=True, convert_to_numpy=True)
+        return vectors.astype(np.float32)
+
+
+def create_embedder(model_name: Optional[str] = None):
+    """The named local model if it can be loaded, else the hashing vectorizer"""
+    if model_name and SentenceTransformer is not None:
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except Exception as e:
+            print(f"Semantic search: cannot load {model_name} ({e}), using the hashing vectorizer")
+    elif model_name:
+        print("Semantic search: sentence-transformers is not installed, using the hashing vectorizer")
+    return HashingEmbedder()
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class KnowledgeSemanticIndex:
+    """
+    Embedding index of KB markdown chunks
+
+    - Subscribes to the KB catalog: added and changed markdown files are
+      queued for embedding, deleted ones for removal. refresh() applies the
+      queue, so only files that changed are read, chunked and embedded
+    - Vectors are rows of one float32 matrix, unit length, so a query is
+      scored against every chunk with a single matrix-vector product; the
+      best chunk of each file is returned
+    - The matrix (vectors.npy, memory-mapped on load) and the chunk metadata
+      (chunks.json) are saved after each refresh. After a restart, files
+      whose size and modified time match the saved ones are not re-embedded,
+      and saved files that no longer exist are dropped on the first refresh
+
+    Usage:
+        kb_semantic_index.refresh()
+        results = kb_semantic_index.search("controlnet weights", limit=10)
+    """
+
+    def __init__(self, directory: Path, catalog: KnowledgeCatalog, model_name: Optional[str] = None):
+        """
+        Args:
+            directory: Where the vectors and chunk metadata are saved
+            catalog: KB catalog whose events drive the updates
+            model_name: sentence-transformers model (None = hashing vectorizer)
+        """
+        self.directory = Path(directory)
+        self.catalog = catalog
+        self.model_name = model_name
+        self._embedder = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._loaded = False
+        self._verified = False
+        self._files: Dict[str, Dict] = {}
+        self._chunks: List[Dict] = []
+        self._vectors = None
+        self._queued: Dict[str, Optional[Dict]] = {}
+        self.refreshes = 0
+        self.last_refresh: Optional[Dict] = None
+        catalog.subscribe(self._on_catalog_events)
+
+    @property
+    def available(self) -> bool:
+        return np is not None
+
+    def configure(self, model_name: Optional[str]):
+        """Use another embedding model (the index is rebuilt on the next refresh)"""
+        with self._lock:
+            if model_name != self.model_name:
+                self.model_name = model_name
+                self._embedder = None
+                self._loaded = False
+
+    def _on_catalog_events(self, events: List[Dict]):
+        with self._lock:
+            for event in events:
+                if not event["path"].lower().endswith(".md"):
+                    continue
+                self._queued[event["path"]] = None if event["type"] == "deleted" else {
+                    "size": event["size"], "modified": event["modified"]
+                }
+
+    def _embed(self, texts: List[str]):
+        if self._embedder is None:
+            self._embedder = create_embedder(self.model_name)
+        return self._embedder.embed(texts)
+
+    def _load(self):
+        """Load the saved index if it was built by the current embedder"""
+        self._loaded = True
+        self._verified = False
+        self._files, self._chunks, self._vectors = {}, [], None
+        if self._embedder is None:
+            self._embedder = create_embedder(self.model_name)
+
+        # Files cataloged before this load; unchanged ones are skipped by refresh()
+        for entry in self.catalog.files(suffix=".md"):
+            self._queued.setdefault(entry.path, {"size": entry.size, "modified": entry.modified})
+
+        try:
+            with open(self.directory / "chunks.json", 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get("version") != INDEX_VERSION or meta.get("embedder") != self._embedder.name:
+                return
+            vectors = np.load(self.directory / "vectors.npy", mmap_mode="r")
+        except (OSError, ValueError):
+            return
+
+        if len(vectors) == len(meta["chunks"]):
+            self._files, self._chunks, self._vectors = meta["files"], meta["chunks"], vectors
+
+    def _save(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        vectors_tmp = self.directory / "vectors.tmp.npy"
+        np.save(vectors_tmp, self._vectors)
+        os.replace(vectors_tmp, self.directory / "vectors.npy")
+
+        meta_tmp = self.directory / "chunks.tmp.json"
+        with open(meta_tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "embedder": self._embedder.name,
+                "files": self._files,
+                "chunks": self._chunks
+            }, f)
+        os.replace(meta_tmp, self.directory / "chunks.json")
+
+    def refresh(self) -> Optional[Dict]:
+        """
+        Apply the queued catalog events
+
+        Returns:
+            Embedded/removed counts, or None if there was nothing to do
+        """
+        if not self.available:
+            return None
+
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self) -> Optional[Dict]:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            queued, self._queued = self._queued, {}
+
+            # Saved files the catalog has not reported since the load may be gone
+            if not self._verified:
+                self._verified = True
+                for path in self._files:
+                    if path not in queued and not os.path.exists(path):
+                        queued[path] = None
+
+            embed = [
+                (path, info) for path, info in queued.items()
+                if info is not None and self._files.get(path, {}).get("stat") != [info["size"], info["modified"]]
+            ]
+            drop = {path for path, info in queued.items() if info is None and path in self._files}
+            drop.update(path for path, _ in embed)
+            if not embed and not drop:
+                return None
+
+        start = time.perf_counter()
+
+        # Read on the file I/O pool, chunk and embed outside the lock
+        contents = parallel_map(_read_text, [path for path, _ in embed])
+        new_files, new_chunks, texts = {}, [], []
+        for (path, info), content in zip(embed, contents):
+            if content is None:
+                continue
+            chunks = chunk_markdown(content)
+            new_files[path] = {"stat": [info["size"], info["modified"]], "chunks": len(chunks)}
+            for heading, text in chunks:
+                new_chunks.append({"path": path, "heading": heading, "preview": text[:PREVIEW_LENGTH]})
+                texts.append(f"{heading}\n{text}" if heading else text)
+        new_vectors = self._embed(texts) if texts else None
+
+        with self._lock:
+            keep = [i for i, chunk in enumerate(self._chunks) if chunk["path"] not in drop]
+            parts = []
+            if self._vectors is not None and keep:
+                parts.append(np.asarray(self._vectors[keep], dtype=np.float32))
+            if new_vectors is not None:
+                parts.append(new_vectors)
+
+            self._chunks = [self._chunks[i] for i in keep] + new_chunks
+            self._vectors = np.concatenate(parts) if parts else None
+            for path in drop:
+                self._files.pop(path, None)
+            self._files.update(new_files)
+
+            if self._vectors is None:
+                self._vectors = np.zeros((0, self._embedder.dim), dtype=np.float32)
+            self._save()
+
+            self.refreshes += 1
+            self.last_refresh = {
+                "refreshed_at": datetime.now().isoformat(),
+                "embedded_files": len(new_files),
+                "embedded_chunks": len(new_chunks),
+                "removed_files": len(drop - set(new_files)),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+            }
+            return self.last_refresh
+
+    def search(self, query: str, limit: int = 10, paths: Optional[Set[str]] = None) -> List[Dict]:
+        """
+        Files most similar to the query, by their best-matching chunk
+
+        Args:
+            query: Free text
+            limit: Maximum files returned
+            paths: Only consider these files (None for all)
+
+        Returns:
+            path, heading, preview and score (cosine similarity) per file, best first
+        """
+        if not self.available:
+            return []
+
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            vectors, chunks = self._vectors, self._chunks
+            query_vector = self._embed([query])[0]
+
+        if vectors is None or len(chunks) == 0:
+            return []
+
+        scores = np.asarray(vectors @ query_vector, dtype=np.float32)
+        if paths is not None:
+            scores[[i for i, chunk in enumerate(chunks) if chunk["path"] not in paths]] = -np.inf
+
+        # Rank the top candidates first; fall back to every chunk if they
+        # cover fewer than limit files
+        candidates = min(len(chunks), limit * CANDIDATE_FACTOR)
+        order = np.argpartition(-scores, candidates - 1)[:candidates]
+        results = self._best_per_file(chunks, scores, order[np.argsort(-scores[order], kind="stable")], limit)
+        if len(results) < limit and candidates < len(chunks):
+            results = self._best_per_file(chunks, scores, np.argsort(-scores, kind="stable"), limit)
+        return results
+
+    @staticmethod
+    def _best_per_file(chunks: List[Dict], scores, order: Iterable[int], limit: int) -> List[Dict]:
+        results, seen = [], set()
+        for i in order:
+            score = float(scores[i])
+            if score <= 0 or len(results) >= limit:
+                break
+            chunk = chunks[i]
+            if chunk["path"] in seen:
+                continue
+            seen.add(chunk["path"])
+            results.append({**chunk, "score": round(score, 4)})
+        return results
+
+    @property
+    def embedder_name(self) -> Optional[str]:
+        return self._embedder.name if self._embedder is not None else None
+
+    def get_stats(self) -> Dict:
+        """Indexed files and chunks, the embedder in use and the last refresh"""
+        with self._lock:
+            return {
+                "available": self.available,
+                "embedder": self.embedder_name,
+                "files": len(self._files),
+                "chunks": len(self._chunks),
+                "queued": len(self._queued),
+                "refreshes": self.refreshes,
+                "last_refresh": self.last_refresh
+            }
+
+
+# Global instance used by /api/knowledge/semantic-search
+kb_semantic_index = KnowledgeSemanticIndex(CACHE_DIR / "kb_vectors", kb_catalog)
@@ -0,0 +1,360 @@
+"""
+Agent Markdown Parser
+Single-pass, section-aware parsing of agent definition files
+
+Every field is collected in one pass over a file's lines, instead of
+re-scanning the whole document once per field. Results are compact
+``__slots__`` records; API handlers convert them with ``to_dict()``.
+
+- parse_agent_document(): L1 agent files (title, role, objective,
+  responsibilities, permissions, tools, sections)
+- parse_sub_agents(): L2 sub-agents from SUB_AGENT_ARCHITECTURE.md
+- parse_micro_agents(): L3 micro-agents from L3_MICRO_AGENT_ARCHITECTURE.md
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+
+PathLike = Union[str, Path]
+
+# Header patterns, matched against the whole text: whitespace never crosses a
+# line break and each match runs to the end of its line
+
+# ### Sub-Agent X.Y: **Name**
+SUB_AGENT_PATTERN = re.compile(r'###[^\S\n]+Sub-Agent[^\S\n]+(\d+)\.(\d+):[^\S\n]+\*\*(.+?)\*\*.*')
+
+# #### L3.X.Y.Z: Name (note: 4 hashes)
+MICRO_AGENT_PATTERN = re.compile(r'####[^\S\n]+L3\.(\d+)\.(\d+)\.(\d+):[^\S\n]+(.+)')
+
+# Lines scanned after a sub-agent header for **Capabilities:**, and after the
+# marker for bullet points
+CAPABILITIES_WINDOW = 19
+CAPABILITY_BULLETS_WINDOW = 9
+
+# Lines scanned after an L3 header for its task description
+TASK_WINDOW = 4
+
+# Block states for the L1 list sections
+_PENDING, _ACTIVE, _DONE = 0, 1, 2
+
+
+def _read_text(file_path: PathLike) -> str:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class DocumentSection:
+    """A ``## `` section: its first non-blank line and ``### `` sub-headings"""
+
+    __slots__ = ("title", "first_line", "subheadings")
+
+    def __init__(self, title: str):
+        self.title = title
+        self.first_line = ""
+        self.subheadings: List[str] = []
+
+
+class AgentDocument:
+    """Parsed L1 agent definition"""
+
+    __slots__ = (
+        "title", "role", "objective", "responsibilities", "permissions",
+        "tools", "sections", "section_count", "word_count", "line_count", "char_count"
+    )
+
+    def __init__(self):
+        self.title = ""
+        self.role = ""
+        self.objective = ""
+        self.responsibilities: List[str] = []
+        self.permissions: Dict[str, List[str]] = {"read_write": [], "read_only": []}
+        self.tools: List[str] = []
+        self.sections: Dict[str, DocumentSection] = {}
+        self.section_count = 0
+        self.word_count = 0
+        self.line_count = 0
+        self.char_count = 0
+
+    def find_section(self, keyword: str) -> Optional[DocumentSection]:
+        """First section whose title contains keyword (case-insensitive)"""
+        keyword = keyword.upper()
+        for title, section in self.sections.items():
+            if keyword in title.upper():
+                return section
+        return None
+
+    def to_dict(self) -> Dict:
+        """Fields served by /api/agents for an L1 agent"""
+        return {
+            "title": self.title,
+            "role": self.role,
+            "objective": self.objective,
+            "responsibilities": list(self.responsibilities),
+            "permissions": {kind: list(paths) for kind, paths in self.permissions.items()},
+            "tools": list(self.tools),
+            "has_content": self.char_count > 0,
+            "word_count": self.word_count,
+            "sections": self.section_count
+        }
+
+
+def parse_agent_text(content: str) -> AgentDocument:
+    """
+    Parse an L1 agent definition in a single pass over its lines
+
+    Every field is updated as each line is read:
+    - title: first ``# `` header
+    - role / objective: line after the first ``## ROLE`` / ``## PRIMARY OBJECTIVE``
+    - responsibilities: ``### `` headers in the RESPONSIBILITIES block
+    - permissions: Read/Write and Read-Only bullets in the ACCESS PERMISSIONS block
+    - tools: ``### `` headers in the TOOLS AND REFERENCES block
+    - sections: every ``## `` section with its first line and sub-headings
+    """
+    doc = AgentDocument()
+    lines = content.split('\n')
+    doc.line_count = len(lines)
+    doc.char_count = len(content)
+    doc.word_count = len(content.split())
+
+    sections = doc.sections
+    responsibilities = doc.responsibilities
+    permissions = doc.permissions
+    tools = doc.tools
+
+    capture: Optional[str] = None
+    role_seen = objective_seen = False
+    responsibilities_state = permissions_state = tools_state = _PENDING
+    open_blocks = 3
+    permission_type: Optional[str] = None
+    section: Optional[DocumentSection] = None
+    needs_first_line = False
+    section_count = 0
+
+    for line in lines:
+        # Value line for a ROLE / PRIMARY OBJECTIVE header seen on the previous line
+        if capture is not None:
+            setattr(doc, capture, line.strip())
+            capture = None
+
+        is_h2 = is_h3 = False
+        if line[:1] == '#':
+            is_h2 = line[:3] == '## '
+            is_h3 = line[:4] == '### '
+
+            if not doc.title and line[:2] == '# ':
+                doc.title = line.strip('# ').strip()
+
+            if is_h2:
+                section_count += 1
+                if not role_seen and (line.startswith('## ROLE') or line.startswith('## Role')):
+                    role_seen = True
+                    capture = "role"
+                elif not objective_seen and (line.startswith('## PRIMARY OBJECTIVE') or line.startswith('## Primary Objective')):
+                    objective_seen = True
+                    capture = "objective"
+
+                # A repeated title replaces the earlier section but keeps its position
+                title = line.strip('# ').strip()
+                section = DocumentSection(title) if title else None
+                if section is not None:
+                    sections[title] = section
+                needs_first_line = section is not None
+            elif is_h3 and section is not None:
+                section.subheadings.append(line.strip('# ').strip())
+
+        if needs_first_line and not is_h2:
+            text = line.strip()
+            if text:
+                section.first_line = text
+                needs_first_line = False
+
+        if not open_blocks:
+            continue
+
+        if responsibilities_state != _DONE:
+            if 'RESPONSIBILITIES' in line:
+                responsibilities_state = _ACTIVE
+            elif responsibilities_state == _ACTIVE:
+                if is_h2:
+                    responsibilities_state = _DONE
+                    open_blocks -= 1
+                elif is_h3:
+                    responsibilities.append(line.strip('# ').strip())
+
+        if permissions_state != _DONE:
+            if 'ACCESS PERMISSIONS' in line:
+                permissions_state = _ACTIVE
+            elif permissions_state == _ACTIVE:
+                if is_h2:
+                    permissions_state = _DONE
+                    open_blocks -= 1
+                elif 'Read/Write' in line or 'Read-Write' in line:
+                    permission_type = "read_write"
+                elif 'Read-Only' in line or 'Read Only' in line:
+                    permission_type = "read_only"
+                elif permission_type and line.strip().startswith('-'):
+                    path = line.strip('- ').strip()
+                    if path:
+                        permissions[permission_type].append(path)
+
+        if tools_state != _DONE:
+            if 'TOOLS' in line and 'REFERENCES' in line:
+                tools_state = _ACTIVE
+            elif tools_state == _ACTIVE:
+                if is_h2:
+                    tools_state = _DONE
+                    open_blocks -= 1
+                elif is_h3:
+                    tools.append(line.strip('# ').strip())
+
+    doc.section_count = section_count
+    return doc
+
+
+def parse_agent_document(file_path: PathLike) -> AgentDocument:
+    """Parse an L1 agent definition file"""
+    return parse_agent_text(_read_text(file_path))
+
+
+class SubAgentRecord:
+    """L2 sub-agent parsed from SUB_AGENT_ARCHITECTURE.md"""
+
+    __slots__ = ("id", "name", "role", "parent_l1", "capabilities")
+
+    source = "SUB_AGENT_ARCHITECTURE.md"
+
+    def __init__(self, l1_num: str, l2_num: str, name: str):
+        self.id = f"L2.{l1_num}.{l2_num}"
+        self.name = name
+        self.role = ""
+        self.parent_l1 = l1_num
+        self.capabilities: List[str] = []
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "level": "L2",
+            "name": self.name,
+            "role": self.role,
+            "parent_l1": self.parent_l1,
+            "capabilities": list(self.capabilities),
+            "source": self.source
+        }
+
+
+class MicroAgentRecord:
+    """L3 micro-agent parsed from L3_MICRO_AGENT_ARCHITECTURE.md"""
+
+    __slots__ = ("id", "name", "task", "parent_l1", "parent_l2")
+
+    source = "L3_MICRO_AGENT_ARCHITECTURE.md"
+
+    def __init__(self, l1_num: str, l2_num: str, l3_num: str, name: str):
+        self.id = f"L3.{l1_num}.{l2_num}.{l3_num}"
+        self.name = name
+        self.task = ""
+        self.parent_l1 = l1_num
+        self.parent_l2 = f"L2.{l1_num}.{l2_num}"
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "level": "L3",
+            "name": self.name,
+            "task": self.task,
+            "parent_l1": self.parent_l1,
+            "parent_l2": self.parent_l2,
+            "source": self.source
+        }
+
+
+def _header_blocks(pattern: re.Pattern, content: str, max_lines: int) -> Iterator[Tuple[re.Match, List[str]]]:
+    """
+    Yield each header match with the lines that follow it
+
+    The regex engine finds the headers in one scan of the text; only the
+    lines between a header and the next one (at most max_lines) are split
+    out, so body text outside the look-ahead windows is never visited.
+    """
+    matches = list(pattern.finditer(content))
+    for index, match in enumerate(matches):
+        start = match.end() + 1  # ".+" stops at the header's line ending
+        if index + 1 < len(matches):
+            # Cut at the start of the line holding the next header
+            end = content.rfind('\n', 0, matches[index + 1].start())
+        else:
+            end = len(content)
+        if start > end:
+            yield match, []
+            continue
+        yield match, content[start:end].split('\n', max_lines)[:max_lines]
+
+
+def parse_sub_agent_text(content: str) -> List[SubAgentRecord]:
+    """
+    Parse L2 sub-agents in a single pass
+
+    Each ``### Sub-Agent X.Y: **Name**`` header opens a block:
+    - role: ``**Role:**`` on the line right after the header
+    - capabilities: ``- `` bullets after the first ``**Capabilities:**``
+      marker within the next 19 lines, read for up to 9 lines or until a
+      heading
+
+    A block ends at the next sub-agent header, so an agent without
+    capabilities no longer picks up its neighbour's.
+    """
+    agents: List[SubAgentRecord] = []
+
+    for match, lines in _header_blocks(SUB_AGENT_PATTERN, content, CAPABILITIES_WINDOW + CAPABILITY_BULLETS_WINDOW):
+        agent = SubAgentRecord(match.group(1), match.group(2), match.group(3))
+        agents.append(agent)
+
+        if lines and lines[0].startswith('**Role:**'):
+            agent.role = lines[0].replace('**Role:**', '').strip()
+
+        for index, line in enumerate(lines[:CAPABILITIES_WINDOW]):
+            if '**Capabilities:**' in line:
+                for bullet in lines[index + 1:index + 1 + CAPABILITY_BULLETS_WINDOW]:
+                    if bullet.startswith('- '):
+                        agent.capabilities.append(bullet.strip('- ').strip())
+                    elif bullet.startswith('#'):
+                        break
+                break
+
+    return agents
+
+
+def parse_sub_agents(file_path: PathLike) -> List[SubAgentRecord]:
+    """Parse L2 sub-agents from SUB_AGENT_ARCHITECTURE.md"""
+    return parse_sub_agent_text(_read_text(file_path))
+
+
+def parse_micro_agent_text(content: str) -> List[MicroAgentRecord]:
+    """
+    Parse L3 micro-agents in a single pass
+
+    The task is the first non-blank line within the 4 lines after a
+    ``#### L3.X.Y.Z: Name`` header, unless a heading comes first.
+    """
+    agents: List[MicroAgentRecord] = []
+
+    for match, lines in _header_blocks(MICRO_AGENT_PATTERN, content, TASK_WINDOW):
+        agent = MicroAgentRecord(match.group(1), match.group(2), match.group(3), match.group(4))
+        agents.append(agent)
+
+        for line in lines:
+            text = line.strip()
+            if text.startswith('#'):
+                break
+            if text:
+                agent.task = text
+                break
+
+    return agents
+
+
+def parse_micro_agents(file_path: PathLike) -> List[MicroAgentRecord]:
+    """Parse L3 micro-agents from L3_MICRO_AGENT_ARCHITECTURE.md"""
+    return parse_micro_agent_text(_read_text(file_path))
@@ -10,6 +10,27 @@ backend_path = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_path))
 
 
+@pytest.fixture(autouse=True)
+def temporary_cache_dir(tmp_path_factory, monkeypatch):
+    """Point the global on-disk caches and KB indexes at a temporary directory"""
+    from utils.disk_cache import parse_cache
+    from services.kb_search_index import kb_search_index
+    from services.kb_semantic_index import kb_semantic_index
+
+    cache_dir = tmp_path_factory.mktemp("cache")
+    for store, filename in ((parse_cache, "parse_cache.db"), (kb_search_index, "kb_search.db")):
+        store.close()
+        monkeypatch.setattr(store, "db_path", cache_dir / filename)
+    monkeypatch.setattr(kb_search_index, "_synced", {})
+    monkeypatch.setattr(kb_semantic_index, "directory", cache_dir / "kb_vectors")
+    monkeypatch.setattr(kb_semantic_index, "_loaded", False)
+
+    yield cache_dir
+
+    parse_cache.close()
+    kb_search_index.close()
+
+
 @pytest.fixture
 def test_client():
     """Create a test client for the FastAPI application"""
@@ -0,0 +1,321 @@
+"""
+Tests for the indexed agent registry (services/agent_registry.py)
+"""
+import threading
+import pytest
+from unittest.mock import patch
+from services.agent_registry import AgentRegistry, agent_sort_key, get_agent_registry, l1_number
+
+
+@pytest.fixture
+def agents():
+    """Small hierarchy using the real parsers' parent formats"""
+    l1 = [
+        {"id": "01_art_director", "level": "L1", "title": "Art Director"},
+        {"id": "10_director", "level": "L1", "title": "Director"}
+    ]
+    l2 = [
+        {"id": "L2.1.1", "level": "L2", "name": "Style", "parent_l1": "1"},
+        {"id": "L2.1.2", "level": "L2", "name": "Assets", "parent_l1": "1"},
+        {"id": "L2.10.1", "level": "L2", "name": "Scenes", "parent_l1": "10"}
+    ]
+    l3 = [
+        {"id": "L3.1.1.1", "level": "L3", "name": "Palette", "parent_l1": "1", "parent_l2": "L2.1.1"},
+        {"id": "L3.1.1.2", "level": "L3", "name": "Lighting", "parent_l1": "1", "parent_l2": "L2.1.1"},
+        {"id": "L3.10.1.1", "level": "L3", "name": "Blocking", "parent_l1": "10", "parent_l2": "L2.10.1"}
+    ]
+    return l1, l2, l3
+
+
+class TestAgentRegistry:
+    """Test registry indexes"""
+
+    def test_l1_number_normalisation(self):
+        """Test L1 ids and parent references reduce to the same number"""
+        assert l1_number("01_art_director") == 1
+        assert l1_number("1") == 1
+        assert l1_number("01") == 1
+        assert l1_number("art") is None
+        assert l1_number(None) is None
+
+    def test_lookup_by_id_returns_copy(self, agents):
+        """Test lookups are by id and do not expose the cached dict"""
+        registry = AgentRegistry(*agents)
+
+        agent = registry.get("L2.1.2")
+        agent["annotated"] = True
+
+        assert registry.get("L2.1.2")["name"] == "Assets"
+        assert "annotated" not in agents[1][1]
+        assert registry.get("missing") is None
+
+    def test_children_and_parents(self, agents):
+        """Test precomputed children and parent links across levels"""
+        registry = AgentRegistry(*agents)
+
+        assert [a["id"] for a in registry.children_of("01_art_director")] == ["L2.1.1", "L2.1.2"]
+        assert [a["id"] for a in registry.children_of("L2.1.1")] == ["L3.1.1.1", "L3.1.1.2"]
+        assert registry.children_of("L3.1.1.1") == []
+
+        # "1" must not match "10_director" the way a substring test would
+        assert registry.parent_of("L2.10.1")["id"] == "10_director"
+        assert registry.parent_of("L2.1.1")["id"] == "01_art_director"
+        assert registry.parent_of("L3.1.1.2")["id"] == "L2.1.1"
+        assert registry.parent_of("01_art_director") is None
+
+    def test_select_by_level_and_parent(self, agents):
+        """Test level and raw parent filters keep load order"""
+        registry = AgentRegistry(*agents)
+
+        assert len(registry.select()) == 8
+        assert [a["id"] for a in registry.select(level="L1")] == ["01_art_director", "10_director"]
+        assert [a["id"] for a in registry.select(parent="1")] == ["L2.1.1", "L2.1.2", "L3.1.1.1", "L3.1.1.2"]
+        assert [a["id"] for a in registry.select(level="L3", parent="1")] == ["L3.1.1.1", "L3.1.1.2"]
+        assert [a["id"] for a in registry.select(parent="L2.1.1")] == ["L3.1.1.1", "L3.1.1.2"]
+
+    def test_counts_per_l1(self, agents):
+        """Test per-L1 L2/L3 counts"""
+        registry = AgentRegistry(*agents)
+
+        assert registry.counts_for_l1("01_art_director") == {"l2_count": 2, "l3_count": 2}
+        assert registry.counts_for_l1("10_director") == {"l2_count": 1, "l3_count": 1}
+
+    def test_built_once_per_generation(self, agents):
+        """Test the registry is reused until a loader returns a new list"""
+        first = get_agent_registry(*agents)
+        assert get_agent_registry(*agents) is first
+
+        l1, l2, l3 = agents
+        rebuilt = get_agent_registry(l1, list(l2), l3)
+        assert rebuilt is not first
+
+    def test_rebuild_keeps_previous_search_index(self, agents):
+        """Test a new generation gets its own index and the old one is not mutated"""
+        l1, l2, l3 = agents
+        first = get_agent_registry(l1, l2, l3)
+
+        renamed = [dict(l2[0], name="Moodboard")] + l2[1:]
+        rebuilt = get_agent_registry(l1, renamed, l3)
+
+        assert rebuilt.search_index is not first.search_index
+        assert [a["id"] for a in rebuilt.search("moodboard")] == ["L2.1.1"]
+        assert first.search("moodboard") == []
+
+    def test_sort_key_natural_order(self):
+        """Test ids sort by level, then numerically"""
+        ids = ["L2.1.10", "L3.1.1.1", "L2.1.9", "10_director", "01_art_director"]
+        ordered = sorted(({"id": i, "level": i[:2] if i.startswith("L") else "L1"} for i in ids), key=agent_sort_key)
+
+        assert [a["id"] for a in ordered] == ["01_art_director", "10_director", "L2.1.9", "L2.1.10", "L3.1.1.1"]
+
+    def test_stats_materialized_once(self, agents):
+        """Test totals, gaps and distribution are computed at build time"""
+        registry = AgentRegistry(*agents)
+
+        stats = registry.stats
+        assert stats["actual"] == {"l1": 2, "l2": 3, "l3": 3, "total": 8}
+        assert stats["gaps"]["l2"] == 141
+        assert stats["gaps"]["total"] == 1876
+        assert stats["distribution"]["01_art_director"] == {"name": "Art Director", "l2_count": 2, "l3_count": 2}
+        assert stats["last_updated"] == registry.built_at
+
+    def test_project_fields_and_children(self, agents):
+        """Test projection keeps id, skips unknown fields and embeds children"""
+        registry = AgentRegistry(*agents)
+
+        projected = registry.project("01_art_director", ["title", "sub_agents", "missing"])
+
+        assert projected == {
+            "id": "01_art_director",
+            "title": "Art Director",
+            "sub_agents": [{"id": "L2.1.1"}, {"id": "L2.1.2"}]
+        }
+        assert registry.project("L2.1.1", ["name", "micro_agents"])["micro_agents"][1] == {"id": "L3.1.1.2", "name": "Lighting"}
+        assert registry.project("L3.1.1.1", ["sub_agents"]) == {"id": "L3.1.1.1"}
+        assert registry.project("nope", ["name"]) is None
+
+    def test_select_sorted(self, agents):
+        """Test filtered selections keep the keyset order"""
+        registry = AgentRegistry(*agents)
+
+        selection, keys = registry.select_sorted(level="L3", parent="1")
+
+        assert [a["id"] for a in selection] == ["L3.1.1.1", "L3.1.1.2"]
+        assert keys == sorted(keys)
+        assert registry.select_sorted(level="L3", parent="1")[0] is selection
+
+
+class TestAgentEndpointsUseRegistry:
+    """Test endpoints built on the registry"""
+
+    def test_detail_lists_sub_agents_for_real_parent_format(self, test_client, agents):
+        """Test L1 details find L2s whose parent_l1 is unpadded"""
+        l1, l2, l3 = agents
+        with patch('api.agents.load_l1_agents', return_value=l1), \
+             patch('api.agents.load_l2_agents', return_value=l2), \
+             patch('api.agents.load_l3_agents', return_value=l3):
+            response = test_client.get("/api/agents/01_art_director")
+
+        assert response.status_code == 200
+        assert [a["id"] for a in response.json()["sub_agents"]] == ["L2.1.1", "L2.1.2"]
+        assert "sub_agents" not in l1[0]
+
+    def test_stats_distribution_counts(self, test_client, agents):
+        """Test per-L1 distribution counts come from the registry"""
+        l1, l2, l3 = agents
+        with patch('api.agents.load_l1_agents', return_value=l1), \
+             patch('api.agents.load_l2_agents', return_value=l2), \
+             patch('api.agents.load_l3_agents', return_value=l3):
+            response = test_client.get("/api/agents/stats")
+
+        distribution = response.json()["distribution"]
+        assert distribution["01_art_director"]["l2_count"] == 2
+        assert distribution["10_director"]["l3_count"] == 1
+
+    def test_stats_served_without_recomputing(self, test_client, agents):
+        """Test repeated stats requests reuse the registry's materialized payload"""
+        l1, l2, l3 = agents
+        with patch('api.agents.load_l1_agents', return_value=l1), \
+             patch('api.agents.load_l2_agents', return_value=l2), \
+             patch('api.agents.load_l3_agents', return_value=l3):
+            first = test_client.get("/api/agents/stats").json()
+            with patch.object(AgentRegistry, '_build_stats') as build:
+                second = test_client.get("/api/agents/stats").json()
+
+        assert first == second
+        assert first["actual"]["total"] == 8
+        build.assert_not_called()
+
+    def test_rebuild_runs_on_loader_pool(self, test_client, agents):
+        """Test a registry rebuild does not run on the event loop thread"""
+        l1, l2, l3 = agents
+        threads = []
+        build_stats = AgentRegistry._build_stats
+
+        def record(registry):
+            threads.append(threading.current_thread().name)
+            return build_stats(registry)
+
+        with patch('api.agents.load_l1_agents', return_value=l1), \
+             patch('api.agents.load_l2_agents', return_value=list(l2)), \
+             patch('api.agents.load_l3_agents', return_value=l3), \
+             patch.object(AgentRegistry, '_build_stats', autospec=True, side_effect=record):
+            response = test_client.get("/api/agents/stats")
+
+        assert response.status_code == 200
+        assert len(threads) == 1
+        assert threads[0].startswith("cache-loader")
+
+    def test_cursor_pages_are_stable(self, test_client, agents):
+        """Test cursor pages walk everything once and survive earlier inserts"""
+        l1, l2, l3 = agents
+
+        def get(url, l2_agents=l2):
+            with patch('api.agents.load_l1_agents', return_value=l1), \
+                 patch('api.agents.load_l2_agents', return_value=l2_agents), \
+                 patch('api.agents.load_l3_agents', return_value=l3):
+                return test_client.get(url).json()
+
+        first = get("/api/agents?cursor=&page_size=3")
+        assert [a["id"] for a in first["agents"]] == ["01_art_director", "10_director", "L2.1.1"]
+        assert first["total"] == 8
+
+        grown = l2 + [{"id": "L2.1.0", "level": "L2", "name": "New", "parent_l1": "1"}]
+        second = get(f"/api/agents?cursor={first['meta']['next_cursor']}&page_size=3", grown)
+        assert [a["id"] for a in second["agents"]] == ["L2.1.2", "L2.10.1", "L3.1.1.1"]
+
+        last = get(f"/api/agents?cursor={second['meta']['next_cursor']}&page_size=3", grown)
+        assert [a["id"] for a in last["agents"]] == ["L3.1.1.2", "L3.10.1.1"]
+        assert last["meta"]["next_cursor"] is None
+
+    def test_cursor_walk_keeps_duplicate_ids(self, test_client, agents):
+        """Test agents sharing an id are each returned once by a cursor walk"""
+        l1, l2, l3 = agents
+        duplicated = l3 + [
+            {"id": "L3.1.1.1", "level": "L3", "name": "Palette (copy)", "parent_l1": "1", "parent_l2": "L2.1.1"},
+            {"id": "L3.1.1.1", "level": "L3", "name": "Palette (draft)", "parent_l1": "1", "parent_l2": "L2.1.1"}
+        ]
+
+        names = []
+        cursor = ""
+        with patch('api.agents.load_l1_agents', return_value=l1), \
+             patch('api.agents.load_l2_agents', return_value=l2), \
+             patch('api.agents.load_l3_agents', return_value=duplicated):
+            while cursor is not None:
+                page = test_client.get(f"/api/agents?cursor={cursor}&page_size=1").json()
+                names.extend(a.get("name", a.get("title")) for a in page["agents"])
+                cursor = page["meta"]["next_cursor"]
+
+        assert page["total"] == 10
+        assert len(names) == 10
+        assert names.count("Palette") == names.count("Palette (copy)") == names.count("Palette (draft)") == 1
+
+    def test_invalid_cursor_is_rejected(self, test_client, agents):
+        """Test a malformed cursor is a 400, not a 500"""
+        l1, l2, l3 = agents
+        with patch('api.agents.load_l1_agents', return_value=l1), \
+             patch('api.agents.load_l2_agents', return_value=l2), \
+             patch('api.agents.load_l3_agents', return_value=l3):
+            response = test_client.get("/api/agents?cursor=bogus")
+
+        assert response.status_code == 400
+
+    def test_batch_projection(self, test_client, agents):
+        """Test one request returns several projected agents in request order"""
+        l1, l2, l3 = agents
+        with patch('api.agents.load_l1_agents', return_value=l1), \
+             patch('api.agents.load_l2_agents', return_value=l2), \
+             patch('api.agents.load_l3_agents', return_value=l3):
+            response = test_client.get("/api/agents/batch?ids=L3.1.1.2,01_art_director,nope,L3.1.1.2&fields=name,parent_l2")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["agents"] == [
+            {"id": "L3.1.1.2", "name": "Lighting", "parent_l2": "L2.1.1"},
+            {"id": "01_art_director"}
+        ]
+        assert data["missing"] == ["nope"]
+        assert data["total"] == 2
+
+    def test_batch_rejects_empty_ids(self, test_client):
+        """Test an empty id list is a validation error"""
+        response = test_client.get("/api/agents/batch?ids=,")
+
+        assert response.status_code == 400
+
+    def test_tree_streams_nested_json(self, test_client, agents):
+        """Test the nested tree matches the registry and honours depth"""
+        l1, l2, l3 = agents
+        with patch('api.agents.load_l1_agents', return_value=l1), \
+             patch('api.agents.load_l2_agents', return_value=l2), \
+             patch('api.agents.load_l3_agents', return_value=l3):
+            full = test_client.get("/api/agents/tree?fields=name")
+            shallow = test_client.get("/api/agents/tree?depth=1").json()
+
+        assert full.status_code == 200
+        assert "etag" in full.headers
+        roots = full.json()["roots"]
+        assert [r["id"] for r in roots] == ["01_art_director", "10_director"]
+        assert [c["id"] for c in roots[0]["children"]] == ["L2.1.1", "L2.1.2"]
+        assert roots[0]["children"][0]["children"][1] == {
+            "id": "L3.1.1.2", "name": "Lighting", "child_count": 0, "children": []
+        }
+        assert shallow["roots"][0]["children"][0]["children"] == []
+        assert shallow["roots"][0]["children"][0]["child_count"] == 2
+
+    def test_tree_ndjson_subtree(self, test_client, agents):
+        """Test NDJSON lists a subtree in pre-order with depth and parent"""
+        import json
+        l1, l2, l3 = agents
+        with patch('api.agents.load_l1_agents', return_value=l1), \
+             patch('api.agents.load_l2_agents', return_value=l2), \
+             patch('api.agents.load_l3_agents', return_value=l3):
+            response = test_client.get("/api/agents/tree?root=L2.1.1&format=ndjson&fields=name")
+            missing = test_client.get("/api/agents/tree?root=nope")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [(n["id"], n["depth"], n["parent"]) for n in lines] == [
+            ("L2.1.1", 0, None), ("L3.1.1.1", 1, "L2.1.1"), ("L3.1.1.2", 1, "L2.1.1")
+        ]
+        assert missing.status_code == 404
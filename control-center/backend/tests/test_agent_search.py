@@ -0,0 +1,117 @@
+"""
+Tests for the agent full-text search index (services/agent_search.py)
+"""
+import pytest
+from unittest.mock import patch
+from services.agent_search import AgentSearchIndex, tokenize
+
+
+@pytest.fixture
+def agents():
+    """Agents with text in every indexed field"""
+    return [
+        {"id": "01_art_director", "level": "L1", "title": "Art Director", "role": "Guardian of visual style",
+         "responsibilities": ["Asset Review", "Palette Control"]},
+        {"id": "L2.1.1", "level": "L2", "name": "Style Analyst", "role": "Deep image analysis",
+         "parent_l1": "1", "capabilities": ["Color histogram analysis"]},
+        {"id": "L2.1.2", "level": "L2", "name": "Roast Master", "role": "Brutal honesty critic",
+         "parent_l1": "1", "capabilities": ["Style transfer validation"]},
+        {"id": "L3.1.1.1", "level": "L3", "name": "Palette Validator", "task": "Check hex values against the style guide",
+         "parent_l1": "1", "parent_l2": "L2.1.1"}
+    ]
+
+
+def ids(results):
+    return [a["id"] for a in results]
+
+
+class TestAgentSearchIndex:
+    """Test tokenized prefix search and ranking"""
+
+    def test_tokenize_splits_ids_and_punctuation(self):
+        """Test ids and punctuation break into lowercase words"""
+        assert tokenize("01_art_director") == ["01", "art", "director"]
+        assert tokenize("Color-histogram, ANALYSIS!") == ["color", "histogram", "analysis"]
+
+    def test_prefix_terms_must_all_match(self, agents):
+        """Test every query word is a prefix of some token (AND)"""
+        index = AgentSearchIndex()
+        index.refresh(agents)
+
+        assert ids(index.search("sty ana")) == ["L2.1.1"]
+        assert ids(index.search("histo")) == ["L2.1.1"]
+        assert ids(index.search("hex")) == ["L3.1.1.1"]
+        assert index.search("style zebra") == []
+
+    def test_ranks_identifying_fields_first(self, agents):
+        """Test a name match outranks matches in role, task or capabilities"""
+        index = AgentSearchIndex()
+        index.refresh(agents)
+
+        results = ids(index.search("style"))
+        assert results[0] == "L2.1.1"
+        assert set(results) == {"01_art_director", "L2.1.1", "L2.1.2", "L3.1.1.1"}
+
+    def test_id_prefix(self, agents):
+        """Test a query that is a prefix of an agent id"""
+        index = AgentSearchIndex()
+        index.refresh(agents)
+
+        assert ids(index.search("L2.1."))[:2] == ["L2.1.1", "L2.1.2"]
+        assert ids(index.search("01_art"))[0] == "01_art_director"
+
+    def test_level_and_parent_filters(self, agents):
+        """Test results can be narrowed like registry.select()"""
+        index = AgentSearchIndex()
+        index.refresh(agents)
+
+        assert ids(index.search("style", level="L2")) == ["L2.1.1", "L2.1.2"]
+        assert ids(index.search("style", parent="L2.1.1")) == ["L3.1.1.1"]
+
+    def test_incremental_refresh(self, agents):
+        """Test only changed agents are re-indexed and removed tokens disappear"""
+        index = AgentSearchIndex()
+        assert index.refresh(agents)["added"] == 4
+        assert ids(index.search("roast")) == ["L2.1.2"]
+
+        changed = [dict(a) for a in agents[:2]] + [dict(agents[2], name="Harsh Critic")]
+        counts = index.refresh(changed)
+
+        assert counts == {"added": 0, "updated": 1, "removed": 1, "unchanged": 2}
+        assert index.search("roast") == []
+        assert index.search("hex") == []
+        assert ids(index.search("harsh")) == ["L2.1.2"]
+        # Unchanged agents now resolve to the new dicts
+        assert index.search("histo")[0] is changed[1]
+        assert index.get_stats()["documents"] == 3
+
+    def test_derive_leaves_previous_generation(self, agents):
+        """Test a derived index re-tokenizes changes only and the original keeps serving"""
+        index = AgentSearchIndex()
+        index.refresh(agents)
+
+        changed = [dict(a) for a in agents[:2]] + [dict(agents[2], name="Harsh Critic")]
+        derived = index.derive(changed)
+
+        assert derived.get_stats()["last_refresh"] == {"added": 0, "updated": 1, "removed": 1, "unchanged": 2}
+        assert ids(derived.search("harsh")) == ["L2.1.2"]
+        assert derived.search("roast") == []
+        assert ids(index.search("roast")) == ["L2.1.2"]
+        assert index.search("harsh") == []
+
+
+class TestAgentListSearch:
+    """Test GET /api/agents?search= uses the index"""
+
+    def test_search_ranked_across_fields(self, test_client, agents):
+        """Test capabilities and tasks are searchable through the endpoint"""
+        l1, l2, l3 = agents[:1], agents[1:3], agents[3:]
+        with patch('api.agents.load_l1_agents', return_value=l1), \
+             patch('api.agents.load_l2_agents', return_value=l2), \
+             patch('api.agents.load_l3_agents', return_value=l3):
+            response = test_client.get("/api/agents?search=valid&level=L2")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert ids(data["agents"]) == ["L2.1.2"]
+        assert data["total"] == 1
@@ -0,0 +1,230 @@
+"""
+Tests for the agent hierarchy SQL sync (services/agent_sync.py)
+"""
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import NullPool
+
+from database.models import Base, Agent, KnowledgeFile
+from services.agent_registry import AgentRegistry
+from services.agent_sync import AgentSync
+from utils.db_helpers import QueryOptimizer
+
+
+@pytest.fixture
+def agents():
+    """Two L1 agents with sub-agents and micro-agents"""
+    l1 = [
+        {"id": "01_art_director", "level": "L1", "name": "Art Director"},
+        {"id": "02_character_pipeline", "level": "L1", "name": "Character Pipeline"}
+    ]
+    l2 = [
+        {"id": "L2.1.1", "level": "L2", "name": "Style", "parent_l1": "1"},
+        {"id": "L2.2.1", "level": "L2", "name": "Rigging", "parent_l1": "2"}
+    ]
+    l3 = [
+        {"id": "L3.1.1.1", "level": "L3", "name": "Palette", "parent_l1": "1", "parent_l2": "L2.1.1"},
+        {"id": "L3.1.1.2", "level": "L3", "name": "Lighting", "parent_l1": "1", "parent_l2": "L2.1.1"}
+    ]
+    return l1, l2, l3
+
+
+@pytest.fixture
+def knowledge():
+    """Knowledge files of the art director"""
+    return {
+        "01_art_director": [
+            {"path": "/kb/art-director/style/palette.md", "size": 100, "modified": "2025-11-07T09:00:00"},
+            {"path": "/kb/art-director/style/light.md", "size": 200, "modified": "2025-11-07T10:00:00"}
+        ]
+    }
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Temporary database with the application schema (one connection per session)"""
+    path = tmp_path / "agents.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    sync_engine.dispose()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+class TestAgentSync:
+    """Test bulk diff-based upserts"""
+
+    @pytest.mark.asyncio
+    async def test_initial_sync_inserts_everything(self, session_factory, agents, knowledge):
+        """Test every agent and knowledge file is inserted with its parent link"""
+        async with session_factory() as session:
+            result = await AgentSync().sync(session, AgentRegistry(*agents), knowledge)
+
+            rows = (await session.execute(select(Agent).order_by(Agent.position))).scalars().all()
+            files = (await session.execute(select(KnowledgeFile))).scalars().all()
+
+        assert result["agents"]["inserted"] == 6
+        assert result["knowledge_files"]["inserted"] == 2
+        assert [r.name for r in rows][:3] == ["01_art_director", "02_character_pipeline", "L2.1.1"]
+        assert rows[-1].parent_l2 == "L2.1.1"
+        assert rows[-1].category == "Art Director"
+        assert {f.agent_id for f in files} == {rows[0].id}
+
+    @pytest.mark.asyncio
+    async def test_resync_writes_only_differences(self, session_factory, agents, knowledge):
+        """Test unchanged rows are left alone and changes are upserted or deleted"""
+        l1, l2, l3 = agents
+        sync = AgentSync()
+        async with session_factory() as session:
+            await sync.sync(session, AgentRegistry(l1, l2, l3), knowledge)
+
+            unchanged = await sync.sync(session, AgentRegistry(l1, l2, l3), knowledge)
+            assert unchanged["agents"] == {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 6}
+
+            edited = [dict(l3[0], name="Palette Keeper")]
+            moved_file = {"01_art_director": [dict(knowledge["01_art_director"][0], size=150)]}
+            result = await sync.sync(session, AgentRegistry(l1, l2, edited), moved_file)
+
+            row = (await session.execute(select(Agent).where(Agent.name == "L3.1.1.1"))).scalar_one()
+
+        assert result["agents"] == {"inserted": 0, "updated": 1, "deleted": 1, "unchanged": 4}
+        assert result["knowledge_files"] == {"inserted": 0, "updated": 1, "deleted": 1, "unchanged": 0}
+        assert row.title == "Palette Keeper"
+
+    @pytest.mark.asyncio
+    async def test_duplicate_ids_stored_under_suffixed_names(self, session_factory, agents, knowledge):
+        """Test repeated agent ids get their own rows instead of being dropped"""
+        l1, l2, l3 = agents
+        duplicated = l3 + [dict(l3[0], name="Palette (copy)")]
+        async with session_factory() as session:
+            result = await AgentSync().sync(session, AgentRegistry(l1, l2, duplicated), knowledge)
+
+            rows = (await session.execute(select(Agent).order_by(Agent.position))).scalars().all()
+
+        assert result["agents"]["inserted"] == 7
+        assert [r.name for r in rows][-3:] == ["L3.1.1.1", "L3.1.1.2", "L3.1.1.1@1"]
+        assert rows[-1].title == "Palette (copy)"
+
+    @pytest.mark.asyncio
+    async def test_ensure_current_skips_synced_generation(self, session_factory, agents, knowledge):
+        """Test the same registry and knowledge generation is synced once"""
+        sync = AgentSync()
+        registry = AgentRegistry(*agents)
+        async with session_factory() as session:
+            assert await sync.ensure_current(session, registry, knowledge) is not None
+            assert await sync.ensure_current(session, registry, knowledge) is None
+
+        assert sync.get_status()["syncs"] == 1
+
+    @pytest.mark.asyncio
+    async def test_synced_agents_filtered_in_sql(self, session_factory, agents, knowledge):
+        """Test level/parent filters, counts and paging run against the tables"""
+        async with session_factory() as session:
+            await AgentSync().sync(session, AgentRegistry(*agents), knowledge)
+
+            page, total = await QueryOptimizer.get_synced_agents(session, parent="1", offset=1, limit=1)
+            files = await QueryOptimizer.get_knowledge_files_by_agent_name(session, "01_art_director")
+
+        assert total == 3
+        assert page == [agents[2][0]]
+        assert [f.file_path for f in files] == sorted(f["path"] for f in knowledge["01_art_director"])
+
+
+class TestSqlBackendEndpoints:
+    """Test the agents API with AGENTS_SQL_BACKEND on"""
+
+    def test_list_and_knowledge_served_from_sql(self, test_client, session_factory, agents, knowledge):
+        """Test listings and agent knowledge come from the synced tables"""
+        from main import app
+        from database import get_db
+
+        async def override_get_db():
+            async with session_factory() as session:
+                yield session
+
+        l1, l2, l3 = agents
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            with patch('api.agents.settings.AGENTS_SQL_BACKEND', True), \
+                 patch('api.agents.agent_sync', AgentSync()), \
+                 patch('api.agents.load_l1_agents', return_value=l1), \
+                 patch('api.agents.load_l2_agents', return_value=l2), \
+                 patch('api.agents.load_l3_agents', return_value=l3), \
+                 patch('api.agents.scan_all_agent_knowledge', return_value=knowledge), \
+                 patch('api.agents.optimizer.get_synced_agents', wraps=QueryOptimizer.get_synced_agents) as query:
+                listing = test_client.get("/api/agents?level=L3&page_size=1&page=2").json()
+                files = test_client.get("/api/agents/01_art_director/knowledge").json()
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+
+        assert query.called
+        assert [a["id"] for a in listing["agents"]] == ["L3.1.1.2"]
+        assert listing["total"] == 2
+        assert listing["meta"]["page"] == 2
+        assert files["total_files"] == 2
+        assert {f["name"] for f in files["files"]} == {"palette.md", "light.md"}
+
+    def test_duplicate_ids_match_in_memory_listing(self, test_client, session_factory, agents, knowledge):
+        """Test agents sharing an id are all listed, with or without the SQL backend"""
+        from main import app
+        from database import get_db
+
+        async def override_get_db():
+            async with session_factory() as session:
+                yield session
+
+        l1, l2, l3 = agents
+        duplicated = l3 + [dict(l3[0], name="Palette (copy)"), dict(l3[1], name="Lighting (copy)")]
+
+        def listing(sql_backend):
+            with patch('api.agents.settings.AGENTS_SQL_BACKEND', sql_backend), \
+                 patch('api.agents.agent_sync', AgentSync()), \
+                 patch('api.agents.load_l1_agents', return_value=l1), \
+                 patch('api.agents.load_l2_agents', return_value=l2), \
+                 patch('api.agents.load_l3_agents', return_value=duplicated), \
+                 patch('api.agents.scan_all_agent_knowledge', return_value=knowledge):
+                return test_client.get("/api/agents?page_size=100").json()
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            from_sql = listing(True)
+            in_memory = listing(False)
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+
+        assert from_sql["total"] == in_memory["total"] == 8
+        assert sorted(a["name"] for a in from_sql["agents"]) == sorted(a["name"] for a in in_memory["agents"])
+
+    def test_sql_and_in_memory_pages_share_order(self, test_client, session_factory, agents, knowledge):
+        """Test page/offset listings come back in the same order with or without the SQL backend"""
+        from main import app
+        from database import get_db
+
+        async def override_get_db():
+            async with session_factory() as session:
+                yield session
+
+        l1, l2, l3 = agents
+        # Load order differs from the natural id order
+        l1 = list(reversed(l1))
+        l3 = list(reversed(l3))
+
+        def listing(sql_backend, query):
+            with patch('api.agents.settings.AGENTS_SQL_BACKEND', sql_backend), \
+                 patch('api.agents.agent_sync', AgentSync()), \
+                 patch('api.agents.load_l1_agents', return_value=l1), \
+                 patch('api.agents.load_l2_agents', return_value=l2), \
+                 patch('api.agents.load_l3_agents', return_value=l3), \
+                 patch('api.agents.scan_all_agent_knowledge', return_value=knowledge):
+                return [a["id"] for a in test_client.get(f"/api/agents?{query}").json()["agents"]]
+
+        app.dependency_overrides[get_db] = override_get_db
+        try:
+            for query in ("page_size=100", "page_size=2&page=2", "level=L3", "parent=1&offset=1&page_size=2"):
+                assert listing(True, query) == listing(False, query), query
+            assert listing(True, "page_size=2") == ["02_character_pipeline", "01_art_director"]
+        finally:
+            app.dependency_overrides.pop(get_db, None)
@@ -175,6 +175,38 @@ class TestAgentsAPI:
             data = response.json()
             assert data.get("status") == "success"
 
+    def test_cache_invalidation_reparses_l1_files(self, test_client, tmp_path):
+        """Test invalidating the cache picks up an edited L1 file"""
+        from api import agents
+        from utils.disk_cache import FileParseCache
+
+        agent_file = tmp_path / "01_ART_DIRECTOR_AGENT.md"
+        agent_file.write_text("# Art Director\n")
+
+        def titles():
+            response = test_client.get("/api/agents?level=L1")
+            assert response.status_code == 200
+            return [agent["name"] for agent in response.json()["agents"]]
+
+        with patch.object(agents, "AI_AGENTS_ROOT", tmp_path), \
+             patch.object(agents, "L1_AGENT_FILES", [agent_file.name]), \
+             patch.object(agents, "parse_cache", FileParseCache(tmp_path / "parse_cache.db")), \
+             patch('api.agents.load_l2_agents', return_value=[]), \
+             patch('api.agents.load_l3_agents', return_value=[]):
+            agents.parse_agent_markdown.invalidate()
+            agents.load_l1_agents.invalidate()
+            try:
+                assert titles() == ["Art Director"]
+
+                agent_file.write_text("# Lead Art Director\n")
+                response = test_client.post("/api/agents/cache/invalidate")
+                assert response.status_code == 200
+
+                assert titles() == ["Lead Art Director"]
+            finally:
+                agents.parse_agent_markdown.invalidate()
+                agents.load_l1_agents.invalidate()
+
     def test_cache_stats(self, test_client):
         """Test cache statistics endpoint"""
         mock_cache_stats = {"hits": 10, "misses": 5, "size": 3}
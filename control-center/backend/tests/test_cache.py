@@ -0,0 +1,598 @@
+"""
+Tests for the caching layer (utils/cache.py)
+"""
+import asyncio
+import threading
+import time
+import pytest
+from utils.cache import (
+    SimpleCache, SingleFlight, cached, call_cached, sweep_all_caches,
+    invalidate_tags, make_cache_key, deep_sizeof, configure_memory_budget
+)
+
+
+class TestSimpleCache:
+    """Test LRU + TTL cache behaviour"""
+
+    def test_set_and_get(self):
+        """Test basic set/get round trip"""
+        cache = SimpleCache(ttl=60)
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        assert cache.get("missing") is None
+        assert cache.get("missing", "default") == "default"
+
+    def test_ttl_expiry(self):
+        """Test entries expire after TTL"""
+        cache = SimpleCache(ttl=0.05)
+        cache.set("key", "value")
+        time.sleep(0.1)
+
+        assert cache.get("key") is None
+        assert cache.get_stats()["expirations"] == 1
+
+    def test_lru_eviction(self):
+        """Test least recently used entry is evicted when full"""
+        cache = SimpleCache(ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # 'b' is now least recently used
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get_stats()["total_entries"] == 2
+
+    def test_hit_miss_accounting(self):
+        """Test hit and miss counters and hit rate"""
+        cache = SimpleCache(ttl=60)
+        cache.set("key", "value")
+        cache.get("key")
+        cache.get("key")
+        cache.get("key")
+        cache.get("other")
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 3
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.75
+
+    def test_sweep_removes_expired_entries(self):
+        """Test sweeper purges expired entries without lookups"""
+        cache = SimpleCache(ttl=0.05)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        time.sleep(0.1)
+        cache.set("c", 3)
+
+        assert cache.get_stats()["expired_entries"] == 2
+        assert cache.sweep() == 2
+        assert cache.get_stats()["total_entries"] == 1
+
+    def test_sweep_all_caches(self):
+        """Test global sweep reaches every live cache"""
+        first = SimpleCache(ttl=0.05)
+        second = SimpleCache(ttl=0.05)
+        first.set("a", 1)
+        second.set("b", 2)
+        time.sleep(0.1)
+
+        assert sweep_all_caches() >= 2
+        assert first.get_stats()["total_entries"] == 0
+        assert second.get_stats()["total_entries"] == 0
+
+
+class TestCachedDecorator:
+    """Test @cached decorator"""
+
+    def test_caches_results(self):
+        """Test repeated calls hit the cache"""
+        calls = []
+
+        @cached(ttl=60)
+        def load(x):
+            calls.append(x)
+            return x * 2
+
+        assert load(2) == 4
+        assert load(2) == 4
+        assert load(3) == 6
+        assert calls == [2, 3]
+
+        stats = load.cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["loads"] == 2
+
+    def test_caches_none_results(self):
+        """Test None is cached like any other value"""
+        calls = []
+
+        @cached(ttl=60)
+        def load():
+            calls.append(1)
+            return None
+
+        load()
+        load()
+        assert len(calls) == 1
+
+    def test_maxsize_bounds_entries(self):
+        """Test decorator cache is bounded by maxsize"""
+        @cached(ttl=60, maxsize=3)
+        def load(x):
+            return x
+
+        for i in range(10):
+            load(i)
+
+        assert load.cache.get_stats()["total_entries"] == 3
+
+    def test_invalidate(self):
+        """Test manual invalidation clears cached results"""
+        calls = []
+
+        @cached(ttl=60)
+        def load():
+            calls.append(1)
+            return "value"
+
+        load()
+        load.invalidate()
+        load()
+        assert len(calls) == 2
+
+
+class TestCacheKeysAndTags:
+    """Test hashed keys and tag-based invalidation"""
+
+    def test_keys_are_hashed_and_stable(self):
+        """Test keys are short, stable and distinguish arguments"""
+        def load(path, limit=10):
+            return path
+
+        key = make_cache_key(load, ("C:/very/long/path" * 20,), {"limit": 5})
+
+        assert key.startswith("load:")
+        assert len(key) == len("load:") + 16
+        assert key == make_cache_key(load, ("C:/very/long/path" * 20,), {"limit": 5})
+        assert key != make_cache_key(load, ("C:/very/long/path" * 20,), {"limit": 6})
+
+    def test_invalidate_tags_pattern(self):
+        """Test only entries with matching tags are dropped"""
+        cache = SimpleCache(ttl=60)
+        cache.set("l2", "l2 agents", tags=["agent:L2", "agent:L2.3.1", "agent:L2.3.2"])
+        cache.set("l2-other", "more l2 agents", tags=["agent:L2.4.1"])
+        cache.set("kb", "kb files", tags=["kb:art-director"])
+
+        assert cache.invalidate_tags("agent:L2.3.*") == 1
+        assert cache.get("l2") is None
+        assert cache.get("l2-other") == "more l2 agents"
+        assert cache.invalidate_tags("kb:art-director") == 1
+        assert cache.invalidate_tags("kb:art-director") == 0
+        assert cache.get_stats()["tags"] == 1
+
+    def test_eviction_releases_tags(self):
+        """Test evicted and overwritten entries leave the tag index"""
+        cache = SimpleCache(ttl=60, maxsize=1)
+        cache.set("a", 1, tags=["t:a"])
+        cache.set("b", 2, tags=["t:b"])
+
+        assert cache.get_stats()["tags"] == 1
+        cache.set("b", 3, tags=["t:c"])
+        assert [e["tags"] for e in cache.entries()] == [["t:c"]]
+
+    def test_decorator_tags_from_result(self):
+        """Test @cached tags results and named caches are reachable by tag"""
+        calls = []
+
+        @cached(ttl=60, tags=lambda agents, level: [f"agent:{a}" for a in agents])
+        def load(level):
+            calls.append(level)
+            return [f"{level}.1", f"{level}.2"]
+
+        load("L2.3")
+        load("L2.4")
+
+        removed = invalidate_tags("agent:L2.3.*")
+        assert removed == {load.cache.name: 1}
+
+        load("L2.3")
+        load("L2.4")
+        assert calls == ["L2.3", "L2.4", "L2.3"]
+
+    def test_tag_function_errors_do_not_fail_load(self):
+        """Test a failing tag function still caches the result untagged"""
+        @cached(ttl=60, tags=lambda result: result["missing"])
+        def load():
+            return {}
+
+        assert load() == {}
+        assert load.cache.entries()[0]["tags"] == []
+
+
+class TestMemoryAccounting:
+    """Test approximate byte accounting and memory budgets"""
+
+    def test_deep_sizeof_counts_nested_content(self):
+        """Test nested values contribute to the measured size"""
+        small = {"id": "L2.1.1", "capabilities": []}
+        large = {"id": "L2.1.1", "capabilities": [str(i) + "x" * 1000 for i in range(10)]}
+
+        assert deep_sizeof(large) > deep_sizeof(small) + 10000
+
+    def test_deep_sizeof_sampling_is_close(self):
+        """Test sampled sizes of large lists stay close to the exact size"""
+        agents = [{"id": f"L3.{i}", "name": f"Agent {i}" * 3, "task": "t" * 50} for i in range(2000)]
+
+        exact = deep_sizeof(agents, sample=10000)
+        sampled = deep_sizeof(agents, sample=64)
+
+        assert abs(sampled - exact) / exact < 0.1
+
+    def test_entry_sizes_are_tracked(self):
+        """Test stats report bytes and removals release them"""
+        cache = SimpleCache(ttl=60)
+        cache.set("a", "x" * 10000)
+        cache.set("b", "y" * 10000)
+
+        assert cache.get_stats()["approx_bytes"] >= 20000
+        cache.invalidate("a")
+        assert 10000 <= cache.get_stats()["approx_bytes"] < 20000
+        cache.clear()
+        assert cache.get_stats()["approx_bytes"] == 0
+
+    def test_max_bytes_evicts_lru(self):
+        """Test exceeding max_bytes evicts least recently used entries"""
+        cache = SimpleCache(ttl=60, max_bytes=25000)
+        cache.set("a", "x" * 10000)
+        cache.set("b", "y" * 10000)
+        cache.get("a")  # 'b' is now least recently used
+        cache.set("c", "z" * 10000)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get_stats()["budget_evictions"] == 1
+
+    def test_oversized_entry_is_kept(self):
+        """Test a single entry larger than the budget is still cached"""
+        cache = SimpleCache(ttl=60, max_bytes=100)
+        cache.set("big", "x" * 10000)
+
+        assert cache.get("big") is not None
+
+    def test_global_budget_evicts_from_largest_cache(self):
+        """Test the combined budget trims the biggest cache first"""
+        big = SimpleCache(ttl=60)
+        small = SimpleCache(ttl=60)
+        try:
+            big.set("a", "x" * 200000)
+            big.set("b", "x" * 200000)
+            small.set("a", "y" * 1000)
+
+            from utils.cache import total_cache_bytes
+            configure_memory_budget(total_cache_bytes() - 100000)
+
+            assert big.get("a") is None
+            assert big.get("b") is not None
+            assert small.get("a") is not None
+        finally:
+            configure_memory_budget(None)
+
+
+class TestCacheApi:
+    """Test cache management endpoints"""
+
+    def test_invalidate_tag_endpoint(self, test_client):
+        """Test tag invalidation reports removals per cache"""
+        @cached(ttl=60, tags=["kb:api-test"])
+        def load():
+            return "value"
+
+        load()
+        response = test_client.post("/api/cache/invalidate/tag", params={"pattern": "kb:api-test"})
+
+        assert response.status_code == 200
+        assert response.json()["invalidated"] == {load.cache.name: 1}
+
+    def test_invalidate_key_endpoint(self, test_client):
+        """Test single keys can be invalidated by cache name"""
+        @cached(ttl=60)
+        def load(x):
+            return x
+
+        load(1)
+        load(2)
+        entries = test_client.get("/api/cache/entries", params={"cache": load.cache.name}).json()
+        key = entries["caches"][load.cache.name][0]["key"]
+
+        response = test_client.post("/api/cache/invalidate/key", params={"cache": load.cache.name, "key": key})
+
+        assert response.status_code == 200
+        assert load.cache.get_stats()["total_entries"] == 1
+
+    def test_stats_report_memory(self, test_client):
+        """Test /api/cache/stats includes the memory footprint"""
+        response = test_client.get("/api/cache/stats")
+
+        assert response.status_code == 200
+        memory = response.json()["memory"]
+        assert memory["approx_bytes"] >= 0
+        assert "by_cache" in memory
+
+    def test_every_cached_function_is_reported(self, test_client):
+        """Test caches added outside the original list appear in stats and are invalidated"""
+        from api.agents import parse_agent_markdown
+        from api.projects import scan_all_projects
+
+        parse_agent_markdown.cache.set("marker", {})
+        stats = test_client.get("/api/cache/stats").json()
+
+        assert {"parse_agent_markdown", "all_agent_knowledge", "l1_agents"} <= set(stats["caches"]["agents"])
+        assert "all_projects" in stats["caches"]["projects"]
+        assert "global" in stats["caches"]["agents"]
+        assert scan_all_projects.cache.name in stats["memory"]["by_cache"]
+
+        response = test_client.post("/api/cache/invalidate")
+
+        assert response.status_code == 200
+        assert {"agents", "knowledge", "projects"} <= set(response.json()["invalidated"])
+        assert parse_agent_markdown.cache.peek("marker") is None
+
+    def test_unknown_cache_is_404(self, test_client):
+        """Test unknown cache names are rejected"""
+        response = test_client.post("/api/cache/invalidate/key", params={"cache": "missing", "key": "k"})
+        assert response.status_code == 404
+
+
+class TestSingleFlight:
+    """Test request coalescing for concurrent misses"""
+
+    def test_concurrent_misses_load_once(self):
+        """Test concurrent callers share a single load"""
+        calls = []
+        barrier = threading.Barrier(8)
+
+        @cached(ttl=60)
+        def load():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(load())
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert results == ["value"] * 8
+        assert load.cache.get_stats()["coalesced"] == 7
+
+    def test_invalidation_during_load_reloads(self):
+        """Test a load overtaken by invalidate() is redone, not cached"""
+        source = {"value": "before"}
+        started = threading.Event()
+        release = threading.Event()
+
+        @cached(ttl=None)
+        def load():
+            value = source["value"]
+            if not started.is_set():
+                started.set()
+                release.wait()
+            return value
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(load()))
+        leader.start()
+        started.wait()
+
+        # The file changes and the watcher invalidates while the load is blocked
+        source["value"] = "after"
+        load.invalidate()
+        joiner = threading.Thread(target=lambda: results.append(load()))
+        joiner.start()
+        release.set()
+        leader.join()
+        joiner.join()
+
+        assert results == ["after", "after"]
+        assert load() == "after"
+        assert load.cache.get_stats()["discarded_loads"] == 1
+
+    def test_invalidating_other_key_keeps_load(self):
+        """Test invalidate(key) only outdates loads of that key"""
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        @cached(ttl=None)
+        def load(path):
+            calls.append(path)
+            if path == "a.md":
+                started.set()
+                release.wait()
+            return path.upper()
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(load("a.md")))
+        leader.start()
+        started.wait()
+
+        # A watcher event for another file arrives while a.md is loading
+        load.invalidate("b.md")
+        release.set()
+        leader.join()
+
+        assert results == ["A.MD"]
+        assert load("a.md") == "A.MD"
+        assert calls == ["a.md"]
+        assert load.cache.get_stats()["discarded_loads"] == 0
+
+    def test_errors_propagate_to_waiters(self):
+        """Test waiters receive the leader's exception and next call retries"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def failing():
+            started.set()
+            release.wait()
+            raise ValueError("boom")
+
+        errors = []
+
+        def leader():
+            try:
+                flight.do("key", failing)
+            except ValueError as e:
+                errors.append(e)
+
+        t = threading.Thread(target=leader)
+        t.start()
+        started.wait()
+
+        future, is_leader = flight.join_or_lead("key")
+        assert not is_leader
+        release.set()
+        t.join()
+
+        with pytest.raises(ValueError):
+            future.result()
+        assert len(errors) == 1
+        assert not flight.in_flight("key")
+
+
+class TestStaleWhileRevalidate:
+    """Test stale-while-revalidate policy"""
+
+    def test_serves_stale_and_refreshes_in_background(self):
+        """Test expired values are returned immediately while one refresh runs"""
+        calls = []
+        refreshed = threading.Event()
+
+        @cached(ttl=0.05, stale_while_revalidate=True)
+        def load():
+            calls.append(1)
+            if len(calls) > 1:
+                time.sleep(0.1)
+                refreshed.set()
+            return len(calls)
+
+        assert load() == 1
+        time.sleep(0.1)
+
+        # Expired: stale value comes back without waiting for the reload
+        start = time.perf_counter()
+        assert load() == 1
+        assert load() == 1
+        assert time.perf_counter() - start < 0.1
+
+        assert refreshed.wait(2)
+        time.sleep(0.05)
+        assert load() == 2
+        assert len(calls) == 2
+        assert load.cache.get_stats()["stale_hits"] >= 2
+
+    def test_stale_window_limits_servable_age(self):
+        """Test entries past stale_ttl are treated as misses"""
+        cache = SimpleCache(ttl=0.05, stale_ttl=0.05)
+        cache.set("key", "value")
+        time.sleep(0.07)
+
+        assert cache.get("key") is None
+        assert cache.get_stale("key") == ("value", False)
+
+        time.sleep(0.05)
+        assert cache.get_stale("key") == (None, False)
+
+    def test_sweep_keeps_stale_entries(self):
+        """Test sweeper only removes entries past the stale window"""
+        cache = SimpleCache(ttl=0.05, stale_ttl=60)
+        cache.set("key", "value")
+        time.sleep(0.07)
+
+        assert cache.sweep() == 0
+        assert cache.get_stale("key") == ("value", False)
+
+
+class TestAsyncCached:
+    """Test async access to @cached loaders"""
+
+    @pytest.mark.asyncio
+    async def test_aget_offloads_blocking_loader(self):
+        """Test a slow loader does not block the event loop"""
+        @cached(ttl=60)
+        def slow_load():
+            time.sleep(0.3)
+            return "value"
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            assert await slow_load.aget() == "value"
+        finally:
+            task.cancel()
+
+        # The loop kept running while the loader slept in a worker thread
+        assert ticks >= 10
+        assert slow_load.cache.get_stats()["loads"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_aget_coalesces(self):
+        """Test concurrent async misses share a single load"""
+        calls = []
+
+        @cached(ttl=60)
+        def load(x):
+            calls.append(x)
+            time.sleep(0.1)
+            return x * 2
+
+        results = await asyncio.gather(*(load.aget(21) for _ in range(5)))
+
+        assert results == [42] * 5
+        assert calls == [21]
+        assert await load.aget(21) == 42
+        assert load.cache.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_call_cached_plain_function(self):
+        """Test call_cached runs uncached callables on the loader pool"""
+        def plain(a, b=1):
+            return a + b
+
+        assert await call_cached(plain, 1, b=2) == 3
+
+    @pytest.mark.asyncio
+    async def test_aget_propagates_errors(self):
+        """Test loader exceptions reach the awaiting caller and are not cached"""
+        calls = []
+
+        @cached(ttl=60)
+        def failing():
+            calls.append(1)
+            raise RuntimeError("load failed")
+
+        with pytest.raises(RuntimeError):
+            await failing.aget()
+        with pytest.raises(RuntimeError):
+            await failing.aget()
+        assert len(calls) == 2
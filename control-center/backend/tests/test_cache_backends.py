@@ -0,0 +1,200 @@
+"""
+Tests for shared cache backends (utils/cache_backends.py)
+"""
+import time
+import pytest
+from utils.cache import SimpleCache, cached, configure_cache_backend, get_cache_backend
+from utils.cache_backends import InProcessBackend, RedisBackend, create_backend
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_server():
+    """In-memory Redis server shared by the simulated workers"""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def worker_backends(redis_server):
+    """Two backends on one server, as two uvicorn workers would have"""
+    first = RedisBackend(fakeredis.FakeRedis(server=redis_server), prefix="test:")
+    second = RedisBackend(fakeredis.FakeRedis(server=redis_server), prefix="test:")
+    yield first, second
+    first.stop()
+    second.stop()
+
+
+@pytest.fixture
+def shared_backend(worker_backends):
+    """Install the first worker's backend for this process"""
+    configure_cache_backend(worker_backends[0])
+    yield worker_backends
+    configure_cache_backend(InProcessBackend())
+
+
+def wait_for(condition, timeout=2.0):
+    """Poll until condition() is true"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+class TestInProcessBackend:
+    """Test the default per-worker backend"""
+
+    def test_default_backend(self):
+        """Test caches are in-process unless configured otherwise"""
+        assert get_cache_backend().name == "memory"
+        assert SimpleCache(name="local").get_stats()["backend"] == "memory"
+
+    def test_create_backend_falls_back(self):
+        """Test a missing Redis URL falls back to in-process caching"""
+        assert isinstance(create_backend("redis", None), InProcessBackend)
+        assert isinstance(create_backend("unknown"), InProcessBackend)
+
+
+class TestRedisBackend:
+    """Test the Redis-protocol backend against fakeredis"""
+
+    def test_round_trip_keeps_store_time(self, worker_backends):
+        """Test entries are shared as JSON with their original timestamp"""
+        first, second = worker_backends
+        first.set("agents", "key", {"id": 1}, stored_at=123.0, expire=60)
+
+        assert second.get("agents", "key") == (123.0, {"id": 1}, ())
+        assert second.get("agents", "other") is None
+
+    def test_invalidate_tags(self, worker_backends):
+        """Test tag patterns delete only the tagged shared entries"""
+        first, second = worker_backends
+        first.set("agents", "l2", [1], stored_at=time.time(), tags=["agent:L2.3.1", "agent:L2.3.2"])
+        first.set("agents", "l3", [2], stored_at=time.time(), tags=["agent:L3.3.1.1"])
+
+        second.invalidate_tags("agents", "agent:L2.3.*")
+
+        assert first.get("agents", "l2") is None
+        assert first.get("agents", "l3") == (pytest.approx(time.time(), abs=5), [2], ("agent:L3.3.1.1",))
+
+    def test_unserializable_values_stay_local(self, worker_backends):
+        """Test values JSON cannot represent are skipped"""
+        first, second = worker_backends
+        first.set("agents", "key", {1, 2, 3}, stored_at=time.time())
+
+        assert second.get("agents", "key") is None
+        assert first.get_stats()["skipped_unserializable"] == 1
+
+    def test_invalidate_namespace(self, worker_backends):
+        """Test clearing a namespace leaves the others"""
+        first, second = worker_backends
+        first.set("agents", "a", 1, stored_at=time.time())
+        first.set("agents", "b", 2, stored_at=time.time())
+        first.set("knowledge", "a", 3, stored_at=time.time())
+
+        first.invalidate("agents")
+
+        assert second.get("agents", "a") is None
+        assert second.get("agents", "b") is None
+        assert second.get("knowledge", "a") is not None
+
+    def test_invalidations_fan_out(self, worker_backends):
+        """Test other workers receive published invalidations but not their own"""
+        first, second = worker_backends
+        received_first = []
+        received_second = []
+        first.start(lambda namespace, key, tags: received_first.append((namespace, key, tags)))
+        second.start(lambda namespace, key, tags: received_second.append((namespace, key, tags)))
+        time.sleep(0.1)
+
+        first.invalidate("agents", "key")
+        first.invalidate("knowledge")
+        first.invalidate_tags("agents", "agent:L2.3.*")
+
+        assert wait_for(lambda: len(received_second) == 3)
+        assert received_second == [
+            ("agents", "key", None),
+            ("knowledge", None, None),
+            ("agents", None, "agent:L2.3.*")
+        ]
+        assert received_first == []
+
+    def test_unreachable_redis_degrades_to_miss(self, redis_server):
+        """Test connection errors are counted and treated as misses"""
+        redis_server.connected = False
+        backend = RedisBackend(fakeredis.FakeRedis(server=redis_server))
+
+        assert backend.get("agents", "key") is None
+        backend.set("agents", "key", 1, stored_at=time.time())
+        assert backend.get_stats()["errors"] == 2
+
+
+class TestSharedCache:
+    """Test SimpleCache and @cached on top of a shared backend"""
+
+    def test_loads_are_shared_between_workers(self, shared_backend):
+        """Test a value loaded by one worker is a hit for another"""
+        _, other_worker = shared_backend
+        calls = []
+
+        @cached(ttl=60)
+        def load():
+            calls.append(1)
+            return ["agent"]
+
+        assert load() == ["agent"]
+
+        # Another worker stored the same entry; simulate this worker restarting cold
+        load.cache._drop_local()
+        assert load() == ["agent"]
+        assert len(calls) == 1
+        assert load.cache.get_stats()["remote_hits"] == 1
+
+        assert list(other_worker.client.scan_iter(match=f"test:{load.cache.name}:*"))
+
+    def test_expired_local_entry_picks_up_newer_shared_value(self, shared_backend):
+        """Test a worker prefers a fresher entry loaded by another worker"""
+        _, other_worker = shared_backend
+        cache = SimpleCache(ttl=0.05, name="shared-test")
+        cache.set("key", "old")
+        time.sleep(0.07)
+
+        other_worker.set("shared-test", "key", "new", stored_at=time.time(), expire=60)
+
+        assert cache.get("key") == "new"
+
+    def test_remote_invalidation_drops_local_entries(self, shared_backend):
+        """Test an invalidation published by another worker clears this worker's copy"""
+        first, other_worker = shared_backend
+        cache = SimpleCache(ttl=60, name="fanout-test")
+        cache.set("key", "value")
+        time.sleep(0.1)
+
+        other_worker.invalidate("fanout-test", "key")
+
+        assert wait_for(lambda: cache.get_stats()["total_entries"] == 0)
+        assert cache.get("key") is None
+        assert first.get_stats()["invalidations_received"] == 1
+
+    def test_remote_tag_invalidation_drops_local_entries(self, shared_backend):
+        """Test tag invalidations from another worker reach this worker's copy"""
+        _, other_worker = shared_backend
+        cache = SimpleCache(ttl=60, name="tag-fanout-test")
+        cache.set("l2", "value", tags=["agent:L2.3.1"])
+        cache.set("kb", "value", tags=["kb:art-director"])
+        time.sleep(0.1)
+
+        other_worker.invalidate_tags("tag-fanout-test", "agent:L2.3.*")
+
+        assert wait_for(lambda: cache.peek("l2") is None)
+        assert cache.peek("kb") == "value"
+
+    def test_unnamed_caches_stay_local(self, shared_backend):
+        """Test caches without a name never touch the shared backend"""
+        first, _ = shared_backend
+        cache = SimpleCache(ttl=60)
+        cache.set("key", "value")
+
+        assert first.get_stats()["sets"] == 0
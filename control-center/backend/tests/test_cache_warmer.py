@@ -0,0 +1,112 @@
+"""
+Tests for startup cache warm-up (services/cache_warmer.py)
+"""
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from services.cache_warmer import CacheWarmer
+from utils.cache import cached
+
+
+class TestCacheWarmer:
+    """Test parallel warm-up and progress tracking"""
+
+    @pytest.mark.asyncio
+    async def test_warms_steps_in_parallel(self):
+        """Test every loader runs once, concurrently, and lands in its cache"""
+        @cached(ttl=60)
+        def first():
+            time.sleep(0.2)
+            return "first"
+
+        @cached(ttl=60)
+        def second():
+            time.sleep(0.2)
+            return "second"
+
+        warmer = CacheWarmer({"first": first, "second": second})
+        start = time.perf_counter()
+        await warmer.run()
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.35
+        status = warmer.get_status()
+        assert status["state"] == "complete"
+        assert status["ready"] is True
+        assert status["percent"] == 100.0
+        assert {s["status"] for s in status["steps"].values()} == {"done"}
+        assert first.cache.get_stats()["loads"] == 1
+        assert second.cache.get_stats()["loads"] == 1
+
+    @pytest.mark.asyncio
+    async def test_not_ready_while_running(self):
+        """Test readiness is held back until warm-up finishes"""
+        @cached(ttl=60)
+        def slow():
+            time.sleep(0.2)
+            return "value"
+
+        warmer = CacheWarmer({"slow": slow})
+        assert warmer.ready  # idle: nothing scheduled
+
+        task = warmer.start()
+        await asyncio.sleep(0.05)
+        assert not warmer.ready
+        assert warmer.get_status()["steps"]["slow"]["status"] == "running"
+
+        await task
+        assert warmer.ready
+
+    @pytest.mark.asyncio
+    async def test_failed_step_does_not_block(self):
+        """Test a failing loader is reported and the rest still warm"""
+        def broken():
+            raise RuntimeError("share offline")
+
+        warmer = CacheWarmer({"broken": broken, "ok": lambda: "ok"})
+        await warmer.run()
+
+        steps = warmer.get_status()["steps"]
+        assert steps["broken"]["status"] == "failed"
+        assert steps["broken"]["error"] == "share offline"
+        assert steps["ok"]["status"] == "done"
+        assert warmer.ready
+
+    @pytest.mark.asyncio
+    async def test_timeout_abandons_slow_steps(self):
+        """Test readiness flips after the timeout even if a loader hangs"""
+        def hanging():
+            time.sleep(0.5)
+
+        warmer = CacheWarmer({"hanging": hanging})
+        await warmer.run(timeout=0.05)
+
+        assert warmer.ready
+        assert warmer.get_status()["steps"]["hanging"]["status"] == "timeout"
+
+
+class TestReadinessEndpoint:
+    """Test /health/ready reports warm-up progress"""
+
+    def test_ready_when_warmup_idle(self, test_client):
+        """Test readiness without a scheduled warm-up"""
+        response = test_client.get("/health/ready")
+
+        assert response.status_code == 200
+        assert response.json()["checks"]["cache_warmup"] is True
+
+    def test_not_ready_during_warmup(self, test_client):
+        """Test a running warm-up returns 503 with progress"""
+        warmer = CacheWarmer({"l1_agents": lambda: []})
+        warmer.state = "running"
+        warmer.progress = {"l1_agents": {"status": "running", "duration_ms": None, "error": None}}
+
+        with patch("services.cache_warmer.cache_warmer", warmer):
+            response = test_client.get("/health/ready")
+
+        assert response.status_code == 503
+        body = response.json()
+        assert body["ready"] is False
+        assert body["warmup"]["state"] == "running"
+        assert body["warmup"]["total_steps"] == 1
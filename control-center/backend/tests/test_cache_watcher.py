@@ -0,0 +1,122 @@
+"""
+Tests for file-change-driven cache invalidation (services/cache_watcher.py)
+"""
+import time
+import pytest
+from unittest.mock import patch
+
+from api import agents, knowledge
+from services.cache_watcher import CacheInvalidationWatcher
+from utils.cache import make_cache_key
+from utils.disk_cache import FileParseCache
+
+pytest.importorskip("watchdog")
+
+
+@pytest.fixture
+def watched_roots(tmp_path):
+    """Point the agent and KB modules at temporary directories"""
+    agents_root = tmp_path / "agents"
+    kb_parent = tmp_path / "kb-parent"
+    kb_root = kb_parent / "knowledge-base"
+    agents_root.mkdir()
+    (kb_parent / "ai-agents" / "art-director").mkdir(parents=True)
+    (kb_root / "metadata").mkdir(parents=True)
+
+    with patch.object(agents, "AI_AGENTS_ROOT", agents_root), \
+         patch.object(agents, "KB_ROOT", kb_root), \
+         patch.object(knowledge, "AI_AGENTS_ROOT", kb_parent), \
+         patch.object(knowledge, "KB_ROOT", kb_root), \
+         patch.object(knowledge, "CREATOR_DB", kb_root / "metadata" / "creator-database.json"), \
+         patch.object(agents, "parse_cache", FileParseCache(tmp_path / "parse_cache.db")):
+        yield agents_root, kb_parent, kb_root
+
+
+class TestCacheInvalidationWatcher:
+    """Test mapping of file changes to cache invalidations"""
+
+    def test_l1_change_invalidates_only_that_file(self, watched_roots):
+        """Test an L1 edit drops that file's parse and the L1 list"""
+        agents_root, _, _ = watched_roots
+        first = agents_root / "01_ART_DIRECTOR_AGENT.md"
+        second = agents_root / "02_CHARACTER_PIPELINE_AGENT.md"
+        first.write_text("# Art Director\n")
+        second.write_text("# Character Pipeline\n")
+
+        agents.parse_agent_markdown.invalidate()
+        agents.parse_agent_markdown(str(first))
+        agents.parse_agent_markdown(str(second))
+
+        watcher = CacheInvalidationWatcher()
+        invalidated = watcher.handle_change(first)
+
+        assert invalidated == ["l1_agents:01_ART_DIRECTOR_AGENT.md"]
+        cache = agents.parse_agent_markdown.cache
+        func = agents.parse_agent_markdown.__wrapped__
+        assert cache.peek(make_cache_key(func, (str(first),), {})) is None
+        assert cache.peek(make_cache_key(func, (str(second),), {})) is not None
+
+    def test_architecture_docs_invalidate_their_level(self, watched_roots):
+        """Test L2/L3 architecture docs map to their loaders"""
+        agents_root, _, _ = watched_roots
+        watcher = CacheInvalidationWatcher()
+
+        assert watcher.handle_change(agents_root / "SUB_AGENT_ARCHITECTURE.md") == ["l2_agents"]
+        assert watcher.handle_change(agents_root / "L3_MICRO_AGENT_ARCHITECTURE.md") == ["l3_agents"]
+
+    def test_kb_changes_invalidate_kb_index(self, watched_roots):
+        """Test KB markdown and creator DB changes"""
+        _, kb_parent, kb_root = watched_roots
+        watcher = CacheInvalidationWatcher()
+
+        kb_file = kb_parent / "ai-agents" / "art-director" / "insight.md"
+        assert watcher.handle_change(kb_file) == ["kb_files"]
+        assert watcher.handle_change(kb_root / "L1-ui-ux" / "notes.md") == ["kb_files", "agent_knowledge:ui-ux"]
+        assert watcher.handle_change(kb_root / "metadata" / "creator-database.json") == ["creator_database"]
+        assert watcher.handle_change(kb_root / "logs" / "scan.log") == []
+
+    def test_kb_changes_invalidate_by_agent_tag(self, watched_roots):
+        """Test a KB edit drops only entries tagged with its agent directory"""
+        _, kb_parent, kb_root = watched_roots
+        kb_cache = knowledge.scan_kb_files.cache
+        knowledge_cache = agents.scan_all_agent_knowledge.cache
+        kb_cache.set("art", [], tags=["kb:files", "kb:art-director"])
+        kb_cache.set("ui", [], tags=["kb:files", "kb:ui-ux"])
+        knowledge_cache.set("art", {}, tags=["kb:agent-knowledge", "kb:art-director"])
+        knowledge_cache.set("ui", {}, tags=["kb:agent-knowledge", "kb:ui-ux"])
+        try:
+            watcher = CacheInvalidationWatcher()
+            watcher.handle_change(kb_parent / "ai-agents" / "art-director" / "insight.md")
+            assert kb_cache.peek("art") is None
+            assert kb_cache.peek("ui") is not None
+
+            watcher.handle_change(kb_root / "L1-art-director" / "notes.md")
+            assert knowledge_cache.peek("art") is None
+            assert knowledge_cache.peek("ui") is not None
+        finally:
+            kb_cache.clear()
+            knowledge_cache.clear()
+
+    def test_start_extends_ttl_and_reacts_to_events(self, watched_roots):
+        """Test running watcher removes TTL expiry and invalidates on real events"""
+        agents_root, _, _ = watched_roots
+        watcher = CacheInvalidationWatcher()
+        assert watcher.start(polling=True, watched_ttl=None)
+        try:
+            assert agents.load_l2_agents.cache.ttl is None
+            assert agents.scan_all_agent_knowledge.cache.ttl is None
+
+            agents.load_l2_agents.cache.set("marker", [])
+            (agents_root / "SUB_AGENT_ARCHITECTURE.md").write_text("# Sub agents\n")
+
+            deadline = time.time() + 5
+            while time.time() < deadline and agents.load_l2_agents.cache.peek("marker") is not None:
+                time.sleep(0.1)
+
+            assert agents.load_l2_agents.cache.peek("marker") is None
+            assert watcher.get_status()["invalidations"] >= 1
+        finally:
+            watcher.stop()
+
+        assert agents.load_l2_agents.cache.ttl == 300
+        assert agents.scan_all_agent_knowledge.cache.ttl == 300
@@ -0,0 +1,118 @@
+"""
+Tests for the persistent parse tier (utils/disk_cache.py)
+"""
+import os
+import pytest
+from utils.disk_cache import FileParseCache
+
+
+@pytest.fixture
+def parse_cache(tmp_path):
+    """Parse cache backed by a temporary database"""
+    cache = FileParseCache(tmp_path / "cache" / "parse_cache.db")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def agent_file(tmp_path):
+    """Markdown file to parse"""
+    path = tmp_path / "01_TEST_AGENT.md"
+    path.write_text("# Test Agent\n\nContent\n", encoding="utf-8")
+    return path
+
+
+def count_lines(calls):
+    """Build a parser that records each call"""
+    def parser(path):
+        calls.append(path)
+        return {"lines": len(path.read_text(encoding="utf-8").split("\n"))}
+    return parser
+
+
+class TestFileParseCache:
+    """Test mtime/size validated parse results"""
+
+    def test_reuses_result_for_unchanged_file(self, parse_cache, agent_file):
+        """Test an unchanged file is parsed only once"""
+        calls = []
+        parser = count_lines(calls)
+
+        first = parse_cache.get_or_parse("test:v1", agent_file, parser)
+        second = parse_cache.get_or_parse("test:v1", agent_file, parser)
+
+        assert first == second == {"lines": 4}
+        assert len(calls) == 1
+        stats = parse_cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+
+    def test_survives_restart(self, tmp_path, agent_file):
+        """Test a new instance on the same database reuses stored results"""
+        db_path = tmp_path / "parse_cache.db"
+        calls = []
+
+        first = FileParseCache(db_path)
+        first.get_or_parse("test:v1", agent_file, count_lines(calls))
+        first.close()
+
+        second = FileParseCache(db_path)
+        assert second.get_or_parse("test:v1", agent_file, count_lines(calls)) == {"lines": 4}
+        second.close()
+        assert len(calls) == 1
+
+    def test_reparses_after_change(self, parse_cache, agent_file):
+        """Test a changed mtime/size invalidates the stored result"""
+        calls = []
+        parser = count_lines(calls)
+        parse_cache.get_or_parse("test:v1", agent_file, parser)
+
+        agent_file.write_text("# Test Agent\n\nMore\ncontent\n", encoding="utf-8")
+        stat = agent_file.stat()
+        os.utime(agent_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert parse_cache.get_or_parse("test:v1", agent_file, parser) == {"lines": 5}
+        assert len(calls) == 2
+
+    def test_namespaces_are_separate(self, parse_cache, agent_file):
+        """Test a namespace version bump forces a re-parse"""
+        calls = []
+        parse_cache.get_or_parse("test:v1", agent_file, count_lines(calls))
+        parse_cache.get_or_parse("test:v2", agent_file, count_lines(calls))
+
+        assert len(calls) == 2
+
+    def test_should_store_skips_results(self, parse_cache, agent_file):
+        """Test rejected results (e.g. errors) are not persisted"""
+        calls = []
+
+        def failing(path):
+            calls.append(path)
+            return {"error": "parse failed"}
+
+        parse_cache.get_or_parse("test:v1", agent_file, failing, should_store=lambda d: "error" not in d)
+        parse_cache.get_or_parse("test:v1", agent_file, failing, should_store=lambda d: "error" not in d)
+
+        assert len(calls) == 2
+        assert parse_cache.get_stats()["entries"] == 0
+
+    def test_disabled_always_parses(self, parse_cache, agent_file):
+        """Test the tier can be switched off"""
+        calls = []
+        parse_cache.enabled = False
+        parse_cache.get_or_parse("test:v1", agent_file, count_lines(calls))
+        parse_cache.get_or_parse("test:v1", agent_file, count_lines(calls))
+
+        assert len(calls) == 2
+        assert not parse_cache.db_path.exists()
+
+    def test_clear_namespace(self, parse_cache, agent_file):
+        """Test clearing one namespace keeps the others"""
+        calls = []
+        parse_cache.get_or_parse("a:v1", agent_file, count_lines(calls))
+        parse_cache.get_or_parse("b:v1", agent_file, count_lines(calls))
+
+        parse_cache.clear("a:v1")
+
+        assert parse_cache.get_stats()["entries"] == 1
@@ -0,0 +1,95 @@
+"""
+Tests for ETag / If-None-Match support (utils/etag.py)
+"""
+import pytest
+from unittest.mock import patch
+from utils.etag import content_version, generation_version
+
+
+@pytest.fixture
+def agents():
+    """One agent per level"""
+    l1 = [{"id": "01_art_director", "level": "L1", "title": "Art Director"}]
+    l2 = [{"id": "L2.1.1", "level": "L2", "name": "Style", "parent_l1": "1"}]
+    l3 = [{"id": "L3.1.1.1", "level": "L3", "name": "Palette", "parent_l1": "1", "parent_l2": "L2.1.1"}]
+    return l1, l2, l3
+
+
+class TestVersions:
+    """Test content and generation versions"""
+
+    def test_content_version_ignores_key_order(self):
+        """Test equal data hashes equally and changed data does not"""
+        assert content_version({"a": 1, "b": [1, 2]}) == content_version({"b": [1, 2], "a": 1})
+        assert content_version({"a": 1}) != content_version({"a": 2})
+
+    def test_generation_version_hashes_once(self):
+        """Test a generation is hashed the first time it is seen only"""
+        data = [{"id": "x"}]
+
+        with patch("utils.etag.content_version", return_value="v1") as hasher:
+            assert generation_version(data) == "v1"
+            assert generation_version(data) == "v1"
+
+        assert hasher.call_count == 1
+
+
+class TestConditionalRequests:
+    """Test endpoints answer If-None-Match with 304"""
+
+    def get(self, test_client, agents, url, headers=None):
+        l1, l2, l3 = agents
+        with patch('api.agents.load_l1_agents', return_value=l1), \
+             patch('api.agents.load_l2_agents', return_value=l2), \
+             patch('api.agents.load_l3_agents', return_value=l3):
+            return test_client.get(url, headers=headers or {})
+
+    def test_agents_list_not_modified(self, test_client, agents):
+        """Test a repeat poll with the ETag gets an empty 304"""
+        first = self.get(test_client, agents, "/api/agents")
+        etag = first.headers["etag"]
+
+        second = self.get(test_client, agents, "/api/agents", {"If-None-Match": etag})
+
+        assert etag.startswith('W/"')
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["etag"] == etag
+
+    def test_etag_changes_with_query_and_data(self, test_client, agents):
+        """Test other pages and reloaded agents get other tags"""
+        etag = self.get(test_client, agents, "/api/agents/stats").headers["etag"]
+        other_query = self.get(test_client, agents, "/api/agents/stats?x=1").headers["etag"]
+
+        l1, l2, l3 = agents
+        reloaded = (l1, l2 + [{"id": "L2.1.2", "level": "L2", "name": "Assets", "parent_l1": "1"}], l3)
+        response = self.get(test_client, reloaded, "/api/agents/stats", {"If-None-Match": etag})
+
+        assert other_query != etag
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["l2_count"] == 2
+
+    def test_agent_detail_not_modified(self, test_client, agents):
+        """Test agent details revalidate against the registry version"""
+        etag = self.get(test_client, agents, "/api/agents/L2.1.1").headers["etag"]
+
+        response = self.get(test_client, agents, "/api/agents/L2.1.1", {"If-None-Match": f'"other", {etag}'})
+
+        assert response.status_code == 304
+
+    def test_kb_files_not_modified(self, test_client):
+        """Test KB listings are tagged by their scan generation"""
+        kb_files = [{"path": "C:/kb/a.md", "name": "a.md", "agent": "ui-ux", "size": 10,
+                     "modified": "2025-11-07T09:00:00", "category": "guides"}]
+
+        with patch('api.knowledge.scan_kb_files', return_value=kb_files):
+            etag = test_client.get("/api/knowledge/files").headers["etag"]
+            response = test_client.get("/api/knowledge/files", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+        with patch('api.knowledge.scan_kb_files', return_value=kb_files + [dict(kb_files[0], name="b.md")]):
+            changed = test_client.get("/api/knowledge/files", headers={"If-None-Match": etag})
+
+        assert changed.status_code == 200
@@ -0,0 +1,129 @@
+"""
+Tests for block-incremental parsing of the architecture documents (services/incremental_parser.py)
+"""
+import pytest
+from unittest.mock import patch
+from services.incremental_parser import IncrementalDocumentParser, split_blocks
+from services.markdown_parser import parse_micro_agent_text, parse_sub_agent_text
+
+
+L3_DOCUMENT = """# L3 MICRO-AGENT ARCHITECTURE
+
+## L2.1.1 Style Analyst
+
+#### L3.1.1.1: **Image Source Validator**
+**Specialty:** Validate image sources
+
+#### L3.1.1.2: **Quality Scorer**
+**Specialty:** Rate technical quality
+
+#### L3.1.1.3: **Pose Cataloger**
+**Specialty:** Organize references by pose
+"""
+
+
+@pytest.fixture
+def l3_parser():
+    """Incremental parser for L3 micro-agent blocks"""
+    return IncrementalDocumentParser("####", parse_micro_agent_text, name="l3_agents")
+
+
+class TestSplitBlocks:
+    """Test block fingerprinting boundaries"""
+
+    def test_blocks_cover_document(self):
+        """Test blocks start at prefixed lines and cover every byte"""
+        data = L3_DOCUMENT.encode("utf-8")
+        blocks = split_blocks(data, b"####")
+
+        assert len(blocks) == 4
+        assert b"".join(block for _, block in blocks) == data
+        assert all(block.startswith(b"####") for _, block in blocks[1:])
+        assert [offset for offset, _ in blocks][1] == data.index(b"#### L3.1.1.1")
+
+
+class TestIncrementalDocumentParser:
+    """Test only changed blocks are re-parsed"""
+
+    def test_matches_full_parse(self, l3_parser):
+        """Test block-wise parsing gives the same agents as a full parse"""
+        agents = l3_parser.parse_text(L3_DOCUMENT)
+
+        assert agents == [a.to_dict() for a in parse_micro_agent_text(L3_DOCUMENT)]
+        assert l3_parser.last_diff["initial"] is True
+        assert l3_parser.last_diff["added"] == ["L3.1.1.1", "L3.1.1.2", "L3.1.1.3"]
+
+    def test_unchanged_document_reuses_every_block(self, l3_parser):
+        """Test a re-parse of identical text parses nothing"""
+        l3_parser.parse_text(L3_DOCUMENT)
+        l3_parser.parse_text(L3_DOCUMENT)
+
+        diff = l3_parser.last_diff
+        assert diff["reparsed_blocks"] == 0
+        assert diff["reused_blocks"] == 4
+        assert diff["added"] == diff["removed"] == diff["changed"] == []
+
+    def test_edit_reparses_one_block(self, l3_parser):
+        """Test editing one agent re-parses only its block and reports it"""
+        l3_parser.parse_text(L3_DOCUMENT)
+        edited = L3_DOCUMENT.replace("Rate technical quality", "Rate sharpness and noise")
+
+        agents = l3_parser.parse_text(edited)
+
+        diff = l3_parser.last_diff
+        assert diff["reparsed_blocks"] == 1
+        assert diff["changed"] == ["L3.1.1.2"]
+        assert agents[1]["task"] == "**Specialty:** Rate sharpness and noise"
+        assert l3_parser.get_stats()["last_parse"]["changed"] == 1
+
+    def test_added_and_removed_agents(self, l3_parser):
+        """Test inserted and deleted blocks appear in the diff"""
+        l3_parser.parse_text(L3_DOCUMENT)
+        edited = L3_DOCUMENT.replace(
+            "#### L3.1.1.3: **Pose Cataloger**\n**Specialty:** Organize references by pose\n",
+            "#### L3.1.1.4: **Lighting Checker**\n**Specialty:** Check light direction\n"
+        )
+
+        l3_parser.parse_text(edited)
+
+        diff = l3_parser.last_diff
+        assert diff["added"] == ["L3.1.1.4"]
+        assert diff["removed"] == ["L3.1.1.3"]
+        assert diff["changed"] == []
+        assert diff["reparsed_blocks"] == 1
+
+    def test_windows_crlf_file(self, tmp_path, l3_parser):
+        """Test CRLF files parse like text-mode reads"""
+        path = tmp_path / "L3_MICRO_AGENT_ARCHITECTURE.md"
+        path.write_bytes(L3_DOCUMENT.replace("\n", "\r\n").encode("utf-8"))
+
+        agents = l3_parser.parse(path)
+
+        assert agents == [a.to_dict() for a in parse_micro_agent_text(L3_DOCUMENT)]
+
+    def test_sub_agent_blocks(self):
+        """Test L2 sub-agent blocks split on ### headers"""
+        document = (
+            "# 1. ART DIRECTOR AGENT\n\n"
+            "### Sub-Agent 1.1: **Style Analyst**\n**Role:** Image analysis\n\n"
+            "**Capabilities:**\n- Pixel comparison\n\n"
+            "### Sub-Agent 1.2: **Roast Master**\n**Role:** Critic\n"
+        )
+        parser = IncrementalDocumentParser("### ", parse_sub_agent_text)
+
+        assert parser.parse_text(document) == [a.to_dict() for a in parse_sub_agent_text(document)]
+
+
+class TestAgentChangesEndpoint:
+    """Test GET /api/agents/changes"""
+
+    def test_reports_last_diff(self, test_client, l3_parser):
+        """Test the route is not swallowed by /{agent_id} and returns the diff"""
+        l3_parser.parse_text(L3_DOCUMENT)
+        l3_parser.parse_text(L3_DOCUMENT.replace("Quality Scorer", "Sharpness Scorer"))
+
+        with patch("api.agents.l3_document", l3_parser):
+            response = test_client.get("/api/agents/changes")
+
+        assert response.status_code == 200
+        assert response.json()["l3"]["changed"] == ["L3.1.1.2"]
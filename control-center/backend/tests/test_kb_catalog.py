@@ -0,0 +1,179 @@
+"""
+Tests for the incremental KB file catalog (services/kb_catalog.py)
+"""
+import os
+import time
+import pytest
+from unittest.mock import patch
+
+from services.kb_catalog import KnowledgeCatalog
+
+
+def age(path, seconds=60):
+    """Move a directory's mtime into the past so its listing can be reused"""
+    past = time.time_ns() - seconds * 1_000_000_000
+    os.utime(path, ns=(past, past))
+
+
+def edit_in_place(path, content):
+    """Rewrite a file leaving its directory's mtime untouched"""
+    mtime_ns = os.stat(path.parent).st_mtime_ns
+    path.write_text(content, encoding="utf-8")
+    os.utime(path.parent, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def kb_tree(tmp_path):
+    """Two-level KB tree with markdown, JSON and ignored files"""
+    root = tmp_path / "L1-art-director"
+    (root / "style").mkdir(parents=True)
+    (root / "palette.md").write_text("palette", encoding="utf-8")
+    (root / "meta.json").write_text("{}", encoding="utf-8")
+    (root / "image.png").write_bytes(b"png")
+    (root / "style" / "light.md").write_text("light", encoding="utf-8")
+    for directory in (root / "style", root):
+        age(directory)
+    return root
+
+
+@pytest.fixture
+def catalog():
+    """Empty catalog"""
+    return KnowledgeCatalog()
+
+
+def count_scandir():
+    """Patch os.scandir in the catalog, counting directory listings"""
+    return patch('services.kb_catalog.os.scandir', wraps=os.scandir)
+
+
+class TestKnowledgeCatalog:
+    """Test scandir walks, listing reuse and change events"""
+
+    def test_walk_lists_tracked_files_in_order(self, catalog, kb_tree):
+        """Test files come back pre-order, filtered by suffix"""
+        names = [entry.name for entry in catalog.walk(kb_tree)]
+        md = [entry.name for entry in catalog.walk(kb_tree, suffix=".md")]
+
+        assert names == ["meta.json", "palette.md", "light.md"]
+        assert md == ["palette.md", "light.md"]
+
+    def test_unchanged_tree_is_not_relisted(self, catalog, kb_tree):
+        """Test a rescan reuses every listing and emits no events"""
+        events = []
+        catalog.subscribe(events.extend)
+        catalog.walk(kb_tree)
+        assert len(events) == 3
+
+        with count_scandir() as scandir:
+            catalog.walk(kb_tree)
+
+        assert scandir.call_count == 0
+        assert len(events) == 3
+        assert catalog.get_stats()["reused"] == 2
+
+    def test_added_and_deleted_files(self, catalog, kb_tree):
+        """Test only the changed directory is listed again"""
+        catalog.walk(kb_tree)
+        events = []
+        catalog.subscribe(events.extend)
+
+        (kb_tree / "style" / "shadow.md").write_text("shadow", encoding="utf-8")
+        (kb_tree / "palette.md").unlink()
+        with count_scandir() as scandir:
+            catalog.walk(kb_tree)
+
+        assert scandir.call_count == 2
+        assert sorted((e["type"], os.path.basename(e["path"])) for e in events) == [
+            ("added", "shadow.md"), ("deleted", "palette.md")
+        ]
+
+    def test_edit_in_unchanged_directory(self, catalog, kb_tree):
+        """Test an edited file is re-stat'ed without listing its directory"""
+        catalog.walk(kb_tree)
+        events = []
+        catalog.subscribe(events.extend)
+
+        edit_in_place(kb_tree / "style" / "light.md", "brighter light")
+        with count_scandir() as scandir:
+            files = catalog.walk(kb_tree, suffix=".md")
+
+        assert scandir.call_count == 0
+        assert [e["type"] for e in events] == ["changed"]
+        assert files[1].size == len("brighter light")
+
+    def test_trusted_mtimes_rely_on_dirty_marks(self, catalog, kb_tree):
+        """Test trusted directories skip re-stats until marked dirty"""
+        catalog.walk(kb_tree)
+        catalog.trust_directory_mtime = True
+        edit_in_place(kb_tree / "style" / "light.md", "brighter light")
+
+        assert catalog.walk(kb_tree, suffix=".md")[1].size == len("light")
+
+        catalog.mark_dirty(kb_tree / "style")
+        assert catalog.walk(kb_tree, suffix=".md")[1].size == len("brighter light")
+
+    def test_removed_subtree_emits_deletes(self, catalog, kb_tree):
+        """Test deleting a directory drops its cataloged files"""
+        catalog.walk(kb_tree)
+        events = []
+        catalog.subscribe(events.extend)
+
+        (kb_tree / "style" / "light.md").unlink()
+        (kb_tree / "style").rmdir()
+        files = catalog.walk(kb_tree)
+
+        assert [e["type"] for e in events] == ["deleted"]
+        assert [entry.name for entry in files] == ["meta.json", "palette.md"]
+        assert catalog.get_stats()["directories"] == 1
+
+    def test_subdirectories_by_prefix(self, catalog, tmp_path, kb_tree):
+        """Test immediate subdirectories are filtered by name prefix"""
+        (tmp_path / "metadata").mkdir()
+
+        assert catalog.subdirectories(tmp_path, prefix="L1-") == [str(kb_tree)]
+        assert catalog.subdirectories(tmp_path / "missing") == []
+
+
+class TestCatalogConsumers:
+    """Test the knowledge API and KB manager listings come from the catalog"""
+
+    def test_scan_kb_files(self, tmp_path, kb_tree):
+        """Test scan_kb_files lists agent and L1 markdown files"""
+        from api import knowledge
+
+        agent_dir = tmp_path / "ai-agents" / "ai-agents" / "ui-ux"
+        agent_dir.mkdir(parents=True)
+        (agent_dir / "layout.md").write_text("layout", encoding="utf-8")
+
+        with patch.object(knowledge, "AI_AGENTS_ROOT", tmp_path / "ai-agents"), \
+             patch.object(knowledge, "KB_ROOT", tmp_path), \
+             patch.object(knowledge, "kb_catalog", KnowledgeCatalog()):
+            knowledge.scan_kb_files.invalidate()
+            try:
+                files = knowledge.scan_kb_files()
+            finally:
+                knowledge.scan_kb_files.invalidate()
+
+        assert [(f["name"], f["agent"], f["category"]) for f in files] == [
+            ("layout.md", "ui-ux", "ui-ux"),
+            ("palette.md", "knowledge-base", "L1-art-director"),
+            ("light.md", "knowledge-base", "style")
+        ]
+
+    def test_scan_kb_directories(self, tmp_path, kb_tree):
+        """Test the KB manager splits one walk into markdown and JSON files"""
+        from services.kb_manager import KnowledgeBaseManager
+
+        manager = KnowledgeBaseManager()
+        manager.kb_root = tmp_path
+        manager.ai_agents_root = tmp_path / "ai-agents"
+
+        with patch('services.kb_manager.kb_catalog', KnowledgeCatalog()):
+            structure = manager.scan_kb_directories()
+            total = sum(entry.size for entry in manager.catalog_files())
+
+        assert structure["L1_directories"] == [kb_tree]
+        assert [p.name for p in structure["markdown_files"]] == ["palette.md", "light.md"]
+        assert [p.name for p in structure["json_files"]] == ["meta.json"]
+        assert total == len("palette") + len("{}") + len("light")
@@ -0,0 +1,176 @@
+"""
+Tests for content-hash keyed KB insights (services/kb_insights.py)
+"""
+import base64
+import os
+import time
+import pytest
+from unittest.mock import patch
+
+from services.kb_catalog import KnowledgeCatalog
+from services.kb_insights import KnowledgeInsights, extract_insights, _read_insights
+
+
+DOCUMENT = (
+    "# Style Guide\n\n"
+    "## Colors\nConfidence: 70%\n\n"
+    "## Links\nSee https://example.com\n"
+    "Overall confidence 85%\n"
+)
+
+
+@pytest.fixture
+def kb_dir(tmp_path):
+    """KB directory with two markdown files"""
+    root = tmp_path / "L1-art-director"
+    root.mkdir()
+    (root / "style.md").write_text(DOCUMENT, encoding="utf-8")
+    (root / "notes.md").write_text("# Notes\n\n```py\nprint()\n```\n", encoding="utf-8")
+    past = time.time_ns() - 60_000_000_000
+    os.utime(root, ns=(past, past))
+    return root
+
+
+@pytest.fixture
+def catalog():
+    """Empty catalog"""
+    return KnowledgeCatalog()
+
+
+@pytest.fixture
+def insights(catalog):
+    """Insight store fed by the catalog"""
+    return KnowledgeInsights(catalog)
+
+
+def count_reads():
+    """Patch the insight reader, counting file reads"""
+    return patch('services.kb_insights._read_insights', wraps=_read_insights)
+
+
+class TestExtractInsights:
+    """Test markdown insight extraction"""
+
+    def test_extracts_metadata(self):
+        """Test title, sections, words, last confidence and flags"""
+        assert extract_insights(DOCUMENT) == {
+            "title": "Style Guide",
+            "sections": 2,
+            "word_count": 14,
+            "confidence": 85,
+            "has_code": False,
+            "has_links": True
+        }
+
+
+class TestKnowledgeInsights:
+    """Test insights are extracted once per content"""
+
+    def test_walks_only_mark_files_pending(self, insights, catalog, kb_dir):
+        """Test walking reads nothing; files are extracted once, on first use"""
+        with count_reads() as reader:
+            catalog.walk(kb_dir)
+        assert reader.call_count == 0
+        assert insights.get_stats()["pending"] == 2
+
+        with count_reads() as reader:
+            result = insights.get_many(catalog.files(".md"))
+            insights.get_many(catalog.files(".md"))
+
+        assert reader.call_count == 2
+        assert insights.get_stats()["pending"] == 0
+        assert [r["title"] for r in result] == ["Notes", "Style Guide"]
+        assert result[0]["has_code"] is True
+
+    def test_changed_file_is_reread(self, insights, catalog, kb_dir):
+        """Test an edit re-extracts and a touch reuses the content hash"""
+        catalog.walk(kb_dir)
+        style = kb_dir / "style.md"
+        assert insights.get(catalog.entry(style))["confidence"] == 85
+
+        style.write_text(DOCUMENT.replace("85%", "90%"), encoding="utf-8")
+        os.utime(style, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        catalog.walk(kb_dir)
+        assert insights.peek(catalog.entry(style)) is None
+        assert insights.get(catalog.entry(style))["confidence"] == 90
+
+        parses = insights.get_stats()["parses"]
+        os.utime(style, ns=(time.time_ns(), time.time_ns() + 2_000_000_000))
+        catalog.walk(kb_dir)
+
+        assert insights.get(catalog.entry(style))["confidence"] == 90
+        assert insights.get_stats()["parses"] == parses
+
+    def test_deleted_file_is_forgotten(self, insights, catalog, kb_dir):
+        """Test deleting a file drops its path and its unshared content"""
+        insights.get_many(catalog.walk(kb_dir, suffix=".md"))
+        (kb_dir / "notes.md").unlink()
+        catalog.walk(kb_dir)
+
+        assert insights.get_stats()["files"] == 1
+        assert insights.get_stats()["contents"] == 1
+
+
+class TestInsightEndpoints:
+    """Test the knowledge API serves insights from the store"""
+
+    @pytest.fixture
+    def kb_api(self, tmp_path, kb_dir, catalog, insights):
+        """Knowledge API pointed at the temporary KB"""
+        from api import knowledge
+
+        kb_files = [
+            {"path": entry.path, "name": entry.name, "agent": "knowledge-base",
+             "size": entry.size, "modified": entry.modified, "category": kb_dir.name}
+            for entry in catalog.walk(kb_dir, suffix=".md")
+        ]
+        with patch.object(knowledge, "KB_ROOT", tmp_path), \
+             patch.object(knowledge, "kb_catalog", catalog), \
+             patch.object(knowledge, "kb_insights", insights), \
+             patch.object(knowledge, "scan_kb_files", return_value=kb_files):
+            yield knowledge
+
+    def test_recent_files_read_once(self, test_client, kb_api):
+        """Test recent files carry insights, reading each file only the first time"""
+        with count_reads() as reader:
+            test_client.get("/api/knowledge/recent?limit=100")
+            response = test_client.get("/api/knowledge/recent?limit=100")
+
+        assert response.status_code == 200
+        assert reader.call_count == 2
+        assert {f["name"]: f["insights"]["title"] for f in response.json()["files"]} == {
+            "style.md": "Style Guide", "notes.md": "Notes"
+        }
+
+    def test_file_details_from_store(self, test_client, kb_api, kb_dir, catalog):
+        """Test file details are stat'ed and insights served from the store"""
+        style = kb_dir / "style.md"
+        file_id = base64.b64encode(str(style).encode()).decode()
+
+        with count_reads() as reader:
+            test_client.get(f"/api/knowledge/files/{file_id}")
+            response = test_client.get(f"/api/knowledge/files/{file_id}")
+
+        assert response.status_code == 200
+        assert reader.call_count == 1
+        data = response.json()
+        assert data["size"] == len(DOCUMENT)
+        assert data["created"] == catalog.entry(style).created
+        assert data["insights"]["confidence"] == 85
+
+    def test_file_details_ahead_of_catalog(self, test_client, kb_api, kb_dir):
+        """Test edits and deletes show up before the catalog walks again"""
+        style = kb_dir / "style.md"
+        file_id = base64.b64encode(str(style).encode()).decode()
+        first = test_client.get(f"/api/knowledge/files/{file_id}")
+
+        style.write_text(DOCUMENT.replace("85%", "90%!"), encoding="utf-8")
+        os.utime(style, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        edited = test_client.get(f"/api/knowledge/files/{file_id}")
+
+        assert edited.json()["size"] == len(DOCUMENT) + 1
+        assert edited.json()["insights"]["confidence"] == 90
+        assert edited.headers["ETag"] != first.headers["ETag"]
+
+        style.unlink()
+        assert test_client.get(f"/api/knowledge/files/{file_id}").status_code == 404
@@ -0,0 +1,225 @@
+"""
+Tests for the persistent KB full-text index (services/kb_search_index.py)
+"""
+import os
+import sqlite3
+import threading
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from services.kb_search_index import KnowledgeSearchIndex, build_match_query
+
+
+@pytest.fixture
+def search_index(tmp_path):
+    """Search index backed by a temporary database"""
+    index = KnowledgeSearchIndex(tmp_path / "cache" / "kb_search.db")
+    yield index
+    index.close()
+
+
+def write_kb_file(directory, name, content, agent="art-director"):
+    """Write a markdown file and return its listing entry"""
+    path = directory / name
+    path.write_text(content, encoding="utf-8")
+    stat = os.stat(path)
+    return {
+        "path": str(path),
+        "name": name,
+        "agent": agent,
+        "size": stat.st_size,
+        "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+        "category": directory.name
+    }
+
+
+@pytest.fixture
+def kb_files(tmp_path):
+    """Three KB files of two agents"""
+    return [
+        write_kb_file(tmp_path, "palette.md", "# Palette\n\nWarm colors for the IP-Adapter workflow.\n"),
+        write_kb_file(tmp_path, "lighting.md", "# Lighting\n\nRim lighting and palette notes.\n"),
+        write_kb_file(tmp_path, "rigging.md", "# Rigging\n\nBone weights.\n", agent="character-pipeline")
+    ]
+
+
+class TestBuildMatchQuery:
+    """Test translation of free text to FTS5 syntax"""
+
+    def test_words_become_prefix_phrases(self):
+        """Test each word is a quoted prefix phrase, ANDed together"""
+        assert build_match_query("IP-Adapter warm") == '"ip adapter" * AND "warm" *'
+
+    def test_query_without_words(self):
+        """Test punctuation-only queries match nothing"""
+        assert build_match_query('"* --') is None
+
+
+class TestKnowledgeSearchIndex:
+    """Test indexing and ranked search"""
+
+    def test_search_ranks_and_previews(self, search_index, kb_files, tmp_path):
+        """Test matches come back ranked with a snippet and the listing info"""
+        # Enough non-matching files for "palette" to carry a positive IDF
+        filler = [write_kb_file(tmp_path, f"misc_{n}.md", "Unrelated notes.\n") for n in range(5)]
+        search_index.sync(kb_files + filler)
+
+        results, total = search_index.search("palette")
+
+        assert total == 2
+        assert results[0]["name"] == "palette.md"  # name matches outrank body matches
+        assert results[0]["agent"] == "art-director"
+        assert "Warm colors" in results[0]["preview"]
+        assert results[1]["match_count"] == 1
+        assert results[0]["score"] > results[1]["score"]
+
+    def test_prefix_phrase_and_agent_filter(self, search_index, kb_files):
+        """Test hyphenated and partial words match, and the agent filter applies"""
+        search_index.sync(kb_files)
+
+        assert [r["name"] for r in search_index.search("ip-adapt")[0]] == ["palette.md"]
+        assert search_index.search("bone", agent="art-director") == ([], 0)
+        assert search_index.search("bone", agent="character-pipeline")[1] == 1
+
+    def test_sync_reads_only_changed_files(self, search_index, kb_files, tmp_path):
+        """Test unchanged files are not re-read and removed files are dropped"""
+        search_index.sync(kb_files)
+
+        edited = write_kb_file(tmp_path, "lighting.md", "# Lighting\n\nVolumetric fog.\n")
+
+        def read(path):
+            return open(path, encoding="utf-8").read()
+
+        with patch('services.kb_search_index._read_text', side_effect=read) as reader:
+            result = search_index.sync([kb_files[0], edited])
+
+        assert [call.args[0] for call in reader.call_args_list] == [edited["path"]]
+        assert result["indexed"] == 1
+        assert result["removed"] == 1
+        assert result["unchanged"] == 1
+        assert search_index.search("fog")[1] == 1
+        assert search_index.search("rim")[1] == 0
+        assert search_index.search("bone")[1] == 0
+
+    def test_index_persists_across_instances(self, search_index, kb_files, tmp_path):
+        """Test a reopened index searches without re-reading unchanged files"""
+        search_index.sync(kb_files)
+        search_index.close()
+
+        reopened = KnowledgeSearchIndex(search_index.db_path)
+        try:
+            result = reopened.sync(kb_files)
+            assert result["indexed"] == 0
+            assert reopened.search("rigging")[1] == 1
+        finally:
+            reopened.close()
+
+    def test_old_schema_is_rebuilt(self, search_index, kb_files):
+        """Test a database from an older schema version is replaced"""
+        search_index.db_path.parent.mkdir(parents=True)
+        conn = sqlite3.connect(str(search_index.db_path))
+        conn.execute("CREATE TABLE kb_documents (id INTEGER PRIMARY KEY, scope TEXT NOT NULL, path TEXT NOT NULL)")
+        conn.commit()
+        conn.close()
+
+        assert search_index.sync(kb_files)["indexed"] == 3
+        assert search_index.search("bone")[1] == 1
+
+    def test_ensure_current_skips_same_generation(self, search_index, kb_files):
+        """Test the same listing is synced once"""
+        assert search_index.ensure_current(kb_files) is not None
+        assert search_index.ensure_current(kb_files) is None
+        assert search_index.get_stats()["documents"] == 3
+
+
+class TestSharedListing:
+    """Test the knowledge API and the KB manager share one index"""
+
+    def test_manager_reuses_api_sync(self, search_index, tmp_path):
+        """Test the manager lists the same files and searches without re-syncing"""
+        from api import knowledge
+        from services.kb_catalog import KnowledgeCatalog
+        from services.kb_manager import KnowledgeBaseManager
+
+        agent_dir = tmp_path / "ai-agents" / "ai-agents" / "ui-ux"
+        agent_dir.mkdir(parents=True)
+        write_kb_file(agent_dir, "layout.md", "# Layout\n\nPalette grid.\n")
+        l1_dir = tmp_path / "L1-art-director"
+        l1_dir.mkdir()
+        write_kb_file(l1_dir, "palette.md", "# Palette\n\nWarm palette.\n")
+
+        manager = KnowledgeBaseManager()
+        manager.kb_root = tmp_path
+        manager.ai_agents_root = tmp_path / "ai-agents"
+        catalog = KnowledgeCatalog()
+
+        with patch.object(knowledge, "AI_AGENTS_ROOT", tmp_path / "ai-agents"), \
+             patch.object(knowledge, "KB_ROOT", tmp_path), \
+             patch.object(knowledge, "kb_catalog", catalog), \
+             patch('services.kb_manager.kb_catalog', catalog), \
+             patch('services.kb_manager.kb_search_index', search_index):
+            knowledge.scan_kb_files.invalidate()
+            try:
+                kb_files = knowledge.scan_kb_files()
+            finally:
+                knowledge.scan_kb_files.invalidate()
+            search_index.ensure_current(kb_files)
+
+            assert manager.kb_file_listing() == kb_files
+            results = manager.search_kb_content("palette", agent_filter="ui-ux")
+
+        assert search_index.syncs == 1
+        assert search_index.get_stats()["documents"] == 2
+        assert [r["name"] for r in results] == ["layout.md"]
+
+
+class TestSearchEndpoint:
+    """Test /api/knowledge/search over the index"""
+
+    def test_search_covers_every_file(self, test_client, search_index, tmp_path):
+        """Test files beyond the old 200-file cap are searchable"""
+        kb_files = [write_kb_file(tmp_path, f"note_{n:03d}.md", f"Note {n}\n") for n in range(250)]
+        kb_files.append(write_kb_file(tmp_path, "zeta.md", "The zeta workflow.\n"))
+
+        with patch('api.knowledge.scan_kb_files', return_value=kb_files), \
+             patch('api.knowledge.kb_search_index', search_index):
+            response = test_client.get("/api/knowledge/search?query=zeta&limit=5")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_matches"] == 1
+        assert data["results"][0]["name"] == "zeta.md"
+        assert data["results"][0]["preview"] == "The zeta workflow."
+
+    def test_listing_does_not_disturb_concurrent_sync(self, test_client, tmp_path):
+        """Test listing files while a search syncs leaves the shared scan intact"""
+        kb_files = [write_kb_file(tmp_path, "zeta.md", "The zeta workflow.\n")]
+        kb_files += [
+            {"path": str(tmp_path / f"gone_{n:05d}.md"), "name": f"gone_{n:05d}.md", "agent": "qa-testing",
+             "size": n, "modified": f"2025-01-01T00:00:{n % 60:02d}", "category": "qa"}
+            for n in range(20000)
+        ]
+        snapshot = list(kb_files)
+        listing = threading.Event()
+
+        def list_files():
+            while not listing.is_set():
+                test_client.get("/api/knowledge/files?page_size=1")
+
+        with patch('api.knowledge.scan_kb_files', return_value=kb_files):
+            lister = threading.Thread(target=list_files)
+            lister.start()
+            try:
+                for attempt in range(5):
+                    search_index = KnowledgeSearchIndex(tmp_path / f"index_{attempt}.db")
+                    try:
+                        search_index.ensure_current(kb_files)
+                        assert search_index.search("zeta")[1] == 1
+                    finally:
+                        search_index.close()
+            finally:
+                listing.set()
+                lister.join()
+
+        assert kb_files == snapshot
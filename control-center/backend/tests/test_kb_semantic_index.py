@@ -0,0 +1,148 @@
+"""
+Tests for KB semantic search (services/kb_semantic_index.py)
+"""
+import os
+import time
+import pytest
+from unittest.mock import patch
+
+from services.kb_catalog import KnowledgeCatalog
+from services.kb_semantic_index import KnowledgeSemanticIndex, chunk_markdown, np
+
+requires_numpy = pytest.mark.skipif(np is None, reason="numpy is not installed")
+
+
+@pytest.fixture
+def kb_dir(tmp_path):
+    """KB directory with three markdown files"""
+    root = tmp_path / "L1-art-director"
+    root.mkdir()
+    (root / "controlnet.md").write_text(
+        "# ControlNet\n\nTune the ControlNet weights to balance pose and prompt.\n", encoding="utf-8"
+    )
+    (root / "palette.md").write_text("# Palette\n\nWarm colors for sunset scenes.\n", encoding="utf-8")
+    (root / "rigging.md").write_text("# Rigging\n\nBone weight painting for characters.\n", encoding="utf-8")
+    past = time.time_ns() - 60_000_000_000
+    os.utime(root, ns=(past, past))
+    return root
+
+
+@pytest.fixture
+def catalog():
+    """Empty catalog"""
+    return KnowledgeCatalog()
+
+
+@pytest.fixture
+def semantic_index(tmp_path, catalog):
+    """Semantic index saved to a temporary directory"""
+    return KnowledgeSemanticIndex(tmp_path / "vectors", catalog)
+
+
+class TestChunkMarkdown:
+    """Test splitting markdown into embeddable chunks"""
+
+    def test_one_chunk_per_section(self):
+        """Test each heading starts a chunk and empty sections are skipped"""
+        text = "Intro line\n# First\nAlpha beta\n## Empty\n\n## Second\nGamma\n"
+
+        assert chunk_markdown(text) == [("", "Intro line"), ("First", "Alpha beta"), ("Second", "Gamma")]
+
+    def test_long_sections_overlap(self):
+        """Test long sections are split into overlapping windows"""
+        words = [f"w{n}" for n in range(25)]
+        chunks = chunk_markdown("# Long\n" + " ".join(words), max_words=10, overlap=2)
+
+        assert [c[1].split()[0] for c in chunks] == ["w0", "w8", "w16"]
+        assert chunks[-1][1].split()[-1] == "w24"
+
+
+class TestCatalogUpdates:
+    """Test catalog events drive the index"""
+
+    def test_markdown_events_are_queued(self, semantic_index, catalog, kb_dir):
+        """Test added markdown files are queued and other files ignored"""
+        (kb_dir / "meta.json").write_text("{}", encoding="utf-8")
+        catalog.walk(kb_dir)
+
+        assert semantic_index.get_stats()["queued"] == 3
+
+
+@requires_numpy
+class TestSemanticIndex:
+    """Test embedding, incremental refresh and search"""
+
+    def test_related_file_ranks_first(self, semantic_index, catalog, kb_dir):
+        """Test the file sharing the query's words and stems ranks first"""
+        catalog.walk(kb_dir)
+        assert semantic_index.refresh()["embedded_files"] == 3
+
+        results = semantic_index.search("controlnet weight tuning", limit=2)
+
+        assert results[0]["path"].endswith("controlnet.md")
+        assert results[0]["heading"] == "ControlNet"
+        assert results[0]["score"] > results[1]["score"]
+
+    def test_refresh_embeds_only_changes(self, semantic_index, catalog, kb_dir):
+        """Test edited, added and deleted files are the only ones processed"""
+        catalog.walk(kb_dir)
+        semantic_index.refresh()
+        assert semantic_index.refresh() is None
+
+        (kb_dir / "palette.md").unlink()
+        (kb_dir / "lighting.md").write_text("# Lighting\n\nRim light.\n", encoding="utf-8")
+        catalog.walk(kb_dir)
+        result = semantic_index.refresh()
+
+        assert result["embedded_files"] == 1
+        assert result["removed_files"] == 1
+        assert not any(r["path"].endswith("palette.md") for r in semantic_index.search("sunset colors"))
+        assert semantic_index.search("rim light")[0]["path"].endswith("lighting.md")
+
+    def test_saved_index_is_reused(self, semantic_index, catalog, kb_dir, tmp_path):
+        """Test a new process reuses saved vectors for unchanged files"""
+        catalog.walk(kb_dir)
+        semantic_index.refresh()
+
+        reloaded = KnowledgeSemanticIndex(tmp_path / "vectors", catalog)
+        assert reloaded.refresh() is None
+        assert reloaded.get_stats()["chunks"] == 3
+        assert reloaded.search("bone painting")[0]["path"].endswith("rigging.md")
+
+    def test_path_filter(self, semantic_index, catalog, kb_dir):
+        """Test only the given files are considered"""
+        catalog.walk(kb_dir)
+        semantic_index.refresh()
+        allowed = {str(kb_dir / "rigging.md")}
+
+        assert [r["path"] for r in semantic_index.search("weights", paths=allowed)] == list(allowed)
+
+
+class TestSemanticSearchEndpoint:
+    """Test /api/knowledge/semantic-search"""
+
+    def test_unavailable_without_numpy(self, test_client):
+        """Test the endpoint answers 503 when numpy is missing"""
+        with patch('services.kb_semantic_index.np', None):
+            response = test_client.get("/api/knowledge/semantic-search?query=controlnet")
+
+        assert response.status_code == 503
+
+    @requires_numpy
+    def test_results_carry_listing_info(self, test_client, semantic_index, catalog, kb_dir):
+        """Test results merge the file listing with the best chunk"""
+        kb_files = [
+            {"path": entry.path, "name": entry.name, "agent": "knowledge-base",
+             "size": entry.size, "modified": entry.modified, "category": kb_dir.name}
+            for entry in catalog.walk(kb_dir, suffix=".md")
+        ]
+
+        with patch('api.knowledge.scan_kb_files', return_value=kb_files), \
+             patch('api.knowledge.kb_semantic_index', semantic_index):
+            response = test_client.get("/api/knowledge/semantic-search?query=controlnet+weights&limit=1")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["embedder"] == "hashing-1024"
+        assert data["results"][0]["name"] == "controlnet.md"
+        assert data["results"][0]["agent"] == "knowledge-base"
@@ -0,0 +1,165 @@
+"""
+Tests for the single-pass agent markdown parser (services/markdown_parser.py)
+"""
+import pytest
+from services.agent_loader import AgentLoader
+from services.markdown_parser import (
+    parse_agent_document, parse_agent_text, parse_sub_agent_text, parse_micro_agent_text
+)
+
+
+L1_AGENT = """# ART DIRECTOR AGENT 🎨
+
+## ROLE
+Guardian of visual consistency
+
+## PRIMARY OBJECTIVE
+Keep every asset on-style
+
+## CORE RESPONSIBILITIES
+
+### 1. Style Review
+Review assets.
+
+### 2. Palette Control
+
+## ACCESS PERMISSIONS
+
+**Read/Write:**
+- assets/approved/
+- assets/rejected/
+
+**Read-Only:**
+- references/
+
+## TOOLS AND REFERENCES
+
+### Style Guide
+### Palette Sheet
+
+## ESCALATION
+Director
+"""
+
+L2_ARCHITECTURE = """# 1. ART DIRECTOR AGENT
+
+### Sub-Agent 1.1: **Style Analyst**
+**Role:** Deep image analysis
+
+**Capabilities:**
+- Pixel comparison
+- Color histograms
+
+### Sub-Agent 1.2: **Roast Master**
+**Role:** Brutal honesty critic
+
+### Sub-Agent 1.3: **Palette Guardian**
+**Capabilities:**
+- Extract palettes
+"""
+
+L3_ARCHITECTURE = """## L2.1.1 Style Analyst
+
+#### L3.1.1.1: **Image Source Validator**
+**Specialty:** Validate image sources
+
+#### L3.1.1.2: **Quality Scorer**
+
+**Specialty:** Rate technical quality
+
+#### L3.1.1.3: **Empty**
+#### L3.1.1.4: **Pose Cataloger**
+**Specialty:** Organize references by pose
+"""
+
+
+class TestAgentDocument:
+    """Test L1 agent files are parsed in one pass"""
+
+    def test_extracts_all_fields(self):
+        """Test every API field is built from one pass"""
+        data = parse_agent_text(L1_AGENT).to_dict()
+
+        assert data["title"] == "ART DIRECTOR AGENT 🎨"
+        assert data["role"] == "Guardian of visual consistency"
+        assert data["objective"] == "Keep every asset on-style"
+        assert data["responsibilities"] == ["1. Style Review", "2. Palette Control"]
+        assert data["permissions"] == {
+            "read_write": ["assets/approved/", "assets/rejected/"],
+            "read_only": ["references/"]
+        }
+        assert data["tools"] == ["Style Guide", "Palette Sheet"]
+        assert data["sections"] == 6
+        assert data["word_count"] == len(L1_AGENT.split())
+        assert data["has_content"] is True
+
+    def test_sections_keep_first_line_and_subheadings(self):
+        """Test section summaries used by AgentLoader"""
+        document = parse_agent_text(L1_AGENT)
+
+        assert list(document.sections) == [
+            "ROLE", "PRIMARY OBJECTIVE", "CORE RESPONSIBILITIES",
+            "ACCESS PERMISSIONS", "TOOLS AND REFERENCES", "ESCALATION"
+        ]
+        assert document.sections["CORE RESPONSIBILITIES"].first_line == "### 1. Style Review"
+        assert document.sections["TOOLS AND REFERENCES"].subheadings == ["Style Guide", "Palette Sheet"]
+        assert document.line_count == len(L1_AGENT.split("\n"))
+
+    def test_records_use_slots(self):
+        """Test parsed records carry no per-instance __dict__"""
+        document = parse_agent_text(L1_AGENT)
+        agents = parse_sub_agent_text(L2_ARCHITECTURE) + parse_micro_agent_text(L3_ARCHITECTURE)
+
+        for record in [document, *document.sections.values(), *agents]:
+            assert not hasattr(record, "__dict__")
+
+    def test_agent_loader_uses_shared_parser(self, tmp_path):
+        """Test AgentLoader builds its summary from the same document"""
+        path = tmp_path / "01_ART_DIRECTOR_AGENT.md"
+        path.write_text(L1_AGENT, encoding="utf-8")
+
+        data = AgentLoader()._parse_markdown_file(path)
+
+        assert data["title"] == "ART DIRECTOR AGENT 🎨"
+        assert data["role"] == "Guardian of visual consistency"
+        assert data["objective"] == "Keep every asset on-style"
+        assert data["responsibilities"] == ["1. Style Review", "2. Palette Control"]
+        assert data["sections"][0] == "ROLE"
+        assert data["line_count"] == len(L1_AGENT.split("\n"))
+        assert parse_agent_document(path).to_dict() == parse_agent_text(L1_AGENT).to_dict()
+
+
+class TestArchitectureFiles:
+    """Test L2/L3 architecture files"""
+
+    def test_sub_agents(self):
+        """Test L2 role and capabilities stay within their own block"""
+        agents = [a.to_dict() for a in parse_sub_agent_text(L2_ARCHITECTURE)]
+
+        assert [a["id"] for a in agents] == ["L2.1.1", "L2.1.2", "L2.1.3"]
+        assert agents[0]["role"] == "Deep image analysis"
+        assert agents[0]["capabilities"] == ["Pixel comparison", "Color histograms"]
+        assert agents[0]["parent_l1"] == "1"
+        # No capabilities of its own - must not borrow the next agent's
+        assert agents[1]["capabilities"] == []
+        assert agents[2]["role"] == ""
+        assert agents[2]["capabilities"] == ["Extract palettes"]
+        assert agents[0]["source"] == "SUB_AGENT_ARCHITECTURE.md"
+
+    def test_micro_agents(self):
+        """Test L3 tasks skip blank lines but not headings"""
+        agents = [a.to_dict() for a in parse_micro_agent_text(L3_ARCHITECTURE)]
+
+        assert [a["id"] for a in agents] == ["L3.1.1.1", "L3.1.1.2", "L3.1.1.3", "L3.1.1.4"]
+        assert agents[0]["task"] == "**Specialty:** Validate image sources"
+        assert agents[1]["task"] == "**Specialty:** Rate technical quality"
+        assert agents[2]["task"] == ""
+        assert agents[3]["parent_l2"] == "L2.1.1"
+        assert agents[3]["name"] == "**Pose Cataloger**"
+
+    @pytest.mark.parametrize("content", ["", "#### L3.1.1.1: Last"])
+    def test_header_at_end_of_file(self, content):
+        """Test a trailing header without a body"""
+        agents = parse_micro_agent_text(content)
+
+        assert [a.task for a in agents] == [""] * len(agents)
@@ -5,7 +5,11 @@ Tests for pagination utilities and performance monitoring
 import pytest
 from utils.pagination import (
     PaginationParams,
+    CursorParams,
     paginate_list,
+    paginate_keyset,
+    encode_cursor,
+    decode_cursor,
     create_pagination_response,
     paginate
 )
@@ -147,6 +151,52 @@ class TestCreatePaginationResponse:
         assert result['meta']['has_prev'] is True
 
 
+class TestPaginateKeyset:
+    """Test cursor (keyset) pagination"""
+
+    def test_cursor_round_trip(self):
+        """Test cursors decode to the key they were made from"""
+        cursor = encode_cursor((1, 2, -1, "L2.1.2"))
+
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == (1, 2, -1, "L2.1.2")
+
+    def test_walks_all_pages(self):
+        """Test following next_cursor visits every item once"""
+        items = [{"id": i} for i in range(25)]
+        keys = [(i,) for i in range(25)]
+        seen, cursor = [], ""
+
+        while cursor is not None:
+            result = paginate_keyset(items, keys, CursorParams(cursor=cursor, page_size=10))
+            seen.extend(item["id"] for item in result['items'])
+            cursor = result['meta']['next_cursor']
+
+        assert seen == list(range(25))
+
+    def test_insert_before_cursor_does_not_shift_page(self):
+        """Test the next page starts after the last key, not at an offset"""
+        keys = [(i,) for i in range(0, 20, 2)]
+        first = paginate_keyset(keys, keys, CursorParams(page_size=3))
+
+        keys_after_insert = sorted(keys + [(1,)])
+        second = paginate_keyset(
+            keys_after_insert, keys_after_insert,
+            CursorParams(cursor=first['meta']['next_cursor'], page_size=3)
+        )
+
+        assert second['items'] == [(6,), (8,), (10,)]
+
+    def test_invalid_cursor(self):
+        """Test malformed or mismatched cursors raise ValueError"""
+        keys = [(i,) for i in range(5)]
+
+        with pytest.raises(ValueError):
+            paginate_keyset(keys, keys, CursorParams(cursor="not base64!"))
+        with pytest.raises(ValueError):
+            paginate_keyset(keys, keys, CursorParams(cursor=encode_cursor(("text",))))
+
+
 class TestBackwardCompatibility:
     """Test backward compatible pagination function"""
 
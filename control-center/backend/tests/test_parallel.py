@@ -0,0 +1,95 @@
+"""
+Tests for concurrent file I/O (utils/parallel.py)
+"""
+import threading
+import time
+import pytest
+from unittest.mock import patch
+
+from utils.parallel import parallel_map
+
+
+class TestParallelMap:
+    """Test the bounded file I/O fan-out"""
+
+    def test_results_keep_input_order(self):
+        """Test results follow the items even when later calls finish first"""
+        def slow_first(n):
+            time.sleep(0.05 if n == 0 else 0)
+            return n * 10
+
+        assert parallel_map(slow_first, range(5)) == [0, 10, 20, 30, 40]
+
+    def test_calls_run_concurrently(self):
+        """Test items are processed on more than one thread"""
+        barrier = threading.Barrier(2, timeout=2)
+
+        def meet(n):
+            barrier.wait()
+            return n
+
+        assert parallel_map(meet, [1, 2]) == [1, 2]
+
+    def test_exception_propagates(self):
+        """Test an exception raised by one call reaches the caller"""
+        def fail_on_two(n):
+            if n == 2:
+                raise ValueError("bad file")
+            return n
+
+        with pytest.raises(ValueError, match="bad file"):
+            parallel_map(fail_on_two, [1, 2, 3])
+
+    def test_nested_fan_out_runs_inline(self):
+        """Test a fan-out from a pool thread does not wait on the pool"""
+        def inner(n):
+            return threading.current_thread().name
+
+        def outer(n):
+            return parallel_map(inner, [n, n])
+
+        for names in parallel_map(outer, [1, 2]):
+            assert names[0] == names[1]
+
+    def test_single_item_runs_inline(self):
+        """Test a lone item is processed on the calling thread"""
+        assert parallel_map(lambda n: threading.current_thread().name, [1]) == [threading.current_thread().name]
+
+
+class TestParallelAgentLoading:
+    """Test the agents API merges concurrent reads deterministically"""
+
+    def test_l1_agents_keep_file_order(self, tmp_path):
+        """Test L1 agents come back in file order, skipping missing files"""
+        from api.agents import load_l1_agents, L1_AGENT_FILES
+
+        for filename in L1_AGENT_FILES[:3] + L1_AGENT_FILES[4:6]:
+            (tmp_path / filename).write_text(f"# {filename}\n\nRole\n", encoding="utf-8")
+
+        with patch('api.agents.AI_AGENTS_ROOT', tmp_path), \
+             patch('api.agents.parse_cache.enabled', False):
+            load_l1_agents.invalidate()
+            try:
+                agents = load_l1_agents()
+            finally:
+                load_l1_agents.invalidate()
+
+        assert [a["filename"] for a in agents] == L1_AGENT_FILES[:3] + L1_AGENT_FILES[4:6]
+
+    def test_agent_knowledge_lists_both_trees(self, tmp_path):
+        """Test ai-agents files are listed before knowledge-base files"""
+        from api.agents import _scan_agent_knowledge
+
+        agents_dir = tmp_path / "ai-agents" / "art-director"
+        kb_dir = tmp_path / "knowledge-base" / "L1-art-director" / "style"
+        agents_dir.mkdir(parents=True)
+        kb_dir.mkdir(parents=True)
+        (agents_dir / "notes.md").write_text("notes", encoding="utf-8")
+        (kb_dir / "palette.md").write_text("palette", encoding="utf-8")
+
+        with patch('api.agents.AI_AGENTS_ROOT', tmp_path), \
+             patch('api.agents.KB_ROOT', tmp_path / "knowledge-base"):
+            files = _scan_agent_knowledge("art-director")
+
+        assert [f["name"] for f in files] == ["notes.md", "palette.md"]
+        assert files[1]["category"] == "style"
@@ -0,0 +1,46 @@
+"""
+Tests for Projects API endpoints
+"""
+import pytest
+from unittest.mock import patch
+
+
+@pytest.fixture
+def project_dirs(tmp_path):
+    """Two project directories with a file each"""
+    dirs = []
+    for name in ("alpha", "beta"):
+        path = tmp_path / name
+        path.mkdir()
+        (path / "README.md").write_text(f"# {name}\n")
+        dirs.append(path)
+    return dirs
+
+
+class TestProjectsAPI:
+    """Test project listing"""
+
+    def test_git_status_not_served_from_cache(self, test_client, project_dirs):
+        """Test the cached scan leaves git status out and listings read it fresh"""
+        from api.projects import scan_all_projects
+
+        statuses = {"branch": "main"}
+
+        def git_status(path):
+            return {"is_git_repo": True, "branch": statuses["branch"]}
+
+        scan_all_projects.invalidate()
+        try:
+            with patch('api.projects.PROJECT_DIRS', project_dirs), \
+                 patch('api.projects.get_git_status', side_effect=git_status):
+                first = test_client.get("/api/projects").json()
+                statuses["branch"] = "feature"
+                second = test_client.get("/api/projects").json()
+
+            assert all("git" not in project for project in scan_all_projects())
+        finally:
+            scan_all_projects.invalidate()
+
+        assert first["total"] == 2
+        assert [p["git"]["branch"] for p in first["projects"]] == ["main", "main"]
+        assert [p["git"]["branch"] for p in second["projects"]] == ["feature", "feature"]
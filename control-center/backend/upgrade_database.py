@@ -1,6 +1,6 @@
 """
 Database schema upgrade script.
-Adds missing columns to services table.
+Adds missing columns to the services, agents and knowledge_files tables.
 """
 import sqlite3
 import sys
@@ -8,55 +8,92 @@ from pathlib import Path
 
 DB_PATH = Path(__file__).parent / "control-center.db"
 
+# table -> (column, type[, default]) added when missing
+COLUMNS = {
+    "services": [
+        ("description", "VARCHAR(500)"),
+        ("health", "VARCHAR(20)", "unknown"),
+        ("cwd", "VARCHAR(500)"),
+        ("is_system", "BOOLEAN", "0"),
+    ],
+    # Agent hierarchy sync (services/agent_sync.py)
+    "agents": [
+        ("title", "VARCHAR(200)"),
+        ("parent_l1", "VARCHAR(20)"),
+        ("parent_l2", "VARCHAR(20)"),
+        ("position", "INTEGER"),
+        ("content_hash", "VARCHAR(32)"),
+        ("data", "TEXT"),
+        ("updated_at", "DATETIME"),
+    ],
+    "knowledge_files": [
+        ("size", "INTEGER"),
+        ("modified", "DATETIME"),
+    ],
+}
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_agents_level ON agents (level)",
+    "CREATE INDEX IF NOT EXISTS ix_agents_parent_l1 ON agents (parent_l1)",
+    "CREATE INDEX IF NOT EXISTS ix_agents_parent_l2 ON agents (parent_l2)",
+    "CREATE INDEX IF NOT EXISTS ix_agents_position ON agents (position)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_knowledge_files_agent_path ON knowledge_files (agent_id, file_path)",
+]
+
+
+def upgrade_table(cursor, table: str, wanted: list):
+    """Add the missing columns of one table."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    columns = {row[1]: row for row in cursor.fetchall()}
+    if not columns:
+        print(f"Table {table} does not exist yet (created on next startup)")
+        return
+    print(f"Current {table} columns: {list(columns.keys())}")
+
+    # Execute ALTER TABLE statements
+    for col_info in wanted:
+        col_name = col_info[0]
+        col_type = col_info[1]
+        default = col_info[2] if len(col_info) > 2 else None
+
+        if col_name in columns:
+            continue
+
+        if default:
+            sql = f"ALTER TABLE {table} ADD COLUMN {col_name} {col_type} DEFAULT '{default}'"
+        else:
+            sql = f"ALTER TABLE {table} ADD COLUMN {col_name} {col_type}"
+
+        print(f"Executing: {sql}")
+        cursor.execute(sql)
+
+
 def upgrade_database():
-    """Add missing columns to services table."""
+    """Add missing columns and indexes."""
     print(f"Upgrading database at {DB_PATH}")
 
     conn = sqlite3.connect(str(DB_PATH))
     cursor = conn.cursor()
 
     try:
-        # Check current schema
-        cursor.execute("PRAGMA table_info(services)")
-        columns = {row[1]: row for row in cursor.fetchall()}
-        print(f"Current columns: {list(columns.keys())}")
-
-        # Add missing columns
-        columns_to_add = []
-
-        if 'description' not in columns:
-            columns_to_add.append(("description", "VARCHAR(500)"))
-
-        if 'health' not in columns:
-            columns_to_add.append(("health", "VARCHAR(20)", "unknown"))
-
-        if 'cwd' not in columns:
-            columns_to_add.append(("cwd", "VARCHAR(500)"))
-
-        if 'is_system' not in columns:
-            columns_to_add.append(("is_system", "BOOLEAN", "0"))
-
-        # Execute ALTER TABLE statements
-        for col_info in columns_to_add:
-            col_name = col_info[0]
-            col_type = col_info[1]
-            default = col_info[2] if len(col_info) > 2 else None
-
-            if default:
-                sql = f"ALTER TABLE services ADD COLUMN {col_name} {col_type} DEFAULT '{default}'"
-            else:
-                sql = f"ALTER TABLE services ADD COLUMN {col_name} {col_type}"
+        for table, wanted in COLUMNS.items():
+            upgrade_table(cursor, table, wanted)
 
-            print(f"Executing: {sql}")
-            cursor.execute(sql)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        tables = {row[0] for row in cursor.fetchall()}
+        for sql in INDEXES:
+            if sql.split(" ON ")[1].split(" ")[0] in tables:
+                print(f"Executing: {sql}")
+                cursor.execute(sql)
 
         conn.commit()
         print("✓ Database upgraded successfully")
 
         # Show final schema
-        cursor.execute("PRAGMA table_info(services)")
-        final_columns = [row[1] for row in cursor.fetchall()]
-        print(f"Final columns: {final_columns}")
+        for table in COLUMNS:
+            cursor.execute(f"PRAGMA table_info({table})")
+            final_columns = [row[1] for row in cursor.fetchall()]
+            print(f"Final {table} columns: {final_columns}")
 
     except Exception as e:
         print(f"✗ Error upgrading database: {e}")
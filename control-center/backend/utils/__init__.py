@@ -2,6 +2,14 @@
 Utility modules for the Control Center backend
 """
 
-from .cache import SimpleCache, cached
+from .cache import (
+    SimpleCache, SingleFlight, cached, call_cached, cache_sweeper, sweep_all_caches,
+    configure_cache_backend, get_cache_backend, configure_memory_budget, deep_sizeof
+)
+from .cache_backends import CacheBackend, InProcessBackend, RedisBackend, create_backend
 
-__all__ = ["SimpleCache", "cached"]
+__all__ = [
+    "SimpleCache", "SingleFlight", "cached", "call_cached", "cache_sweeper", "sweep_all_caches",
+    "configure_cache_backend", "get_cache_backend", "configure_memory_budget", "deep_sizeof",
+    "CacheBackend", "InProcessBackend", "RedisBackend", "create_backend"
+]
@@ -1,106 +1,934 @@
 """
-Simple caching layer for Control Center backend
+Caching layer for Control Center backend
 
-Provides TTL-based caching to improve performance for expensive operations
-like file scanning, agent loading, and KB file enumeration.
+Provides size-bounded, TTL-based LRU caching with hit/miss accounting to
+improve performance for expensive operations like file scanning, agent
+loading, and KB file enumeration.
 """
 
+import asyncio
+import hashlib
+import logging
+import sys
+import threading
 import time
-from typing import Any, Callable, Optional
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 from functools import wraps
 
+from utils.cache_backends import CacheBackend, InProcessBackend
+
+
+logger = logging.getLogger("cache")
+
+# Sentinel for cache misses (allows None to be cached as a real value)
+_MISSING = object()
+
+# Every live cache instance, so the background sweeper can reach them
+_registry = weakref.WeakSet()
+
+# Every live @cached function by cache name, so the cache API can reach them
+_cached_functions: "weakref.WeakValueDictionary[str, Callable]" = weakref.WeakValueDictionary()
+
+# Shared tier behind named caches (see configure_cache_backend)
+_backend: CacheBackend = InProcessBackend()
+
+# Combined byte budget for all caches (see configure_memory_budget), None = unlimited
+_memory_budget: Optional[int] = None
+
+# Containers longer than this are sized from an evenly spaced sample
+SIZEOF_SAMPLE = 64
+
+# Loads a @cached function runs per miss while invalidations keep arriving;
+# the last result is returned uncached if every one was overtaken
+LOAD_ATTEMPTS = 3
+
+
+def deep_sizeof(obj: Any, sample: int = SIZEOF_SAMPLE) -> int:
+    """
+    Approximate the bytes held by obj and everything it references
+
+    Objects referenced more than once are counted once. Containers with more
+    than ``sample`` items are measured on an evenly spaced sample and the
+    result extrapolated, so sizing a list of thousands of agent dicts stays
+    cheap enough to do on every cache store.
+
+    Args:
+        obj: Object to measure
+        sample: Maximum items measured per container
+
+    Returns:
+        Approximate size in bytes
+    """
+    seen = set()
+
+    def sizeof(o: Any) -> float:
+        if id(o) in seen:
+            return 0
+        seen.add(id(o))
+        size = sys.getsizeof(o)
+
+        if isinstance(o, dict):
+            items = list(o.items())
+
+            def measure(item):
+                return sizeof(item[0]) + sizeof(item[1])
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            items = list(o)
+            measure = sizeof
+        elif hasattr(o, "__dict__"):
+            return size + sizeof(vars(o))
+        elif hasattr(o, "__slots__"):
+            return size + sum(sizeof(getattr(o, slot)) for slot in o.__slots__ if hasattr(o, slot))
+        else:
+            return size
+
+        count = len(items)
+        if count > sample:
+            step = count / sample
+            chosen = [items[int(i * step)] for i in range(sample)]
+            return size + sum(measure(item) for item in chosen) * count / sample
+        return size + sum(measure(item) for item in items)
+
+    return int(sizeof(obj))
+
 
 class SimpleCache:
     """
-    Simple time-based cache with TTL (Time To Live)
+    Size-bounded LRU cache with TTL (Time To Live)
+
+    Entries expire ``ttl`` seconds after they were stored. Expired entries
+    can be retained for a further ``stale_ttl`` seconds so they can still be
+    served (see get_stale) while a refresh runs. When the cache holds
+    ``maxsize`` entries, the least recently used entry is evicted to make
+    room. Hits, misses, evictions, expirations and loader latency are counted
+    so hit rates can be reported.
+
+    Each entry's approximate size is measured with deep_sizeof when stored,
+    so the cache can report its memory footprint and evict least recently
+    used entries once ``max_bytes`` (or the global budget set with
+    configure_memory_budget) is exceeded.
+
+    Entries can carry tags (e.g. ``agent:L2.3.1``, ``kb:art-director``) so
+    related entries can be dropped together with invalidate_tags("agent:L2.3.*")
+    instead of clearing the whole cache.
+
+    Named caches also use the configured shared backend: local misses are
+    looked up there, stores are written through, and invalidations are fanned
+    out to the other workers.
 
     Usage:
-        cache = SimpleCache(ttl=300)  # 5 minutes
+        cache = SimpleCache(ttl=300, maxsize=256)  # 5 minutes, 256 entries
         cache.set("key", value)
         result = cache.get("key")  # Returns value if not expired, None otherwise
     """
 
-    def __init__(self, ttl: int = 300):
+    def __init__(
+        self,
+        ttl: Optional[float] = 300,
+        maxsize: int = 1024,
+        stale_ttl: Optional[float] = 0,
+        name: Optional[str] = None,
+        max_bytes: Optional[int] = None
+    ):
         """
         Initialize cache
 
         Args:
-            ttl: Time to live in seconds (default: 300 = 5 minutes)
+            ttl: Time to live in seconds, None to never expire (default: 300 = 5 minutes)
+            maxsize: Maximum number of entries before LRU eviction (default: 1024)
+            stale_ttl: Seconds an expired entry is kept for stale reads, None for
+                no limit (default: 0)
+            name: Namespace in the shared backend; unnamed caches stay in-process
+            max_bytes: Approximate memory budget before LRU eviction, None for no limit
         """
-        self._cache = {}
-        self._timestamps = {}
+        # key -> value, least recently used first
+        self._cache = OrderedDict()
+        # key -> stored-at time, oldest first (TTL is uniform, so this is expiry order)
+        self._timestamps = OrderedDict()
+        # tag -> keys carrying it, and key -> its tags
+        self._tags: Dict[str, Set[str]] = {}
+        self._key_tags: Dict[str, Tuple[str, ...]] = {}
+        # key -> approximate size in bytes (see deep_sizeof)
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
         self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self.max_bytes = max_bytes
+
+        # Accounting
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._loads = 0
+        self._load_time_total = 0.0
+        self._load_time_max = 0.0
+        self._coalesced = 0
+        self._stale_hits = 0
+        self._remote_hits = 0
+        self._tag_invalidations = 0
+        self._budget_evictions = 0
+        self._discarded_loads = 0
+
+        # Bumped by clear() and tag invalidations, and per key by invalidate(),
+        # so a load that started before one can tell its result may be
+        # outdated (see load_version and set(version=...))
+        self.generation = 0
+        self._key_versions: Dict[str, int] = {}
+
+        _registry.add(self)
+
+    def _is_expired(self, key: str, now: float) -> bool:
+        return self._expired_at(self._timestamps[key], now)
+
+    def _is_dead(self, key: str, now: float) -> bool:
+        return self._dead_at(self._timestamps[key], now)
 
-    def get(self, key: str) -> Optional[Any]:
+    def _expired_at(self, stored_at: float, now: float) -> bool:
+        if self.ttl is None:
+            return False
+        return now - stored_at >= self.ttl
+
+    def _dead_at(self, stored_at: float, now: float) -> bool:
+        """Expired and past the stale window - no longer servable at all"""
+        if self.ttl is None or self.stale_ttl is None:
+            return False
+        return now - stored_at >= self.ttl + self.stale_ttl
+
+    def _fetch_shared(self, key: str, newer_than: float = 0.0) -> Optional[Tuple[float, Any, Tuple[str, ...]]]:
+        """Look a key up in the shared backend (called without holding the lock)"""
+        if self.name is None:
+            return None
+        entry = _backend.get(self.name, key)
+        if entry is None or entry[0] <= newer_than or self._dead_at(entry[0], time.time()):
+            return None
+        return entry
+
+    def _remove(self, key: str):
+        del self._cache[key]
+        del self._timestamps[key]
+        self._bytes -= self._sizes.pop(key, 0)
+
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: str, default: Any = None) -> Optional[Any]:
         """
         Get value from cache if not expired
 
         Args:
             key: Cache key
+            default: Value returned on a miss (default: None)
 
         Returns:
-            Cached value if exists and not expired, None otherwise
+            Cached value if exists and not expired, ``default`` otherwise
         """
-        if key in self._cache:
-            if time.time() - self._timestamps[key] < self.ttl:
+        value, fresh = self._lookup(key, allow_stale=False)
+        return value if value is not _MISSING else default
+
+    def get_stale(self, key: str, default: Any = None) -> Tuple[Any, bool]:
+        """
+        Get value from cache, including expired entries still in the stale window
+
+        Args:
+            key: Cache key
+            default: Value returned if nothing servable is cached
+
+        Returns:
+            (value, fresh) - fresh is False for stale values and for misses
+        """
+        value, fresh = self._lookup(key, allow_stale=True)
+        return (value if value is not _MISSING else default), fresh
+
+    def _lookup(self, key: str, allow_stale: bool) -> Tuple[Any, bool]:
+        local_stored_at = 0.0
+        with self._lock:
+            if key in self._cache:
+                now = time.time()
+                if not self._is_expired(key, now):
+                    self._cache.move_to_end(key)
+                    self._hits += 1
+                    return self._cache[key], True
+
+                if not self._is_dead(key, now):
+                    # Keep the entry around for stale reads
+                    if allow_stale:
+                        self._cache.move_to_end(key)
+                        self._hits += 1
+                        self._stale_hits += 1
+                        return self._cache[key], False
+                    local_stored_at = self._timestamps[key]
+                else:
+                    # Cache expired, remove it
+                    self._remove(key)
+                    self._expirations += 1
+
+        # Local miss - another worker may already have loaded it
+        entry = self._fetch_shared(key, newer_than=local_stored_at)
+        size = deep_sizeof(entry[1]) if entry is not None else 0
+
+        with self._lock:
+            if entry is not None:
+                stored_at, value, tags = entry
+                self._store(key, value, stored_at, tags, size)
+                fresh = not self._expired_at(stored_at, time.time())
+                if fresh or allow_stale:
+                    self._hits += 1
+                    self._remote_hits += 1
+                    if not fresh:
+                        self._stale_hits += 1
+                    return value, fresh
+
+            self._misses += 1
+            return _MISSING, False
+
+    def peek(self, key: str, default: Any = None) -> Optional[Any]:
+        """
+        Get a fresh value without touching LRU order or hit/miss counters
+
+        Args:
+            key: Cache key
+            default: Value returned if the key is missing or expired
+
+        Returns:
+            Cached value if exists and not expired, ``default`` otherwise
+        """
+        with self._lock:
+            if key in self._cache and not self._is_expired(key, time.time()):
                 return self._cache[key]
-            else:
-                # Cache expired, remove it
-                del self._cache[key]
-                del self._timestamps[key]
-        return None
 
-    def set(self, key: str, value: Any):
+        entry = self._fetch_shared(key)
+        if entry is not None and not self._expired_at(entry[0], time.time()):
+            size = deep_sizeof(entry[1])
+            with self._lock:
+                self._store(key, entry[1], entry[0], entry[2], size)
+                self._remote_hits += 1
+            _enforce_memory_budget()
+            return entry[1]
+        return default
+
+    def _store(self, key: str, value: Any, stored_at: float, tags: Tuple[str, ...] = (), size: int = 0):
+        """Insert locally, evicting least recently used entries if full (lock held)"""
+        if key in self._cache:
+            self._remove(key)
+
+        # Shared entries keep their original store time, so they may sit slightly
+        # out of expiry order; sweep() then removes them on a later pass
+        self._cache[key] = value
+        self._timestamps[key] = stored_at
+        self._sizes[key] = size
+        self._bytes += size
+        if tags:
+            self._key_tags[key] = tags
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._cache) > self.maxsize:
+            self._remove(next(iter(self._cache)))
+            self._evictions += 1
+
+        # Over the byte budget: evict older entries, but always keep the newest
+        if self.max_bytes is not None:
+            while self._bytes > self.max_bytes and len(self._cache) > 1:
+                self._remove(next(iter(self._cache)))
+                self._evictions += 1
+                self._budget_evictions += 1
+
+    def evict_lru(self) -> int:
+        """
+        Evict the least recently used entry
+
+        Returns:
+            Bytes released (0 if the cache is empty)
+        """
+        with self._lock:
+            if not self._cache:
+                return 0
+            key = next(iter(self._cache))
+            size = self._sizes.get(key, 0)
+            self._remove(key)
+            self._evictions += 1
+            self._budget_evictions += 1
+            return size
+
+    @property
+    def approx_bytes(self) -> int:
+        """Approximate memory held by cached values"""
+        return self._bytes
+
+    def load_version(self, key: str) -> Tuple[int, int]:
+        """
+        Invalidation version of a key, to capture before computing its value
+
+        Only clear(), tag invalidations and invalidate() of this key change
+        it, so invalidating other keys never outdates a load.
+        """
+        with self._lock:
+            return self.generation, self._key_versions.get(key, 0)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        tags: Optional[Iterable[str]] = None,
+        version: Optional[Tuple[int, int]] = None
+    ) -> bool:
         """
         Set value in cache with current timestamp
 
+        Evicts least recently used entries if the cache is full. Named caches
+        also write the value through to the shared backend.
+
         Args:
             key: Cache key
             value: Value to cache
+            tags: Tags for group invalidation (see invalidate_tags)
+            version: load_version(key) when the value was computed; if the
+                key has been invalidated since, nothing is stored
+
+        Returns:
+            Whether the value was stored
         """
-        self._cache[key] = value
-        self._timestamps[key] = time.time()
+        stored_at = time.time()
+        tags = tuple(dict.fromkeys(tags)) if tags else ()
+        size = deep_sizeof(value)
+        with self._lock:
+            if version is not None and version != (self.generation, self._key_versions.get(key, 0)):
+                self._discarded_loads += 1
+                return False
+            self._store(key, value, stored_at, tags, size)
+        _enforce_memory_budget(keep=self)
+
+        if self.name is not None:
+            expire = None
+            if self.ttl is not None and self.stale_ttl is not None:
+                expire = self.ttl + self.stale_ttl
+            _backend.set(self.name, key, value, stored_at, expire, tags)
+        return True
 
     def invalidate(self, key: str):
         """
-        Invalidate a specific cache entry
+        Invalidate a specific cache entry (in every worker for named caches)
 
         Args:
             key: Cache key to invalidate
         """
-        if key in self._cache:
-            del self._cache[key]
-            del self._timestamps[key]
+        self._drop_local(key)
+        if self.name is not None:
+            _backend.invalidate(self.name, key)
 
     def clear(self):
-        """Clear all cache entries"""
-        self._cache.clear()
-        self._timestamps.clear()
+        """Clear all cache entries, in every worker for named caches (accounting counters are kept)"""
+        self._drop_local()
+        if self.name is not None:
+            _backend.invalidate(self.name)
+
+    def invalidate_tags(self, pattern: str) -> int:
+        """
+        Invalidate every entry with a tag matching pattern (in every worker for named caches)
+
+        Args:
+            pattern: Tag or shell-style pattern, e.g. "kb:art-director" or "agent:L2.3.*"
+
+        Returns:
+            Number of local entries removed
+        """
+        removed = self._drop_local_tags(pattern)
+        if self.name is not None:
+            _backend.invalidate_tags(self.name, pattern)
+        return removed
+
+    def _drop_local(self, key: Optional[str] = None):
+        """Drop one local entry (or all) without notifying other workers"""
+        with self._lock:
+            if key is None:
+                self.generation += 1
+                self._key_versions.clear()
+                self._cache.clear()
+                self._timestamps.clear()
+                self._tags.clear()
+                self._key_tags.clear()
+                self._sizes.clear()
+                self._bytes = 0
+            else:
+                self._key_versions[key] = self._key_versions.get(key, 0) + 1
+                if key in self._cache:
+                    self._remove(key)
+
+    def _drop_local_tags(self, pattern: str) -> int:
+        """Drop local entries whose tags match pattern without notifying other workers"""
+        with self._lock:
+            # A load in flight has no tags yet, so any tag invalidation may concern it
+            self.generation += 1
+            keys = set()
+            for tag, tagged in self._tags.items():
+                if fnmatchcase(tag, pattern):
+                    keys.update(tagged)
+
+            for key in keys:
+                self._remove(key)
+            if keys:
+                self._tag_invalidations += 1
+            return len(keys)
+
+    def entries(self, limit: int = 100) -> List[Dict]:
+        """
+        Describe cached entries, most recently used first
+
+        Args:
+            limit: Maximum number of entries returned
+
+        Returns:
+            List of {key, age_seconds, expired, approx_bytes, tags}
+        """
+        with self._lock:
+            now = time.time()
+            result = []
+            for key in reversed(self._cache):
+                if len(result) >= limit:
+                    break
+                result.append({
+                    "key": key,
+                    "age_seconds": round(now - self._timestamps[key], 3),
+                    "expired": self._is_expired(key, now),
+                    "approx_bytes": self._sizes.get(key, 0),
+                    "tags": list(self._key_tags.get(key, ()))
+                })
+            return result
+
+    def sweep(self) -> int:
+        """
+        Remove all expired entries that are past the stale window
+
+        Only the expired prefix of the expiry-ordered timestamps is walked.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with self._lock:
+            now = time.time()
+            while self._timestamps:
+                key = next(iter(self._timestamps))
+                if not self._is_dead(key, now):
+                    break
+                self._remove(key)
+                removed += 1
+            self._expirations += removed
+        return removed
+
+    def record_load(self, duration: float):
+        """
+        Record how long a cache miss took to compute
+
+        Args:
+            duration: Loader execution time in seconds
+        """
+        with self._lock:
+            self._loads += 1
+            self._load_time_total += duration
+            self._load_time_max = max(self._load_time_max, duration)
+
+    def record_coalesced(self):
+        """Record a miss that waited on an in-flight load instead of loading itself"""
+        with self._lock:
+            self._coalesced += 1
 
     def get_stats(self) -> dict:
         """
         Get cache statistics
 
         Returns:
-            Dictionary with cache stats (size, entries, etc.)
+            Dictionary with cache stats (size, hit rate, evictions, latency, etc.)
         """
-        current_time = time.time()
-        expired_count = sum(
-            1 for key, timestamp in self._timestamps.items()
-            if current_time - timestamp >= self.ttl
-        )
+        with self._lock:
+            now = time.time()
+            expired_count = 0
+            for key in self._timestamps:
+                if not self._is_expired(key, now):
+                    break
+                expired_count += 1
+
+            lookups = self._hits + self._misses
+
+            return {
+                "name": self.name,
+                "backend": _backend.name if self.name is not None else "memory",
+                "total_entries": len(self._cache),
+                "expired_entries": expired_count,
+                "active_entries": len(self._cache) - expired_count,
+                "max_entries": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "stale_ttl_seconds": self.stale_ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "stale_hits": self._stale_hits,
+                "remote_hits": self._remote_hits,
+                "approx_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "budget_evictions": self._budget_evictions,
+                "tags": len(self._tags),
+                "tag_invalidations": self._tag_invalidations,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "loads": self._loads,
+                "coalesced": self._coalesced,
+                "discarded_loads": self._discarded_loads,
+                "avg_load_ms": round(self._load_time_total / self._loads * 1000, 2) if self._loads else 0.0,
+                "max_load_ms": round(self._load_time_max * 1000, 2)
+            }
+
+
+def get_cache_backend() -> CacheBackend:
+    """Get the shared backend used by named caches"""
+    return _backend
+
+
+def configure_cache_backend(backend: CacheBackend):
+    """
+    Switch the shared backend used by named caches
+
+    Stops the previous backend and starts listening for invalidations
+    published by other workers.
+
+    Usage:
+        configure_cache_backend(create_backend("redis", "redis://localhost:6379/0"))
+    """
+    global _backend
+    old, _backend = _backend, backend
+    if old is not backend:
+        old.stop()
+    backend.start(_apply_remote_invalidation)
+
+
+def _apply_remote_invalidation(namespace: str, key: Optional[str], tags: Optional[str] = None):
+    """Drop local entries invalidated by another worker"""
+    for cache in list(_registry):
+        if cache.name is not None and cache.name == namespace:
+            if tags is not None:
+                cache._drop_local_tags(tags)
+            else:
+                cache._drop_local(key)
+
+
+def configure_memory_budget(max_bytes: Optional[int]):
+    """
+    Set the combined byte budget for all caches
+
+    When the approximate total exceeds it, least recently used entries are
+    evicted from the largest caches until the total fits again.
+
+    Args:
+        max_bytes: Budget in bytes, None for no limit
+    """
+    global _memory_budget
+    _memory_budget = max_bytes
+    _enforce_memory_budget()
+
+
+def get_memory_budget() -> Optional[int]:
+    """Get the combined byte budget for all caches (None = unlimited)"""
+    return _memory_budget
+
+
+def total_cache_bytes() -> int:
+    """Approximate memory held by every live cache"""
+    return sum(cache.approx_bytes for cache in list(_registry))
+
+
+def _enforce_memory_budget(keep: Optional[SimpleCache] = None):
+    """
+    Evict from the largest caches until the combined size fits the budget
+
+    Args:
+        keep: Cache that just stored an entry; its newest entry is never evicted
+    """
+    if _memory_budget is None:
+        return
+
+    caches = list(_registry)
+    total = sum(cache.approx_bytes for cache in caches)
+    while total > _memory_budget:
+        candidates = [
+            cache for cache in caches
+            if cache.approx_bytes > 0 and not (cache is keep and len(cache._cache) <= 1)
+        ]
+        if not candidates:
+            break
+        released = max(candidates, key=lambda cache: cache.approx_bytes).evict_lru()
+        total -= released
+        if released == 0:
+            total = sum(cache.approx_bytes for cache in caches)
+
+
+def get_named_caches() -> Dict[str, SimpleCache]:
+    """Get every live named cache by name"""
+    return {cache.name: cache for cache in list(_registry) if cache.name is not None}
+
+
+def get_cached_functions() -> Dict[str, Callable]:
+    """Get every live @cached function by cache name (module.qualname)"""
+    return dict(_cached_functions.items())
+
+
+def invalidate_tags(pattern: str) -> Dict[str, int]:
+    """
+    Invalidate matching tags across every named cache
+
+    Args:
+        pattern: Tag or shell-style pattern, e.g. "agent:L2.3.*"
+
+    Returns:
+        Number of entries removed per cache (only caches with removals)
+    """
+    removed = {}
+    for name, cache in get_named_caches().items():
+        count = cache.invalidate_tags(pattern)
+        if count:
+            removed[name] = count
+    return removed
+
+
+def sweep_all_caches() -> int:
+    """
+    Remove expired entries from every live cache
+
+    Returns:
+        Total number of entries removed
+    """
+    return sum(cache.sweep() for cache in list(_registry))
+
+
+class CacheSweeper:
+    """
+    Background thread that periodically purges expired cache entries
+
+    Without the sweeper, expired entries are only dropped when they are
+    looked up again, so keys that are never requested twice linger until
+    LRU eviction pushes them out.
+
+    Usage:
+        cache_sweeper.start()   # on application startup
+        cache_sweeper.stop()    # on shutdown
+    """
+
+    def __init__(self, interval: float = 60):
+        """
+        Args:
+            interval: Seconds between sweeps (default: 60)
+        """
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the sweeper thread (no-op if already running)"""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the sweeper thread and wait for it to exit"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            sweep_all_caches()
+
+
+# Global sweeper instance (started from the application lifespan)
+cache_sweeper = CacheSweeper()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into a single execution
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait for and share its result (or exception)
+    instead of repeating the work.
+
+    Usage:
+        flight = SingleFlight()
+        result, leader = flight.do("key", expensive_function)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    def join_or_lead(self, key: str) -> Tuple[Future, bool]:
+        """
+        Register interest in a key
+
+        Returns:
+            (future, leader) - the leader must resolve the future via finish()
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def finish(self, key: str, future: Future, result: Any = None, error: Optional[BaseException] = None):
+        """Resolve a led flight and release waiters"""
+        with self._lock:
+            self._inflight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, func: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Run func once per key across concurrent callers
+
+        Returns:
+            (result, leader) - leader is False if the result was shared
+        """
+        future, leader = self.join_or_lead(key)
+        if not leader:
+            return future.result(), False
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result, True
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a call for key is currently running"""
+        with self._lock:
+            return key in self._inflight
+
+
+# Fallback pool for stale-while-revalidate refreshes triggered outside an event loop
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+
+# Bounded pool that async callers offload blocking loaders to
+_loader_executor: Optional[ThreadPoolExecutor] = None
+_loader_executor_lock = threading.Lock()
+LOADER_MAX_WORKERS = 4
+
+
+def get_loader_executor() -> ThreadPoolExecutor:
+    """Get (creating on first use) the bounded executor for blocking loaders"""
+    global _loader_executor
+    with _loader_executor_lock:
+        if _loader_executor is None:
+            _loader_executor = ThreadPoolExecutor(
+                max_workers=LOADER_MAX_WORKERS,
+                thread_name_prefix="cache-loader"
+            )
+        return _loader_executor
+
+
+def configure_loader_executor(max_workers: int):
+    """
+    Set the number of loader threads available to async callers
+
+    Replaces the executor; loads already running on the old one finish normally.
+    """
+    global _loader_executor, LOADER_MAX_WORKERS
+    with _loader_executor_lock:
+        LOADER_MAX_WORKERS = max_workers
+        old, _loader_executor = _loader_executor, None
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+def _schedule_refresh(refresh: Callable):
+    """Run refresh in the background, on the running event loop's executor if any"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if loop is not None:
+        loop.run_in_executor(None, refresh)
+    else:
+        _refresh_executor.submit(refresh)
+
+
+async def call_cached(func: Callable, *args, **kwargs) -> Any:
+    """
+    Call a loader from async code without blocking the event loop
+
+    @cached functions go through their async path (hits served inline, misses
+    on the loader pool). Any other callable is run on the loader pool.
+
+    Usage:
+        agents = await call_cached(load_l1_agents)
+    """
+    if getattr(func, "is_cached", False) is True:
+        return await func.aget(*args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_loader_executor(), lambda: func(*args, **kwargs))
+
+
+def make_cache_key(func: Callable, args: tuple, kwargs: dict) -> str:
+    """
+    Build the cache key used by @cached for a call
+
+    Keys are ``function_name:digest``, where the digest hashes the arguments,
+    so keys stay short however large the arguments are.
+    """
+    raw = repr((args, sorted(kwargs.items())))
+    return f"{func.__name__}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]}"
 
-        return {
-            "total_entries": len(self._cache),
-            "expired_entries": expired_count,
-            "active_entries": len(self._cache) - expired_count,
-            "ttl_seconds": self.ttl
-        }
 
+TagSpec = Union[Iterable[str], Callable[..., Iterable[str]], None]
 
-def cached(ttl: int = 300):
+
+def _resolve_tags(tags: TagSpec, func: Callable, result: Any, args: tuple, kwargs: dict) -> Tuple[str, ...]:
+    """Compute the tags for a freshly loaded result"""
+    if tags is None:
+        return ()
+    if not callable(tags):
+        return tuple(tags)
+    try:
+        return tuple(tags(result, *args, **kwargs))
+    except Exception as e:
+        logger.warning(f"Tagging {func.__name__} result failed: {e}")
+        return ()
+
+
+def cached(
+    ttl: Optional[float] = 300,
+    maxsize: int = 128,
+    stale_while_revalidate: bool = False,
+    stale_ttl: Optional[float] = None,
+    tags: TagSpec = None,
+    max_bytes: Optional[int] = None
+):
     """
-    Decorator for caching function results with TTL
+    Decorator for caching function results with TTL and LRU eviction
 
     Usage:
         @cached(ttl=300)
@@ -109,33 +937,155 @@ def cached(ttl: int = 300):
             return result
 
     The cache key is automatically generated from the function name and arguments.
-    The cache instance is exposed as function_name.cache for manual operations.
+    The cache instance is exposed as function_name.cache for manual operations
+    and statistics (hits, misses, load latency). function_name.invalidate()
+    clears every entry; function_name.invalidate(arg1, arg2) drops only the
+    entry for those arguments.
+
+    Concurrent misses for the same key are coalesced: one caller runs the
+    function and the others wait for its result, so a TTL expiry under load
+    triggers a single reload rather than one per request.
+
+    With stale_while_revalidate=True, callers that find an expired entry get
+    the stale value immediately while a single background refresh reloads it
+    (on the running event loop's default executor when called from a request
+    handler). Only the very first load for a key blocks.
+
+    Async callers should use ``await function_name.aget(...)`` (or
+    call_cached): hits are served on the event loop, and misses run the
+    blocking loader on a bounded thread pool so a slow file scan never
+    stalls other requests or WebSocket streams.
+
+    tags attaches tags to each result - either a fixed list or a function
+    called as tags(result, *args, **kwargs) - so invalidate_tags("agent:L2.3.*")
+    drops only the entries related to those agents.
+
+    The cache is named after the function's module and qualified name, so
+    with a shared backend (see configure_cache_backend) every worker reuses
+    the same entries and invalidate() reaches all of them.
 
     Args:
         ttl: Time to live in seconds (default: 300 = 5 minutes)
+        maxsize: Maximum number of distinct argument combinations kept (default: 128)
+        stale_while_revalidate: Serve expired values while refreshing in the background
+        stale_ttl: How long expired values stay servable when stale_while_revalidate
+            is enabled (default: None = until evicted or invalidated)
+        tags: Tags for each result, or a function computing them from the result and arguments
+        max_bytes: Approximate memory budget for this function's results (default: no limit)
     """
-    cache = SimpleCache(ttl)
+    if not stale_while_revalidate:
+        stale_ttl = 0
 
     def decorator(func: Callable):
+        cache = SimpleCache(
+            ttl,
+            maxsize,
+            stale_ttl=stale_ttl,
+            name=f"{func.__module__}.{func.__qualname__}",
+            max_bytes=max_bytes
+        )
+        flight = SingleFlight()
+
+        def load(cache_key: str, args: tuple, kwargs: dict) -> Any:
+            # Another caller may have finished loading between our miss and
+            # taking the lead, so re-check before doing the work
+            result = cache.peek(cache_key, _MISSING)
+            if result is not _MISSING:
+                return result
+
+            # An invalidation while func runs means it may have read data from
+            # before the change: load again rather than cache (and hand the
+            # callers that joined after the invalidation) an outdated result
+            for _ in range(LOAD_ATTEMPTS):
+                version = cache.load_version(cache_key)
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                cache.record_load(time.perf_counter() - start)
+
+                result_tags = _resolve_tags(tags, func, result, args, kwargs)
+                if cache.set(cache_key, result, tags=result_tags, version=version):
+                    break
+            return result
+
+        def refresh(cache_key: str, args: tuple, kwargs: dict):
+            try:
+                flight.do(cache_key, load, cache_key, args, kwargs)
+            except Exception as e:
+                # Keep serving the stale value; the next stale read retries
+                logger.warning(f"Background refresh of {func.__name__} failed: {e}")
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             # Create cache key from function name and arguments
-            # Convert args and kwargs to a hashable key
-            cache_key = f"{func.__name__}:{str(args)}:{str(sorted(kwargs.items()))}"
+            cache_key = make_cache_key(func, args, kwargs)
 
             # Try to get from cache
-            result = cache.get(cache_key)
-            if result is not None:
-                return result
+            if stale_while_revalidate:
+                result, fresh = cache.get_stale(cache_key, _MISSING)
+                if result is not _MISSING:
+                    if not fresh and not flight.in_flight(cache_key):
+                        _schedule_refresh(lambda: refresh(cache_key, args, kwargs))
+                    return result
+            else:
+                result = cache.get(cache_key, _MISSING)
+                if result is not _MISSING:
+                    return result
 
-            # Cache miss - compute result
-            result = func(*args, **kwargs)
-            cache.set(cache_key, result)
+            # Cache miss - compute result (or wait for an in-flight load)
+            result, leader = flight.do(cache_key, load, cache_key, args, kwargs)
+            if not leader:
+                cache.record_coalesced()
             return result
 
+        async def aget(*args, **kwargs):
+            cache_key = make_cache_key(func, args, kwargs)
+
+            # Hits never leave the event loop
+            if stale_while_revalidate:
+                result, fresh = cache.get_stale(cache_key, _MISSING)
+                if result is not _MISSING:
+                    if not fresh and not flight.in_flight(cache_key):
+                        _schedule_refresh(lambda: refresh(cache_key, args, kwargs))
+                    return result
+            else:
+                result = cache.get(cache_key, _MISSING)
+                if result is not _MISSING:
+                    return result
+
+            # Miss - join an in-flight load (sync or async) or lead a new one
+            future, leader = flight.join_or_lead(cache_key)
+            if not leader:
+                cache.record_coalesced()
+                return await asyncio.wrap_future(future)
+
+            loop = asyncio.get_running_loop()
+            load_future = loop.run_in_executor(get_loader_executor(), load, cache_key, args, kwargs)
+
+            def finish(done: asyncio.Future):
+                if done.cancelled():
+                    flight.finish(cache_key, future, error=asyncio.CancelledError())
+                elif done.exception() is not None:
+                    flight.finish(cache_key, future, error=done.exception())
+                else:
+                    flight.finish(cache_key, future, done.result())
+
+            # Resolve waiters even if this caller is cancelled mid-load
+            load_future.add_done_callback(finish)
+            return await asyncio.shield(load_future)
+
+        def invalidate(*args, **kwargs):
+            if args or kwargs:
+                cache.invalidate(make_cache_key(func, args, kwargs))
+            else:
+                cache.clear()
+
         # Expose cache for manual invalidation
         wrapper.cache = cache
-        wrapper.invalidate = lambda: cache.clear()
+        wrapper.invalidate = invalidate
+        wrapper.invalidate_tags = cache.invalidate_tags
+        wrapper.aget = aget
+        wrapper.is_cached = True
+        _cached_functions[cache.name] = wrapper
 
         return wrapper
 
@@ -0,0 +1,349 @@
+"""
+Shared cache backends
+
+A SimpleCache always keeps a local in-process copy of its entries. A backend
+adds a shared tier behind it so several uvicorn workers can reuse one
+another's loads, and fans invalidations out to every worker.
+
+- InProcessBackend: no shared tier, invalidations stay in this process
+- RedisBackend: entries stored in Redis as JSON, invalidations published
+  over Redis pub/sub so every worker drops its local copy
+"""
+
+import json
+import logging
+import threading
+import uuid
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+try:
+    import redis
+except ImportError:  # redis not installed - only the in-process backend is available
+    redis = None
+
+
+logger = logging.getLogger("cache")
+
+# Callback applying an invalidation received from another worker:
+# (namespace, key or None for all, tag pattern or None)
+InvalidationCallback = Callable[[str, Optional[str], Optional[str]], None]
+
+# Shared entry as returned by CacheBackend.get: (stored_at, value, tags)
+SharedEntry = Tuple[float, Any, Tuple[str, ...]]
+
+
+class CacheBackend:
+    """
+    Shared tier interface used by SimpleCache
+
+    Entries are addressed by a cache namespace (the cache's name) and key.
+    Values are stored together with the time they were stored and their tags,
+    so every worker applies the same TTL and tag invalidations to an entry.
+    """
+
+    name = "base"
+
+    def get(self, namespace: str, key: str) -> Optional[SharedEntry]:
+        """
+        Fetch a shared entry
+
+        Returns:
+            (stored_at, value, tags), or None if the backend has no entry
+        """
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: Any, stored_at: float,
+            expire: Optional[float] = None, tags: Iterable[str] = ()):
+        """Store a shared entry, expiring after ``expire`` seconds (None = no expiry)"""
+        raise NotImplementedError
+
+    def invalidate(self, namespace: str, key: Optional[str] = None):
+        """Delete one entry (or the whole namespace) and notify other workers"""
+        raise NotImplementedError
+
+    def invalidate_tags(self, namespace: str, pattern: str):
+        """Delete entries with tags matching pattern and notify other workers"""
+        raise NotImplementedError
+
+    def start(self, on_invalidate: InvalidationCallback):
+        """Start receiving invalidations published by other workers"""
+        raise NotImplementedError
+
+    def stop(self):
+        """Stop receiving invalidations and release connections"""
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict:
+        """Get backend statistics"""
+        raise NotImplementedError
+
+
+class InProcessBackend(CacheBackend):
+    """
+    Default backend - every worker keeps its own caches
+
+    There is nothing to share, so lookups always miss and invalidations
+    only affect the local process (which SimpleCache already handles).
+    """
+
+    name = "memory"
+
+    def get(self, namespace: str, key: str) -> Optional[SharedEntry]:
+        return None
+
+    def set(self, namespace: str, key: str, value: Any, stored_at: float,
+            expire: Optional[float] = None, tags: Iterable[str] = ()):
+        pass
+
+    def invalidate(self, namespace: str, key: Optional[str] = None):
+        pass
+
+    def invalidate_tags(self, namespace: str, pattern: str):
+        pass
+
+    def start(self, on_invalidate: InvalidationCallback):
+        pass
+
+    def stop(self):
+        pass
+
+    def get_stats(self) -> Dict:
+        return {"backend": self.name}
+
+
+class RedisBackend(CacheBackend):
+    """
+    Redis-protocol backend shared by all workers
+
+    Usage:
+        backend = RedisBackend.from_url("redis://localhost:6379/0")
+        configure_cache_backend(backend)
+
+    Entries live under ``{prefix}{namespace}:{key}`` as JSON. Values that are
+    not JSON-serializable stay local to the worker. Each tag is a set of entry
+    keys under ``{prefix}{namespace}#tag:{tag}``. Invalidations delete the
+    shared entries and are published on ``{prefix}invalidate``; each worker
+    ignores its own messages. Redis errors are logged and treated as misses,
+    so an unavailable Redis degrades to per-worker caching.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, prefix: str = "control-center:cache:"):
+        """
+        Args:
+            client: redis.Redis-compatible client (e.g. fakeredis.FakeRedis in tests)
+            prefix: Key and channel prefix
+        """
+        self.client = client
+        self.prefix = prefix
+        self.channel = f"{prefix}invalidate"
+        self.origin = uuid.uuid4().hex
+
+        self._lock = threading.Lock()
+        self._pubsub = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._on_invalidate: Optional[InvalidationCallback] = None
+
+        self._gets = 0
+        self._hits = 0
+        self._sets = 0
+        self._skipped = 0
+        self._errors = 0
+        self._published = 0
+        self._received = 0
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "control-center:cache:") -> "RedisBackend":
+        """Create a backend from a redis:// URL"""
+        if redis is None:
+            raise RuntimeError("redis package is not installed")
+        return cls(redis.Redis.from_url(url), prefix=prefix)
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}{namespace}:{key}"
+
+    def _tag_key(self, namespace: str, tag: str) -> str:
+        return f"{self.prefix}{namespace}#tag:{tag}"
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, namespace: str, key: str) -> Optional[SharedEntry]:
+        self._count("_gets")
+        try:
+            raw = self.client.get(self._key(namespace, key))
+        except Exception as e:
+            self._count("_errors")
+            logger.warning(f"Redis cache get failed: {e}")
+            return None
+
+        if raw is None:
+            return None
+
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            self._count("_errors")
+            return None
+
+        self._count("_hits")
+        return entry["t"], entry["v"], tuple(entry.get("g", ()))
+
+    def set(self, namespace: str, key: str, value: Any, stored_at: float,
+            expire: Optional[float] = None, tags: Iterable[str] = ()):
+        tags = list(tags)
+        try:
+            data = json.dumps({"t": stored_at, "v": value, "g": tags}, separators=(",", ":"))
+        except (TypeError, ValueError):
+            # Not representable as JSON - keep it in this worker only
+            self._count("_skipped")
+            return
+
+        entry_key = self._key(namespace, key)
+        px = max(1, int(expire * 1000)) if expire is not None else None
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(entry_key, data, px=px)
+            for tag in tags:
+                tag_key = self._tag_key(namespace, tag)
+                pipe.sadd(tag_key, entry_key)
+                if px is not None:
+                    pipe.pexpire(tag_key, px)
+            pipe.execute()
+            self._count("_sets")
+        except Exception as e:
+            self._count("_errors")
+            logger.warning(f"Redis cache set failed: {e}")
+
+    def _publish(self, namespace: str, key: Optional[str] = None, tags: Optional[str] = None):
+        message = json.dumps({"origin": self.origin, "namespace": namespace, "key": key, "tags": tags})
+        self.client.publish(self.channel, message)
+        self._count("_published")
+
+    def invalidate(self, namespace: str, key: Optional[str] = None):
+        try:
+            if key is not None:
+                self.client.delete(self._key(namespace, key))
+            else:
+                keys = list(self.client.scan_iter(match=f"{self.prefix}{namespace}:*", count=500))
+                keys += list(self.client.scan_iter(match=f"{self.prefix}{namespace}#tag:*", count=500))
+                if keys:
+                    self.client.delete(*keys)
+
+            self._publish(namespace, key=key)
+        except Exception as e:
+            self._count("_errors")
+            logger.warning(f"Redis cache invalidation failed: {e}")
+
+    def invalidate_tags(self, namespace: str, pattern: str):
+        try:
+            tag_keys = list(self.client.scan_iter(match=self._tag_key(namespace, pattern), count=500))
+            keys = set(tag_keys)
+            for tag_key in tag_keys:
+                keys.update(self.client.smembers(tag_key))
+            if keys:
+                self.client.delete(*keys)
+
+            self._publish(namespace, tags=pattern)
+        except Exception as e:
+            self._count("_errors")
+            logger.warning(f"Redis cache tag invalidation failed: {e}")
+
+    def start(self, on_invalidate: InvalidationCallback):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._on_invalidate = on_invalidate
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(self.channel)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
+
+    def _listen(self):
+        while not self._stop_event.is_set():
+            try:
+                message = self._pubsub.get_message(timeout=0.5)
+            except Exception as e:
+                self._count("_errors")
+                logger.warning(f"Redis invalidation listener error: {e}")
+                self._stop_event.wait(1)
+                continue
+
+            if message is not None:
+                self.handle_message(message.get("data"))
+
+    def handle_message(self, data: Any):
+        """Apply an invalidation published by another worker"""
+        try:
+            payload = json.loads(data)
+        except (TypeError, ValueError):
+            return
+
+        if payload.get("origin") == self.origin or self._on_invalidate is None:
+            return
+
+        self._count("_received")
+        self._on_invalidate(payload.get("namespace"), payload.get("key"), payload.get("tags"))
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": self.name,
+                "prefix": self.prefix,
+                "listening": self._thread is not None and self._thread.is_alive(),
+                "gets": self._gets,
+                "hits": self._hits,
+                "hit_rate": round(self._hits / self._gets, 4) if self._gets else 0.0,
+                "sets": self._sets,
+                "skipped_unserializable": self._skipped,
+                "invalidations_published": self._published,
+                "invalidations_received": self._received,
+                "errors": self._errors
+            }
+
+
+def create_backend(backend: str = "memory", redis_url: Optional[str] = None,
+                   prefix: str = "control-center:cache:") -> CacheBackend:
+    """
+    Create the configured cache backend
+
+    Falls back to the in-process backend if Redis is requested but the
+    package is missing, no URL is configured, or the server is unreachable.
+
+    Args:
+        backend: "memory" or "redis"
+        redis_url: redis:// URL for the Redis backend
+        prefix: Key and channel prefix for the Redis backend
+    """
+    if backend == "redis":
+        if redis is None:
+            print("Cache backend: redis package not installed, using in-process caches")
+        elif not redis_url:
+            print("Cache backend: REDIS_URL not set, using in-process caches")
+        else:
+            try:
+                shared = RedisBackend.from_url(redis_url, prefix=prefix)
+                shared.client.ping()
+                return shared
+            except Exception as e:
+                print(f"Cache backend: Redis unavailable ({e}), using in-process caches")
+    elif backend != "memory":
+        print(f"Cache backend: unknown backend '{backend}', using in-process caches")
+
+    return InProcessBackend()
@@ -8,8 +8,9 @@ Provides utilities for:
 - Efficient relationship loading
 """
 
-from typing import Any, Dict, List, Optional, Type, TypeVar
-from sqlalchemy import select, func
+import json
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+from sqlalchemy import select, func, or_
 from sqlalchemy.orm import selectinload, joinedload, contains_eager
 from sqlalchemy.ext.asyncio import AsyncSession
 from database.models import Base, Agent, KnowledgeFile, Service
@@ -297,6 +298,73 @@ class QueryOptimizer:
             "by_level": levels
         }
 
+    @staticmethod
+    async def get_synced_agents(
+        session: AsyncSession,
+        level: Optional[str] = None,
+        parent: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 50
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Page of synced agents in registry load order, filtered in SQL
+
+        Uses the level, parent_l1/parent_l2 and position indexes; the
+        stored agent JSON is returned as-is (see services/agent_sync.py).
+
+        Args:
+            session: Database session
+            level: Optional level filter (L1, L2, L3)
+            parent: Optional raw parent_l1 or parent_l2 value
+            offset: Rows to skip
+            limit: Rows to return
+
+        Returns:
+            Tuple of (agent dicts, total matching count)
+        """
+        conditions = []
+        if level:
+            conditions.append(Agent.level == level)
+        if parent:
+            conditions.append(or_(Agent.parent_l1 == parent, Agent.parent_l2 == parent))
+
+        total_result = await session.execute(select(func.count(Agent.id)).where(*conditions))
+        total = total_result.scalar()
+
+        query = (
+            select(Agent.data)
+            .where(*conditions)
+            .order_by(Agent.position)
+            .offset(offset)
+            .limit(limit)
+        )
+        result = await session.execute(query)
+        return [json.loads(data) for data in result.scalars()], total
+
+    @staticmethod
+    async def get_knowledge_files_by_agent_name(
+        session: AsyncSession,
+        agent_name: str
+    ) -> List[KnowledgeFile]:
+        """
+        Knowledge files of an agent looked up by its agent id (one JOIN)
+
+        Args:
+            session: Database session
+            agent_name: Agent id, e.g. 01_art_director
+
+        Returns:
+            List of KnowledgeFile objects ordered by path
+        """
+        query = (
+            select(KnowledgeFile)
+            .join(Agent, KnowledgeFile.agent_id == Agent.id)
+            .where(Agent.name == agent_name)
+            .order_by(KnowledgeFile.file_path)
+        )
+        result = await session.execute(query)
+        return result.scalars().all()
+
     @staticmethod
     async def bulk_create_knowledge_files(
         session: AsyncSession,
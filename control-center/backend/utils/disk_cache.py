@@ -0,0 +1,217 @@
+"""
+Persistent on-disk cache tier for parsed files
+
+Stores parse results in SQLite keyed by (namespace, path) and validated
+against the file's mtime and size, so a backend restart can reuse the
+previous parse of every unchanged agent definition instead of re-reading
+and re-parsing the markdown.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+# Default location, alongside the logs directory
+CACHE_DIR = Path(__file__).parent.parent / "cache"
+
+_MISSING = object()
+
+
+class FileParseCache:
+    """
+    SQLite-backed cache of parsed file results
+
+    Usage:
+        parse_cache = FileParseCache(CACHE_DIR / "parse_cache.db")
+        data = parse_cache.get_or_parse("l1_agent:v1", path, parse_function)
+
+    An entry is reused only while the file's mtime (ns) and size are unchanged.
+    Bump the namespace version when the parser's output format changes.
+    """
+
+    def __init__(self, db_path: Path, enabled: bool = True):
+        """
+        Args:
+            db_path: SQLite database file (created on first use)
+            enabled: If False, get_or_parse always calls the parser
+        """
+        self.db_path = Path(db_path)
+        self.enabled = enabled
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._errors = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS parse_cache (
+                    namespace TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, path)
+                )
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, namespace: str, path: Path, stat: os.stat_result, default: Any = None) -> Any:
+        """
+        Get a stored parse result if the file is unchanged
+
+        Args:
+            namespace: Parser namespace (include a version)
+            path: Parsed file path
+            stat: Current os.stat() result for the file
+            default: Value returned if missing or stale
+
+        Returns:
+            Stored value, or ``default``
+        """
+        with self._lock:
+            try:
+                row = self._connect().execute(
+                    "SELECT mtime_ns, size, data FROM parse_cache WHERE namespace = ? AND path = ?",
+                    (namespace, str(path))
+                ).fetchone()
+            except sqlite3.Error:
+                self._errors += 1
+                return default
+
+            if row is None or row[0] != stat.st_mtime_ns or row[1] != stat.st_size:
+                self._misses += 1
+                return default
+
+            self._hits += 1
+
+        return json.loads(row[2])
+
+    def put(self, namespace: str, path: Path, stat: os.stat_result, value: Any):
+        """
+        Store a parse result for the file version described by stat
+
+        Args:
+            namespace: Parser namespace (include a version)
+            path: Parsed file path
+            stat: os.stat() result taken before parsing
+            value: JSON-serializable parse result
+        """
+        data = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO parse_cache (namespace, path, mtime_ns, size, data, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (namespace, str(path), stat.st_mtime_ns, stat.st_size, data, time.time())
+                )
+                conn.commit()
+                self._writes += 1
+            except sqlite3.Error:
+                self._errors += 1
+
+    def get_or_parse(
+        self,
+        namespace: str,
+        path: Path,
+        parser: Callable[[Path], Any],
+        should_store: Callable[[Any], bool] = lambda value: True
+    ) -> Any:
+        """
+        Return the stored parse of path, re-parsing only if the file changed
+
+        Args:
+            namespace: Parser namespace (include a version)
+            path: File to parse
+            parser: Function parsing the file; result must be JSON-serializable
+            should_store: Predicate deciding whether a fresh result is persisted
+                (e.g. skip error results)
+
+        Returns:
+            Parse result
+        """
+        if not self.enabled:
+            return parser(path)
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return parser(path)
+
+        value = self.get(namespace, path, stat, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        value = parser(path)
+        if should_store(value):
+            self.put(namespace, path, stat, value)
+        return value
+
+    def clear(self, namespace: Optional[str] = None):
+        """Delete stored entries (all, or one namespace)"""
+        with self._lock:
+            if self._conn is None and not self.db_path.exists():
+                return
+            try:
+                conn = self._connect()
+                if namespace is None:
+                    conn.execute("DELETE FROM parse_cache")
+                else:
+                    conn.execute("DELETE FROM parse_cache WHERE namespace = ?", (namespace,))
+                conn.commit()
+            except sqlite3.Error:
+                self._errors += 1
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_stats(self) -> Dict:
+        """
+        Get disk tier statistics
+
+        Returns:
+            Dictionary with hit/miss counters, entry count and file size
+        """
+        with self._lock:
+            entries = 0
+            if self.enabled and (self._conn is not None or self.db_path.exists()):
+                try:
+                    entries = self._connect().execute("SELECT COUNT(*) FROM parse_cache").fetchone()[0]
+                except sqlite3.Error:
+                    self._errors += 1
+
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "path": str(self.db_path),
+                "entries": entries,
+                "size_bytes": self.db_path.stat().st_size if self.db_path.exists() else 0,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "writes": self._writes,
+                "errors": self._errors
+            }
+
+
+# Global instance shared by the agent loaders
+parse_cache = FileParseCache(CACHE_DIR / "parse_cache.db")
@@ -0,0 +1,114 @@
+"""
+ETag Utilities
+Version hashes for cache generations and If-None-Match (304) handling
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+
+# Cache generations whose version is remembered (by object identity)
+GENERATION_SLOTS = 64
+
+# Responses carrying an ETag are always revalidated before reuse
+CACHE_CONTROL = "no-cache"
+
+_generations: Dict[int, Tuple[Any, str]] = {}
+_generations_lock = threading.Lock()
+
+
+def content_version(data: Any) -> str:
+    """
+    Stable hash of JSON-like data
+
+    Args:
+        data: Value to hash (non-JSON values are hashed by str())
+
+    Returns:
+        16-character hex digest
+    """
+    raw = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def generation_version(data: Any) -> str:
+    """
+    Version of one cache generation, hashed once per object
+
+    Cached loaders return the same object until they reload, so the content
+    hash is computed the first time a generation is seen and then looked up
+    by identity. Remembered objects are kept alive so their ids are never
+    reused while they are in the table.
+    """
+    key = id(data)
+    with _generations_lock:
+        entry = _generations.get(key)
+        if entry is not None and entry[0] is data:
+            return entry[1]
+
+    version = content_version(data)
+
+    with _generations_lock:
+        if len(_generations) >= GENERATION_SLOTS:
+            _generations.pop(next(iter(_generations)))
+        _generations[key] = (data, version)
+    return version
+
+
+def make_etag(request: Request, *versions: str) -> str:
+    """
+    Weak ETag for a request against the given data versions
+
+    The path and query string are part of the tag, so every page and filter
+    of an endpoint has its own. Weak, because GZipMiddleware may change the
+    bytes on the wire but not the content.
+    """
+    raw = "\n".join((request.url.path, request.url.query) + versions)
+    return f'W/"{hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match names etag (weak comparison, "*" matches anything)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(request: Request, response: Response, *versions: str) -> Optional[Response]:
+    """
+    Tag a response and short-circuit it if the client already has it
+
+    Sets ETag and Cache-Control on response. If the request's If-None-Match
+    matches, returns a 304 to send instead - before any payload is built.
+
+    Usage:
+        cached_response = not_modified(request, response, registry.version)
+        if cached_response:
+            return cached_response
+        return build_payload()
+
+    Returns:
+        A 304 response, or None if the full response should be sent
+    """
+    etag = make_etag(request, *versions)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
@@ -8,9 +8,12 @@ Provides standardized pagination for list endpoints with support for:
 - Configurable page sizes with sensible defaults
 """
 
-from typing import Any, Dict, List, Optional, TypeVar, Generic
+from typing import Any, Dict, List, Optional, Sequence, TypeVar, Generic
 from pydantic import BaseModel, Field
 from math import ceil
+import base64
+import bisect
+import json
 
 # Generic type for paginated items
 T = TypeVar('T')
@@ -195,6 +198,76 @@ def create_cursor_response(
     }
 
 
+def encode_cursor(key: Sequence) -> str:
+    """
+    Encode a sort key as an opaque cursor
+
+    Args:
+        key: Sort key of the last item on a page (JSON-serializable scalars)
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps(list(key), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(key, list):
+        raise ValueError("Invalid cursor")
+    return tuple(key)
+
+
+def paginate_keyset(
+    items: List[Any],
+    keys: List[tuple],
+    params: CursorParams
+) -> Dict[str, Any]:
+    """
+    Keyset-paginate items that are sorted by keys
+
+    The cursor holds the sort key of the last item returned, so the next
+    page starts right after it with a binary search - deep pages cost the
+    same as the first, and inserting or removing earlier items does not
+    shift later pages.
+
+    Args:
+        items: Items sorted by their keys
+        keys: Sort key of each item (unique, ascending)
+        params: Cursor parameters (empty cursor = first page)
+
+    Returns:
+        Dictionary with cursor-paginated results and metadata
+
+    Raises:
+        ValueError: If the cursor is malformed or does not fit the keys
+    """
+    start = 0
+    if params.cursor:
+        after = decode_cursor(params.cursor)
+        try:
+            start = bisect.bisect_right(keys, after)
+        except TypeError as e:
+            raise ValueError("Invalid cursor") from e
+
+    end = start + params.page_size
+    page = items[start:end]
+    next_cursor = encode_cursor(keys[end - 1]) if end < len(items) else None
+
+    return create_cursor_response(page, params.page_size, next_cursor)
+
+
 # Backward compatibility helpers
 def paginate(
     items: List[Any],
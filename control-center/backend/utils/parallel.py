@@ -0,0 +1,72 @@
+"""
+Parallel File I/O
+Bounded thread pool for filesystem fan-out (stat, read and parse many files at once)
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# Threads for concurrent file reads. Separate from the cache loader pool:
+# loaders running there fan out here, and waiting on their own pool could
+# exhaust it.
+IO_MAX_WORKERS = 8
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+_io_executor_lock = threading.Lock()
+_worker = threading.local()
+
+
+def _mark_worker():
+    _worker.active = True
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Get (creating on first use) the bounded executor for file I/O"""
+    global _io_executor
+    with _io_executor_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(
+                max_workers=IO_MAX_WORKERS,
+                thread_name_prefix="file-io",
+                initializer=_mark_worker
+            )
+        return _io_executor
+
+
+def configure_io_executor(max_workers: int):
+    """
+    Set the number of file I/O threads
+
+    Replaces the executor; work already running on the old one finishes normally.
+    """
+    global _io_executor, IO_MAX_WORKERS
+    with _io_executor_lock:
+        IO_MAX_WORKERS = max_workers
+        old, _io_executor = _io_executor, None
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+def parallel_map(func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+    """
+    Apply func to every item on the file I/O pool
+
+    Results come back in the order of items, whatever order the calls finish
+    in, so callers merge them deterministically. The first exception raised
+    by func is re-raised. Called from a pool thread (nested fan-out), or with
+    fewer than two items or one worker, it runs inline instead.
+
+    Usage:
+        agents = parallel_map(load_agent_file, filenames)
+    """
+    items = list(items)
+    if len(items) < 2 or IO_MAX_WORKERS <= 1 or getattr(_worker, "active", False):
+        return [func(item) for item in items]
+
+    executor = get_io_executor()
+    futures = [executor.submit(func, item) for item in items]
+    return [future.result() for future in futures]
@@ -177,6 +177,7 @@ def track_performance(
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
             start_time = time.time()
+            result = None
 
             try:
                 result = await func(*args, **kwargs)
@@ -200,6 +201,7 @@ def track_performance(
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
             start_time = time.time()
+            result = None
 
             try:
                 result = func(*args, **kwargs)